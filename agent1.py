@@ -1,70 +1,408 @@
-from agents import Agent, InputGuardrail,GuardrailFunctionOutput, Runner
-from pydantic import BaseModel
+from dataclasses import dataclass
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+import argparse
 import asyncio
 import os
 
-class HomeworkOutput(BaseModel):
-    is_homework: bool
-    reasoning: str
-
-guardrail_agent = Agent(
-    name="Guardrail check",
-    instructions="Check if the user is asking about homework.",
-    output_type=HomeworkOutput,
-)
-
-math_tutor_agent = Agent(
-    name="Math Tutor",
-    handoff_description="Specialist agent for math questions",
-    instructions="You provide help with math problems. Explain your reasoning at each step and include examples",
-)
-
-history_tutor_agent = Agent(
-    name="History Tutor",
-    handoff_description="Specialist agent for historical questions",
-    instructions="You provide assistance with historical queries. Explain important events and context clearly.",
-)
-
-
-async def homework_guardrail(ctx, agent, input_data):
-    result = await Runner.run(guardrail_agent, input_data, context=ctx.context)
-    final_output = result.final_output_as(HomeworkOutput)
-    return GuardrailFunctionOutput(
-        output_info=final_output,
-        tripwire_triggered=not final_output.is_homework,
+from conversation_memory import HISTORY_BUDGET, format_turn_tokens, open_conversation
+from guardrail_prefilter import GuardrailPrefilter
+from startup import configure_environment
+from streaming import StreamEvent, format_timing, render_stream, run_streamed
+from verdict_cache import SIMILARITY_THRESHOLD, TriageVerdict, VerdictCache
+
+# The SDK and pydantic are imported when the agents are first needed, not at import time
+if TYPE_CHECKING:
+    from agents import Agent, InputGuardrail, InputGuardrailTripwireTriggered, RunConfig, RunResult
+
+
+@lru_cache(maxsize=None)
+def _sdk() -> SimpleNamespace:
+    """Import the Agents SDK and build the triage agents, on first use."""
+    from agents import Agent
+    from pydantic import BaseModel
+
+    class HomeworkOutput(BaseModel):
+        is_homework: bool
+        reasoning: str
+
+    # Pickled by reference (e.g. into the shared verdict cache) as agent1.HomeworkOutput, see __getattr__
+    HomeworkOutput.__qualname__ = "HomeworkOutput"
+
+    guardrail_agent = Agent(
+        name="Guardrail check",
+        instructions="Check if the user is asking about homework.",
+        output_type=HomeworkOutput,
     )
 
+    math_tutor_agent = Agent(
+        name="Math Tutor",
+        handoff_description="Specialist agent for math questions",
+        instructions="You provide help with math problems. Explain your reasoning at each step and include examples",
+    )
 
+    history_tutor_agent = Agent(
+        name="History Tutor",
+        handoff_description="Specialist agent for historical questions",
+        instructions="You provide assistance with historical queries. Explain important events and context clearly.",
+    )
 
+    homework_input_guardrail = homework_guardrail_for()
 
-async def main():
-    # Create the travel assistant agent with tools
     triage_agent = Agent(
         name="Triage Agent",
         instructions="You determine which agent to use based on the user's homework question",
         handoffs=[history_tutor_agent, math_tutor_agent],
         input_guardrails=[
-            InputGuardrail(guardrail_function=homework_guardrail),
+            homework_input_guardrail,
         ],
     )
 
+    return SimpleNamespace(
+        HomeworkOutput=HomeworkOutput,
+        guardrail_agent=guardrail_agent,
+        math_tutor_agent=math_tutor_agent,
+        history_tutor_agent=history_tutor_agent,
+        homework_input_guardrail=homework_input_guardrail,
+        triage_agent=triage_agent,
+        # Triage without the built-in guardrail, for runs where run_triage checks the input itself
+        speculative_triage_agent=triage_agent.clone(input_guardrails=[]),
+        # Handoff target name -> tutor, for questions whose handoff is cached
+        TUTORS={agent.name: agent for agent in (history_tutor_agent, math_tutor_agent)},
+    )
+
+
+# Names served from _sdk(), so `agent1.triage_agent` and `from agent1 import triage_agent` keep working
+_SDK_NAMES = frozenset({"HomeworkOutput", "guardrail_agent", "math_tutor_agent", "history_tutor_agent",
+                        "homework_input_guardrail", "triage_agent", "speculative_triage_agent", "TUTORS"})
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SDK_NAMES:
+        return getattr(_sdk(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@dataclass
+class GuardrailStats:
+    """Counters for how homework verdicts and triage handoffs were produced.
+
+    Attributes:
+        model_calls: Questions sent to the guardrail model.
+        prefilter_verdicts: Questions the local prefilter decided without any model call.
+        cached_verdicts: Guardrail model calls answered by the verdict cache.
+        cached_rejections: Rejected questions for which triage was never started.
+        cached_handoffs: Triage model calls skipped by going straight to the cached tutor.
+        speculative_cancellations: Triage runs started alongside the guardrail and
+            cancelled because the question was rejected before they finished.
+    """
+    model_calls: int = 0
+    prefilter_verdicts: int = 0
+    cached_verdicts: int = 0
+    cached_rejections: int = 0
+    cached_handoffs: int = 0
+    speculative_cancellations: int = 0
+
+    @property
+    def model_calls_saved(self) -> int:
+        """Guardrail and triage model calls the verdict cache made unnecessary."""
+        return self.cached_verdicts + self.cached_rejections + self.cached_handoffs
+
+
+guardrail_stats = GuardrailStats()
+guardrail_prefilter = GuardrailPrefilter()
+# Verdicts and handoffs keyed on the normalized question, so repeated questions skip the models
+verdict_cache = VerdictCache(max_size=4096, ttl=3600)
+
+
+def _input_text(input_data: Any) -> str:
+    """Return the latest user message from a string or a list of input items."""
+    if isinstance(input_data, str):
+        return input_data
+    for item in reversed(input_data):
+        if isinstance(item, dict) and item.get("role") == "user" and isinstance(item.get("content"), str):
+            return item["content"]
+    return ""
+
+
+async def check_homework(input_data: Any, context: Any = None, run_config: Optional["RunConfig"] = None,
+                         use_prefilter: bool = True) -> Any:
+    """Decide whether the input is a homework question.
+
+    The local prefilter and the verdict cache are consulted first; the
+    guardrail model is only called when neither is confident.
+    """
+    text = _input_text(input_data)
+    if use_prefilter:
+        verdict = guardrail_prefilter.classify(text)
+        if verdict is not None:
+            guardrail_stats.prefilter_verdicts += 1
+            return _sdk().HomeworkOutput(is_homework=verdict[0], reasoning=verdict[1])
+    return (await _verdict(input_data, context, run_config)).homework
+
+
+async def _verdict(input_data: Any, context: Any = None, run_config: Optional["RunConfig"] = None,
+                   cached: TriageVerdict | None = None, looked_up: bool = False) -> TriageVerdict:
+    """Return the cached verdict for the input, asking the guardrail model on a miss.
+
+    `cached` and `looked_up` pass on a lookup the caller already made.
+    """
+    text = _input_text(input_data)
+    if not looked_up:
+        cached = await verdict_cache.lookup(text)
+    if cached is not None:
+        guardrail_stats.cached_verdicts += 1
+        return cached
+
+    asked_model = False
+
+    async def ask_model() -> Any:
+        from agents import Runner
+        nonlocal asked_model
+        asked_model = True
+        guardrail_stats.model_calls += 1
+        # Judge exactly the text the verdict is cached under, not the replayed history
+        result = await Runner.run(_sdk().guardrail_agent, text, context=context, run_config=run_config)
+        return result.final_output_as(_sdk().HomeworkOutput)
+
+    verdict = await verdict_cache.fetch(text, ask_model)
+    if not asked_model:
+        guardrail_stats.cached_verdicts += 1
+    return verdict
+
+
+async def _cached_route(input_data: Any) -> tuple[Optional[TriageVerdict], Optional["Agent"]]:
+    """Look up the input's cached verdict and, for homework, the tutor triage picked last time.
+
+    Raises:
+        InputGuardrailTripwireTriggered: If the cached verdict rejects the input.
+    """
+    cached = await verdict_cache.lookup(_input_text(input_data))
+    if cached is None:
+        return None, None
+    if not cached.homework.is_homework:
+        guardrail_stats.cached_verdicts += 1
+        guardrail_stats.cached_rejections += 1
+        raise _tripwire(cached.homework)
+    tutor = _sdk().TUTORS.get(cached.handoff)
+    if tutor is not None:
+        guardrail_stats.cached_verdicts += 1
+        guardrail_stats.cached_handoffs += 1
+    return cached, tutor
+
+
+async def _record_handoff(input_data: Any, verdict: TriageVerdict, result: Any) -> None:
+    # Only handoffs to a tutor are worth replaying; a triage agent that answered itself is rerun
+    tutor = result.last_agent
+    if _sdk().TUTORS.get(tutor.name) is tutor:
+        await verdict_cache.record_handoff(_input_text(input_data), verdict, tutor.name)
+
+
+def homework_guardrail_for(run_config: Optional["RunConfig"] = None) -> "InputGuardrail":
+    """Build the homework input guardrail, asking the guardrail model through `run_config`.
+
+    Guardrail functions are not given the run config of the run they guard, so
+    a run with another model provider (e.g. a mock) needs a guardrail built with
+    that run config; see `triage_agent_for`.
+    """
+    from agents import GuardrailFunctionOutput, InputGuardrail
+
+    async def homework_guardrail(ctx, agent, input_data):
+        final_output = await check_homework(input_data, ctx.context, run_config)
+        return GuardrailFunctionOutput(
+            output_info=final_output,
+            tripwire_triggered=not final_output.is_homework,
+        )
+    return InputGuardrail(guardrail_function=homework_guardrail, name="homework_guardrail")
+
+
+
+
+def triage_agent_for(run_config: Optional["RunConfig"] = None) -> "Agent":
+    """Return the triage agent with its guardrail asking the model through `run_config`.
+
+    Use it to run the triage agent directly with `Runner.run(..., run_config=run_config)`;
+    run_triage checks the input itself and needs no such agent.
+    """
+    if run_config is None:
+        return _sdk().triage_agent
+    return _sdk().triage_agent.clone(input_guardrails=[homework_guardrail_for(run_config)])
+
+
+def _tripwire(verdict: Any) -> "InputGuardrailTripwireTriggered":
+    from agents import GuardrailFunctionOutput, InputGuardrailResult, InputGuardrailTripwireTriggered
+    return InputGuardrailTripwireTriggered(InputGuardrailResult(
+        guardrail=_sdk().homework_input_guardrail,
+        output=GuardrailFunctionOutput(output_info=verdict, tripwire_triggered=True),
+    ))
+
+
+async def run_triage(input_data: Any, context: Any = None, run_config: Optional["RunConfig"] = None,
+                     use_prefilter: bool = True) -> "RunResult":
+    """Run the triage agent with the homework check running speculatively alongside it.
+
+    The triage run starts immediately; if the homework check trips, the
+    in-flight triage run is cancelled instead of being left to finish. A
+    question seen before skips both: a cached rejection raises right away,
+    and a cached handoff runs the chosen tutor directly.
+
+    Raises:
+        InputGuardrailTripwireTriggered: If the input is not a homework question.
+    """
+    from agents import Runner
+
+    speculative_triage_agent = _sdk().speculative_triage_agent
+    if use_prefilter:
+        verdict = guardrail_prefilter.classify(_input_text(input_data))
+        if verdict is not None:
+            guardrail_stats.prefilter_verdicts += 1
+            if not verdict[0]:
+                raise _tripwire(_sdk().HomeworkOutput(is_homework=False, reasoning=verdict[1]))
+            return await Runner.run(speculative_triage_agent, input_data, context=context, run_config=run_config)
+
+    cached, tutor = await _cached_route(input_data)
+    if tutor is not None:
+        return await Runner.run(tutor, input_data, context=context, run_config=run_config)
+
+    triage = asyncio.create_task(
+        Runner.run(speculative_triage_agent, input_data, context=context, run_config=run_config))
+    try:
+        verdict = await _verdict(input_data, context, run_config, cached, looked_up=True)
+    except BaseException:
+        triage.cancel()
+        raise
+    if not verdict.homework.is_homework:
+        if not triage.done():
+            guardrail_stats.speculative_cancellations += 1
+        triage.cancel()
+        raise _tripwire(verdict.homework)
+    result = await triage
+    await _record_handoff(input_data, verdict, result)
+    return result
+
+
+async def run_triage_streamed(input_data: Any, context: Any = None, run_config: Optional["RunConfig"] = None,
+                              use_prefilter: bool = True) -> AsyncIterator[StreamEvent]:
+    """Streaming counterpart of run_triage.
+
+    The triage run starts streaming immediately, but its events are held back
+    until the homework check passes, so a rejected question never shows a
+    partial answer. Cached verdicts and handoffs are used as in run_triage.
+
+    Raises:
+        InputGuardrailTripwireTriggered: If the input is not a homework question.
+    """
+    speculative_triage_agent = _sdk().speculative_triage_agent
+    if use_prefilter:
+        verdict = guardrail_prefilter.classify(_input_text(input_data))
+        if verdict is not None:
+            guardrail_stats.prefilter_verdicts += 1
+            if not verdict[0]:
+                raise _tripwire(_sdk().HomeworkOutput(is_homework=False, reasoning=verdict[1]))
+            async for event in run_streamed(speculative_triage_agent, input_data, context, run_config):
+                yield event
+            return
+
+    cached, tutor = await _cached_route(input_data)
+    if tutor is not None:
+        async for event in run_streamed(tutor, input_data, context, run_config):
+            yield event
+        return
+
+    held: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for event in run_streamed(speculative_triage_agent, input_data, context, run_config):
+                held.put_nowait(event)
+        finally:
+            held.put_nowait(None)
+
+    triage = asyncio.create_task(pump())
+    try:
+        verdict = await _verdict(input_data, context, run_config, cached, looked_up=True)
+        if not verdict.homework.is_homework:
+            if not triage.done():
+                guardrail_stats.speculative_cancellations += 1
+            raise _tripwire(verdict.homework)
+        while (event := await held.get()) is not None:
+            if event.kind == "final":
+                await _record_handoff(input_data, verdict, event.data)
+            yield event
+        await triage
+    finally:
+        triage.cancel()
+
+
+async def main(run_config: Optional["RunConfig"] = None, stream: bool = False, memory_path: str | None = None,
+               session_id: str = "default", history_budget: int = HISTORY_BUDGET):
+    from agents import InputGuardrailTripwireTriggered
+
     print("Travel Assistant Agent")
     print("Type 'exit' to quit")
 
+    # Earlier turns are replayed within the token budget; the guardrail only checks the new message
+    store, memory = open_conversation(memory_path, session_id, history_budget)
+
     # Interactive loop for conversation
     while True:
         user_input = input("\nYou: ")
         if user_input.lower() == 'exit':
             break
+        history = memory.build_input(user_input)
+
+        # Run the agent with the conversation so far
+        try:
+            if stream:
+                timing = await render_stream(memory.track(
+                    user_input, run_triage_streamed(history, run_config=run_config)))
+                print(format_timing(timing))
+            else:
+                result = await run_triage(history, run_config=run_config)
+                memory.record_result(user_input, result)
+                print(f"\nAssistant: {result.final_output}")
+        except InputGuardrailTripwireTriggered:
+            # Rejected questions are not kept in the history
+            print("\nAssistant: Sorry, I can only help with homework questions.")
+            continue
 
-        # Run the agent with user input
-        result = await Runner.run(triage_agent, user_input)
-        print(f"\nAssistant: {result.final_output}")
+        print(format_turn_tokens(memory.turns[-1]))
+        if store is not None:
+            store.save(memory)
+
+    if store is not None:
+        store.close()
+
+    stats = verdict_cache.stats()
+    print(f"Verdict cache: {stats['hit_rate']:.0%} hit rate ({stats['similar_hits']} near-duplicates), "
+          f"{guardrail_stats.model_calls_saved} model calls saved")
 
 if __name__ == "__main__":
-    if not os.getenv("OPENAI_API_KEY"):
+    parser = argparse.ArgumentParser(description="Homework triage agent")
+    parser.add_argument("--mock", action="store_true", help="Use the local scripted model instead of OpenAI")
+    parser.add_argument("--stream", action="store_true", help="Stream the tutor's answer as it is generated, with timings")
+    parser.add_argument("--memory", metavar="PATH", help="SQLite file to keep the conversation in across runs")
+    parser.add_argument("--session", default="default", help="Conversation to continue from --memory")
+    parser.add_argument("--history-budget", type=int, default=HISTORY_BUDGET,
+                        help="Tokens of earlier conversation sent with each message")
+    parser.add_argument("--similarity", type=float, nargs="?", const=SIMILARITY_THRESHOLD, metavar="THRESHOLD",
+                        help="Reuse verdicts of near-duplicate questions at this cosine similarity "
+                             f"(default {SIMILARITY_THRESHOLD} when given without a value)")
+    args = parser.parse_args()
+
+    configure_environment()
+    if args.similarity is not None:
+        verdict_cache = VerdictCache(max_size=4096, ttl=3600, similarity=args.similarity)
+
+    run_config = None
+    if args.mock:
+        from agents import RunConfig
+        from mock_model import ScriptedModelProvider
+        run_config = RunConfig(model_provider=ScriptedModelProvider(), tracing_disabled=True)
+    elif not os.getenv("OPENAI_API_KEY"):
         print("Please set your OPENAI_API_KEY in the .env file")
         exit(1)
 
     # Run the async main function
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(run_config, args.stream, args.memory, args.session, args.history_budget))
\ No newline at end of file
@@ -0,0 +1,79 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+
+class RequestBatcher:
+    """Coalesces single-value lookups into batched upstream requests.
+
+    Calls to `submit` that arrive within `window` seconds of each other are
+    sent as one batch (at most `max_size` values) and the batch response is
+    split back to each caller by position. Batches are sent in an empty
+    context, so context variables (such as the per-call tool metrics record)
+    of whichever caller happened to fill the batch see none of the shared request.
+
+    Args:
+        send_batch: Coroutine function taking a list of unique values and
+            returning one result per value, in the same order.
+        max_size: Largest number of values per upstream request.
+        window: Seconds to wait for more values before sending a partial batch.
+    """
+
+    def __init__(self, send_batch: Callable[[List[Any]], Awaitable[Sequence[Any]]],
+                 max_size: int = 10, window: float = 0.005):
+        self.send_batch = send_batch
+        self.max_size = max_size
+        self.window = window
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Batches in flight, referenced until done so they are not garbage collected
+        self._sending: Set[asyncio.Task] = set()
+        self.batches_sent = 0
+        self.values_sent = 0
+
+    async def submit(self, value: Any) -> Any:
+        """Queue a value for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((value, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def submit_many(self, values: Sequence[Any]) -> List[Any]:
+        """Look up several values at once, sharing batches with concurrent callers."""
+        return list(await asyncio.gather(*(self.submit(value) for value in values)))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+            task = asyncio.get_running_loop().create_task(self._send(batch), context=contextvars.Context())
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # Identical values in one batch share a single slot in the request
+        positions: Dict[Any, int] = {}
+        for value, _ in batch:
+            positions.setdefault(value, len(positions))
+        self.batches_sent += 1
+        self.values_sent += len(positions)
+
+        try:
+            results = await self.send_batch(list(positions))
+            if not isinstance(results, (list, tuple)) or len(results) != len(positions):
+                raise ValueError(f"Expected {len(positions)} batch results, got {results!r}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for value, future in batch:
+            if not future.done():
+                future.set_result(results[positions[value]])
@@ -0,0 +1,139 @@
+"""End-to-end benchmark of all three agents on the scripted model and local stub APIs.
+
+Each agent runs its real tool and handoff path: the travel assistant calls its
+function tools, the triage agent hands off to a tutor, and the multi-tool
+assistant routes to the config-driven tools served by the local stub server.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_agents --turns 200 --concurrency 1 10 50
+    python -m benchmarks.bench_agents --compare benchmark_results/agents.json
+
+Results are saved as JSON; `--compare` flags metrics that regressed against an
+earlier run.
+"""
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+
+from agents import InputGuardrailTripwireTriggered, RunConfig, Runner
+
+import multi_tool_agent
+from agent1 import run_triage, verdict_cache
+from benchmarks.common import compare_results, load_results, print_table, save_results, summarize
+from mock_model import ScriptedModelProvider
+from stub_server import StubServer
+from travel_agent import travel_assistant
+
+MESSAGES = {
+    "travel": [
+        "What's the weather in Lisbon?",
+        "Any italian food in new york?",
+        "calculate 120 * 1.08",
+        "search for python",
+    ],
+    "triage": [
+        "Solve 3x + 5 = 20",
+        "Who was the first emperor of Rome?",
+        "What is the derivative of x^2?",
+    ],
+    "multi": [
+        "tell me facts about cats",
+        "what are the person details of Alice",
+        "country details for Bob",
+    ],
+}
+
+
+def make_turn(agent: str, run_config: RunConfig, assistant):
+    if agent == "travel":
+        return lambda message: Runner.run(travel_assistant, message, run_config=run_config)
+    if agent == "triage":
+        async def triage(message):
+            try:
+                return await run_triage(message, run_config=run_config, use_prefilter=False)
+            except InputGuardrailTripwireTriggered:
+                return None
+        return triage
+    return lambda message: multi_tool_agent.Runner.run(assistant, message, verbose=False)
+
+
+async def run_concurrent(turn, messages, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(message):
+        async with semaphore:
+            start = time.perf_counter()
+            await turn(message)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(m) for m in messages))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def measure_allocations(turn, messages, samples: int = 20) -> float:
+    """Average peak KiB allocated above the starting point, over sequential turns."""
+    tracemalloc.start()
+    peaks = []
+    for message in (messages * samples)[:samples]:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        await turn(message)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+
+async def run_agent(agent: str, args, tool_url_overrides):
+    run_config = RunConfig(model_provider=ScriptedModelProvider(latency=args.model_latency), tracing_disabled=True)
+    assistant = multi_tool_agent.build_assistant(tool_url_overrides)
+    # Response caching would hide the tool path after the first turn
+    multi_tool_agent.RESPONSE_CACHE.clear()
+    multi_tool_agent.RESPONSE_CACHE.max_size = 0
+    verdict_cache.store.max_size = 0
+    turn = make_turn(agent, run_config, assistant)
+    messages = (MESSAGES[agent] * args.turns)[:args.turns]
+
+    rows = []
+    for concurrency in args.concurrency:
+        summary = await run_concurrent(turn, messages, concurrency)
+        rows.append({"case": f"{agent}@{concurrency}", "agent": agent, "concurrency": concurrency, **summary})
+    peak_kib = await measure_allocations(turn, MESSAGES[agent])
+    for row in rows:
+        row["peak_alloc_kib_per_turn"] = peak_kib
+    await multi_tool_agent.close_http_client()
+    return rows
+
+
+def main(args):
+    rows = []
+    with StubServer(delay=args.tool_latency) as stub:
+        for agent in args.agents:
+            rows.extend(asyncio.run(run_agent(agent, args, stub.url_overrides())))
+
+    print_table("Agent turns", rows)
+    if args.compare and os.path.exists(args.compare):
+        comparison = compare_results(load_results(args.compare)["results"], rows, "case",
+                                     lower_is_better=["p50_ms", "p99_ms", "peak_alloc_kib_per_turn"],
+                                     higher_is_better=["throughput"], tolerance=args.tolerance)
+        print_table(f"Compared with {args.compare}", comparison)
+        if any(row["regression"] for row in comparison):
+            print("\nRegressions detected")
+    print(f"\nSaved to {save_results(args.name, rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", nargs="+", default=["travel", "triage", "multi"])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Simulated model latency in seconds")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Simulated upstream API latency in seconds")
+    parser.add_argument("--compare", help="Earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Relative change counted as a regression")
+    parser.add_argument("--name", default="agents", help="Results file name")
+    main(parser.parse_args())
@@ -0,0 +1,56 @@
+"""Calls/sec for concurrent name lookups with and without upstream batching.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batching --rounds 20 --delay 0.01
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import print_table, save_results, summarize
+from stub_server import StubServer
+from http_client import close_http_client
+
+
+async def main(args):
+    from multi_tool_agent import TOOL_CONFIGS, create_tool
+
+    rows = []
+    with StubServer(delay=args.delay) as server:
+        url = server.url_overrides()["get_details_of_a_person"]
+        # Caching is disabled so every lookup reaches the (batched) upstream path
+        base = dict(TOOL_CONFIGS["get_details_of_a_person"], url=url, cache=False)
+        modes = {
+            "unbatched": create_tool("get_details_of_a_person", dict(base, batch=None)),
+            "batched": create_tool("get_details_of_a_person", base),
+        }
+
+        for concurrency in args.concurrency:
+            for mode, tool in modes.items():
+                server.server.request_count = 0
+                latencies = []
+
+                async def one(i):
+                    start = time.perf_counter()
+                    await tool(name=f"name{i}")
+                    latencies.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                for _ in range(args.rounds):
+                    await asyncio.gather(*(one(i) for i in range(concurrency)))
+                summary = summarize(latencies, time.perf_counter() - start)
+                rows.append({"mode": mode, "concurrency": concurrency,
+                             "upstream_requests": server.server.request_count, **summary})
+        await close_http_client()
+
+    print_table("Name lookups", rows)
+    print(f"\nSaved to {save_results('batching', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--delay", type=float, default=0.01, help="Simulated upstream latency in seconds")
+    asyncio.run(main(parser.parse_args()))
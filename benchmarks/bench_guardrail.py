@@ -0,0 +1,122 @@
+"""Turn latency and guardrail model calls for the agent1 triage flow, on a stub model.
+
+Modes:
+    sdk          triage_agent with the original guardrail (one model call per turn)
+    speculative  run_triage: homework check (model + verdict cache) alongside triage,
+                 cancelling triage on a tripwire
+    prefiltered  run_triage with the local classifier in front of the verdict cache
+
+Run from the repository root:
+
+    python -m benchmarks.bench_guardrail --turns 200 --model-latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from agents import GuardrailFunctionOutput, InputGuardrail, InputGuardrailTripwireTriggered, RunConfig, Runner
+
+import agent1
+from benchmarks.common import print_table, save_results, summarize
+from mock_model import MockModel, MockModelProvider, text_message
+
+MESSAGES = [
+    "Solve 3x + 5 = 20 for x",
+    "Who won the war of 1812?",
+    "Can you explain the causes of the French revolution?",
+    "What is the derivative of x^2?",
+    "Tell me a joke about the weather",
+    "Hi! Any restaurant recommendations for tonight?",
+    "Why did the Roman empire fall?",
+    "What's a good movie to watch?",
+    "How do plants make food?",
+]
+
+OFF_TOPIC = ("joke", "restaurant", "movie")
+
+
+class GuardrailStubModel(MockModel):
+    """Says "not homework" for obviously off-topic messages."""
+
+    def _output(self, input, output_schema):
+        if output_schema is not None and not output_schema.is_plain_text():
+            text = agent1._input_text(input).lower()
+            is_homework = not any(word in text for word in OFF_TOPIC)
+            return text_message(json.dumps({"is_homework": is_homework, "reasoning": "stub"}))
+        return super()._output(input, output_schema)
+
+
+class StubProvider(MockModelProvider):
+    def __init__(self, latency: float):
+        self.model = GuardrailStubModel(latency)
+
+
+async def original_guardrail(ctx, agent, input_data):
+    result = await Runner.run(agent1.guardrail_agent, input_data, context=ctx.context,
+                              run_config=ctx.context.run_config)
+    final_output = result.final_output_as(agent1.HomeworkOutput)
+    return GuardrailFunctionOutput(output_info=final_output, tripwire_triggered=not final_output.is_homework)
+
+
+class Context:
+    def __init__(self, run_config):
+        self.run_config = run_config
+
+
+async def run_mode(mode: str, messages, latency: float, concurrency: int):
+    provider = StubProvider(latency)
+    run_config = RunConfig(model_provider=provider, tracing_disabled=True)
+    context = Context(run_config)
+    agent1.guardrail_stats = agent1.GuardrailStats()
+    agent1.verdict_cache.clear()
+    sdk_agent = agent1.triage_agent.clone(input_guardrails=[InputGuardrail(guardrail_function=original_guardrail)])
+
+    async def turn(message):
+        if mode == "sdk":
+            return await Runner.run(sdk_agent, message, context=context, run_config=run_config)
+        return await agent1.run_triage(message, context, run_config, use_prefilter=(mode == "prefiltered"))
+
+    latencies, blocked = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(message):
+        nonlocal blocked
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await turn(message)
+            except InputGuardrailTripwireTriggered:
+                blocked += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(m) for m in messages))
+    summary = summarize(latencies, time.perf_counter() - start)
+    # Let cancelled/abandoned runs settle so their model calls are counted
+    await asyncio.sleep(latency * 3)
+    return {
+        "mode": mode,
+        "blocked": blocked,
+        "model_calls": provider.model.calls,
+        "guardrail_model_calls": agent1.guardrail_stats.model_calls if mode != "sdk" else len(messages),
+        **summary,
+    }
+
+
+def main(args):
+    rng = random.Random(0)
+    messages = [rng.choice(MESSAGES) for _ in range(args.turns)]
+    rows = [asyncio.run(run_mode(mode, messages, args.model_latency, args.concurrency))
+            for mode in ("sdk", "speculative", "prefiltered")]
+    print_table("Triage turns", rows)
+    print(f"\nSaved to {save_results('guardrail', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    main(parser.parse_args())
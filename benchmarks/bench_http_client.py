@@ -0,0 +1,66 @@
+"""Compare the old blocking `requests.get` tool path with the pooled async client.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_http_client --requests 500 --concurrency 1 10 50 --delay 0.005
+"""
+import argparse
+import asyncio
+import time
+
+import requests
+
+from benchmarks.common import print_table, save_results, summarize
+from stub_server import StubServer
+from http_client import close_http_client
+
+
+async def blocking_tool(url: str):
+    # The pre-pool implementation: blocks the loop and opens a new connection per call
+    return requests.get(url, verify=False).json()
+
+
+async def run_load(tool, total: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await tool()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def main(args):
+    from multi_tool_agent import TOOL_CONFIGS, create_tool
+
+    rows = []
+    with StubServer(delay=args.delay) as server:
+        url = server.url_overrides()["get_details_of_a_person"]
+        # Every request reaches the pool: no response cache, batching or resilience layer in front of it
+        config = {key: value for key, value in TOOL_CONFIGS["get_details_of_a_person"].items()
+                  if key not in ("batch", "resilience")}
+        config.update(url=url, cache=False)
+        pooled_tool = create_tool("get_details_of_a_person", config)
+
+        for concurrency in args.concurrency:
+            blocking = await run_load(lambda: blocking_tool(f"{url}?name=alice"), args.requests, concurrency)
+            pooled = await run_load(lambda: pooled_tool(name="alice"), args.requests, concurrency)
+            rows.append({"path": "requests", "concurrency": concurrency, **blocking})
+            rows.append({"path": "pooled", "concurrency": concurrency, **pooled})
+        await close_http_client()
+
+    print_table("Tool HTTP path", rows)
+    print(f"\nSaved to {save_results('http_client', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--delay", type=float, default=0.005, help="Simulated upstream latency in seconds")
+    asyncio.run(main(parser.parse_args()))
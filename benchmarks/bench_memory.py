@@ -0,0 +1,131 @@
+"""Prompt size of a long conversation: full transcripts vs bounded, compacted history.
+
+A scripted travel conversation runs against the travel assistant with the
+local scripted model. "full transcript" resends `result.to_input_list()`
+plus the new message every turn, so its prompt grows with every turn and
+tool output. The memory modes replay recent turns within a token budget,
+fold older ones into a summary and keep one copy of each tool result.
+Tokens are estimated at four characters per token for both.
+
+The store section times saving and loading many conversations to SQLite,
+one transaction per conversation vs in bulk.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory --turns 60 --budgets 250 500 1000 --sessions 500
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from agents import RunConfig, Runner
+
+from benchmarks.common import percentile, print_table, save_results
+from conversation_memory import ConversationMemory, ConversationStore, estimate_input_tokens
+from mock_model import ScriptedModelProvider
+from travel_agent import travel_assistant
+
+QUESTIONS = [
+    "What's the weather in Paris?",
+    "Find me italian food in Paris",
+    "What is 120 * 1.08",
+    "Search the web for museums in Paris",
+    "What's the weather in Rome?",
+    "Find me thai restaurants in Rome",
+    "Calculate 45 + 80 + 32",
+    "Search the web for day trips from Rome",
+]
+
+
+async def run_conversation(turns: int, budget: int | None, run_config: RunConfig) -> dict:
+    memory = ConversationMemory("bench", budget) if budget else None
+    transcript: list = []
+    prompt_tokens, latencies = [], []
+    for turn in range(turns):
+        question = QUESTIONS[turn % len(QUESTIONS)]
+        if memory is None:
+            items = transcript + [{"role": "user", "content": question}]
+        else:
+            items = memory.build_input(question)
+        prompt_tokens.append(estimate_input_tokens(items))
+
+        start = time.perf_counter()
+        result = await Runner.run(travel_assistant, items, run_config=run_config)
+        latencies.append(time.perf_counter() - start)
+        if memory is None:
+            transcript = result.to_input_list()
+        else:
+            memory.record_result(question, result)
+
+    return {
+        "mode": f"memory budget={budget}" if budget else "full transcript",
+        "turns": turns,
+        "total_tokens": sum(prompt_tokens),
+        "last_turn_tokens": prompt_tokens[-1],
+        "max_turn_tokens": max(prompt_tokens),
+        "p50_turn_ms": percentile(latencies, 50) * 1000,
+        "summary_lines": len(memory.summary_lines) if memory else 0,
+        "tool_results": len(memory.tool_results) if memory else 0,
+    }
+
+
+def make_memories(sessions: int, turns: int) -> list:
+    memories = []
+    for index in range(sessions):
+        memory = ConversationMemory(f"session-{index}")
+        for turn in range(turns):
+            memory.build_input(QUESTIONS[turn % len(QUESTIONS)])
+            memory.record(QUESTIONS[turn % len(QUESTIONS)], f"Answer {turn} for session {index}.")
+        memories.append(memory)
+    return memories
+
+
+def store_rows(sessions: int, turns: int) -> list:
+    memories = make_memories(sessions, turns)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("per conversation", "bulk"):
+            store = ConversationStore(os.path.join(tmp, f"{mode.replace(' ', '_')}.db"))
+            start = time.perf_counter()
+            if mode == "bulk":
+                store.save_all(memories)
+            else:
+                for memory in memories:
+                    store.save(memory)
+            saved = time.perf_counter() - start
+
+            start = time.perf_counter()
+            if mode == "bulk":
+                loaded = len(store.load_all())
+            else:
+                loaded = len([store.load(memory.session_id) for memory in memories])
+            rows.append({"mode": mode, "sessions": loaded, "turns_each": turns,
+                         "save_ms": saved * 1000, "load_ms": (time.perf_counter() - start) * 1000})
+            store.close()
+    return rows
+
+
+def main(args):
+    run_config = RunConfig(model_provider=ScriptedModelProvider(), tracing_disabled=True)
+    rows = [asyncio.run(run_conversation(args.turns, budget, run_config)) for budget in [None] + args.budgets]
+    baseline = rows[0]["total_tokens"]
+    for row in rows:
+        row["saved_pct"] = (1 - row["total_tokens"] / baseline) * 100 if baseline else 0.0
+    print_table(f"Prompt tokens over a {args.turns}-turn conversation", rows)
+
+    store = store_rows(args.sessions, args.store_turns)
+    print_table("Conversation store: save and load", store)
+
+    print(f"\nSaved to {save_results('memory', rows + store)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[250, 500, 1000],
+                        help="History token budgets to compare against the full transcript")
+    parser.add_argument("--sessions", type=int, default=500, help="Conversations saved and loaded by the store")
+    parser.add_argument("--store-turns", type=int, default=10, help="Turns per stored conversation")
+    main(parser.parse_args())
@@ -0,0 +1,92 @@
+"""Parameter extraction: the old per-parameter scan vs the single-pass extractor.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_param_extraction --params 1 5 20
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import print_table, save_results
+from param_extractor import ParameterExtractor
+
+TEMPLATES = [
+    "what is the age of {name}",
+    "tell me the country details for {name} please",
+    "name is {name} and I want to know the age",
+    "give me facts about cats",
+    "can you look up the person with name {name} for me",
+    "How old is someone called {name}? And what country are they from?",
+]
+NAMES = ["Alice", "Bob", "Chidi", "Dolores", "Eun-ji", "Farouk", "Grace", "Hiroshi"]
+
+
+def legacy_extract_parameter(input_text: str, param_name: str) -> str:
+    # The implementation previously on Runner._extract_parameter
+    parts = input_text.lower().split()
+    if param_name == "name":
+        for i, part in enumerate(parts):
+            if part in ["of", "for", "about"] and i+1 < len(parts):
+                return parts[i+1]
+        for i, part in enumerate(parts):
+            if part == param_name and i+2 < len(parts) and parts[i+1] in ["is", "of", "for"]:
+                return parts[i+2]
+            if part in ["for", "about", "with"] and i+1 < len(parts) and parts[i+1] == param_name and i+2 < len(parts):
+                return parts[i+2]
+    defaults = {"name": "meelad"}
+    return defaults.get(param_name, "")
+
+
+def corpus(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(name=rng.choice(NAMES)) for _ in range(size)]
+
+
+def main(args):
+    messages = corpus(args.messages)
+    rows = []
+    for param_count in args.params:
+        params = ["name"] + [f"param{i}" for i in range(1, param_count)]
+        # Every tool re-extracted each of its parameters in the old Runner
+        lookups = [p for _ in range(args.tools) for p in params]
+
+        start = time.perf_counter()
+        for message in messages:
+            for param in lookups:
+                legacy_extract_parameter(message, param)
+        legacy = (time.perf_counter() - start) / len(messages)
+
+        cold = ParameterExtractor(params, memo_size=0)
+        start = time.perf_counter()
+        for message in messages:
+            cold.extract(message)
+        single_pass = (time.perf_counter() - start) / len(messages)
+
+        warm = ParameterExtractor(params)
+        for message in messages:
+            warm.extract(message)
+        start = time.perf_counter()
+        for message in messages:
+            warm.extract(message)
+        memoized = (time.perf_counter() - start) / len(messages)
+
+        rows.append({
+            "params": param_count,
+            "tools": args.tools,
+            "legacy_us": legacy * 1e6,
+            "single_pass_us": single_pass * 1e6,
+            "memoized_us": memoized * 1e6,
+            "speedup": legacy / single_pass if single_pass else 0.0,
+        })
+
+    print_table("Per-message parameter extraction", rows)
+    print(f"\nSaved to {save_results('param_extraction', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--tools", type=int, default=3)
+    parser.add_argument("--params", type=int, nargs="+", default=[1, 5, 20])
+    main(parser.parse_args())
@@ -0,0 +1,136 @@
+"""Streaming projection of upstream JSON responses down to the declared fields.
+
+End to end, each tool in TOOL_CONFIGS is called against the stub API, whose
+responses are padded with `--padding` bytes of undeclared metadata the way
+real APIs return much more than a tool declares. Tools run with projection
+on and with "project": false, and report bytes received vs kept per call
+(tokens estimated at four bytes per token) and call latency.
+
+The parser section compares JSONProjector, fed in 64 KiB chunks, against
+json.loads of the whole body on large documents: time, and peak memory
+traced separately since tracemalloc slows allocation down.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_projection --calls 200 --padding 4096 --sizes 64 1024 8192
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+import multi_tool_agent
+from benchmarks.common import percentile, print_table, save_results
+from http_client import close_http_client
+from json_projection import JSONProjector
+from response_cache import ResponseCache
+from stub_server import StubHandler, StubServer
+from tool_metrics import MetricsRegistry
+
+# Chunk size the parser section feeds the projector, like a streamed body
+CHUNK_BYTES = 1 << 16
+
+
+class PaddedHandler(StubHandler):
+    """Stub responses with an undeclared "metadata" field of `server.padding` bytes."""
+
+    def _send(self, status: int, body) -> None:
+        pad = lambda item: dict(item, metadata="x" * self.server.padding) if isinstance(item, dict) else item
+        body = [pad(item) for item in body] if isinstance(body, list) else pad(body)
+        super()._send(status, body)
+
+
+async def call_tools(stub: StubServer, project: bool, args) -> list:
+    rows = []
+    overrides = stub.url_overrides()
+    for tool_id, config in multi_tool_agent.TOOL_CONFIGS.items():
+        config = dict(config, url=overrides[tool_id], cache=False, batch=None, project=project)
+        config.pop("resilience", None)
+        registry = MetricsRegistry()
+        tool = multi_tool_agent.create_tool(tool_id, config, ResponseCache(), registry)
+        latencies = []
+        for i in range(args.calls):
+            start = time.perf_counter()
+            result = await tool(name=f"person{i}")
+            latencies.append(time.perf_counter() - start)
+            assert isinstance(result, dict), result
+        snapshot = registry.snapshot()[tool_id]
+        received = snapshot["payload_bytes_total"] / args.calls
+        kept = snapshot["kept_bytes_total"] / args.calls
+        rows.append({
+            "tool": tool_id,
+            "mode": "projected" if project else "whole body",
+            "received_bytes": received,
+            "kept_bytes": kept,
+            "kept_tokens": kept / 4,
+            "saved_pct": (1 - kept / received) * 100 if received else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        })
+    await close_http_client()
+    return rows
+
+
+def document(size_kb: int) -> bytes:
+    """A response with a few declared fields and `size_kb` KiB of records the tool doesn't use."""
+    records = []
+    doc = {"name": "Alice", "age": 35, "count": 1005, "records": records}
+    while len(records) * 80 < size_kb * 1024:
+        records.append({"id": len(records), "label": f"record-{len(records)}", "score": len(records) * 0.5})
+    return json.dumps(doc).encode()
+
+
+def project(body: bytes) -> dict:
+    projector = JSONProjector({"name", "age", "count"}, max_bytes=len(body))
+    for start in range(0, len(body), CHUNK_BYTES):
+        projector.feed(body[start:start + CHUNK_BYTES])
+    return projector.close()
+
+
+def parse_whole(body: bytes) -> dict:
+    doc = json.loads(body)
+    return {key: doc[key] for key in ("name", "age", "count")}
+
+
+def parser_rows(args) -> list:
+    rows = []
+    for size_kb in args.sizes:
+        body = document(size_kb)
+        for name, parse in (("json.loads", parse_whole), ("JSONProjector", project)):
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                result = parse(body)
+                timings.append(time.perf_counter() - start)
+            assert result == {"name": "Alice", "age": 35, "count": 1005}
+            tracemalloc.start()
+            parse(body)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append({"body_kb": len(body) // 1024, "parser": name,
+                         "median_ms": sorted(timings)[len(timings) // 2] * 1000, "peak_kb": peak / 1024})
+    return rows
+
+
+def main(args):
+    with StubServer(handler=PaddedHandler) as stub:
+        stub.server.padding = args.padding
+        rows = []
+        for project_fields in (False, True):
+            rows += asyncio.run(call_tools(stub, project_fields, args))
+    print_table(f"Tool responses per call ({args.padding} bytes of undeclared metadata)", rows)
+
+    parsing = parser_rows(args)
+    print_table(f"Parsing large bodies ({CHUNK_BYTES // 1024} KiB chunks)", parsing)
+
+    print(f"\nSaved to {save_results('projection', rows + parsing)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="Calls per tool and mode")
+    parser.add_argument("--padding", type=int, default=4096, help="Bytes of undeclared metadata per response")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 1024, 8192], help="Parser body sizes in KiB")
+    parser.add_argument("--repeats", type=int, default=5)
+    main(parser.parse_args())
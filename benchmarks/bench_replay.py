@@ -0,0 +1,115 @@
+"""Record a server workload, then replay it offline at several speeds.
+
+The workload runs the travel, triage and multi-tool agents in-process
+against the stub APIs and a scripted model with simulated latency, once
+without recording and once recording to a traffic log. The log is then
+replayed with no stub server and no model: `live` vs `recording` is the cost
+of recording, and each replay row reports its wall time against the
+recorded span, how requests and model calls were matched, and how many
+answers differ from the recorded ones. The stub's cat facts are random, so
+multi-tool answers can differ when concurrent turns take the recorded
+responses in another order.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_replay --sessions 20 --turns 3 --speeds 1 10 0
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import percentile, print_table, save_results
+from mock_model import ScriptedModelProvider
+from server import create_app
+from stub_server import StubServer
+from traffic_log import read_traffic_log, replay, reset_caches
+
+MESSAGES = {
+    "travel": ["What's the weather in Lisbon?", "Any Italian restaurants in Rome?"],
+    "triage": ["Who was the first president of the United States?", "Solve 3x + 5 = 20"],
+    "multi": ["What is the age of Alice?", "How old is Bob?"],
+}
+
+
+async def run_workload(app, args) -> dict:
+    turns, latencies = 0, []
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     timeout=None) as client:
+            async def conversation(agent: str, session: int) -> None:
+                nonlocal turns
+                for turn in range(args.turns):
+                    message = MESSAGES[agent][(session + turn) % len(MESSAGES[agent])]
+                    start = time.perf_counter()
+                    response = await client.post(f"/agents/{agent}/sessions/s{session}/messages",
+                                                 json={"message": message})
+                    assert "event: output" in response.text, response.text
+                    latencies.append(time.perf_counter() - start)
+                    turns += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(conversation(agent, session)
+                                   for agent in MESSAGES for session in range(args.sessions)))
+            elapsed = time.perf_counter() - start
+    return {"turns": turns, "elapsed_s": elapsed, "p50_ms": percentile(latencies, 50) * 1000}
+
+
+async def record(stub: StubServer, path, args) -> dict:
+    reset_caches()
+    app = create_app(ScriptedModelProvider(latency=args.model_latency), stub.url_overrides(),
+                     max_queued_turns=10000, traffic_log=path)
+    return await run_workload(app, args)
+
+
+async def replay_rows(records: list, args) -> list:
+    rows = []
+    for speed in args.speeds:
+        reset_caches()
+        report = await replay(records, speed)
+        rows.append({
+            "speed": f"x{speed:g}" if speed else "no waits",
+            "turns": report.turns,
+            "elapsed_s": report.elapsed,
+            "recorded_s": report.recorded,
+            "p50_ms": percentile(report.latencies, 50) * 1000,
+            "errors": report.errors,
+            "mismatches": report.mismatches,
+            "http_exact": report.http.get("exact", 0),
+            "http_missing": report.http.get("missing", 0),
+            "model_exact": report.model.get("exact", 0),
+            "model_agent": report.model.get("agent", 0),
+            "model_missing": report.model.get("missing", 0),
+        })
+    return rows
+
+
+async def run(args, path: str) -> tuple:
+    # One event loop throughout: the SSE responses bind to the first loop they run in
+    with StubServer(delay=args.tool_latency) as stub:
+        live = [dict(mode="live", **await record(stub, None, args)),
+                dict(mode="recording", **await record(stub, path, args))]
+    records = read_traffic_log(path)
+    print(f"Recorded {len(records) - 1} records in {os.path.getsize(path)} bytes")
+    return live, await replay_rows(records, args)
+
+
+def main(args):
+    path = os.path.join(tempfile.mkdtemp(), "traffic.jsonl.gz")
+    live, replayed = asyncio.run(run(args, path))
+    print_table(f"Workload: {args.sessions} sessions x {args.turns} turns per agent", live)
+    print_table("Replays of the recording, no stub server or model", replayed)
+    print(f"\nSaved to {save_results('replay', live + replayed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions per agent")
+    parser.add_argument("--turns", type=int, default=3, help="Turns per session")
+    parser.add_argument("--speeds", type=float, nargs="+", default=[1, 10, 0], help="Replay speeds, 0 for no waits")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Seconds per scripted model call")
+    parser.add_argument("--tool-latency", type=float, default=0.01, help="Seconds per stub API response")
+    main(parser.parse_args())
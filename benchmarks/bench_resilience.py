@@ -0,0 +1,117 @@
+"""Circuit breaker, adaptive concurrency and hedging against a fault-injecting stub API.
+
+Each scenario drives concurrent lookups through the age tool twice: once
+configured without "resilience" and once with it. Response caching is off so
+every call reaches the stub.
+
+Scenarios:
+    healthy  - no faults
+    slow     - a share of requests take an extra --slow-delay seconds (hedging cuts the tail)
+    outage   - every request fails after a warm-up (the breaker fails fast and serves fallbacks)
+
+Run from the repository root:
+
+    python -m benchmarks.bench_resilience --calls 400 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+
+import multi_tool_agent
+from benchmarks.common import percentile, print_table, save_results
+from resilience import reset_upstreams, upstream_stats
+from stub_server import Fault, StubServer
+
+SCENARIOS = ["healthy", "slow", "outage"]
+
+
+def tool_config(url: str, resilient: bool, args) -> dict:
+    config = dict(multi_tool_agent.TOOL_CONFIGS["get_details_of_a_person"], url=url, cache=False, batch=None)
+    config.pop("resilience", None)
+    if resilient:
+        config["resilience"] = {
+            "breaker": {"failure_threshold": 5, "reset_timeout": 1.0},
+            "concurrency": {"initial": args.concurrency, "max": args.concurrency * 2},
+            "hedge": {"after": args.hedge_after},
+        }
+    return config
+
+
+async def drive(tool, names, concurrency: int):
+    latencies, ok = [], 0
+    queue = list(names)
+
+    async def worker():
+        nonlocal ok
+        while queue:
+            name = queue.pop()
+            start = time.perf_counter()
+            result = await tool(name=name)
+            latencies.append(time.perf_counter() - start)
+            # Without resilience an error status comes back as the stub's {"error": ...} body
+            ok += isinstance(result, dict) and "error" not in result
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, ok, time.perf_counter() - start
+
+
+async def run_scenario(stub: StubServer, scenario: str, resilient: bool, args) -> dict:
+    reset_upstreams()
+    multi_tool_agent.LAST_KNOWN_GOOD.clear()
+    stub.faults.clear()
+    tool = multi_tool_agent.create_tool("get_details_of_a_person",
+                                        tool_config(stub.url_overrides()["get_details_of_a_person"], resilient, args))
+    names = [f"person{i % args.distinct}" for i in range(args.calls)]
+
+    # Warm up so fallbacks have something to serve
+    await drive(tool, names[:args.distinct], args.concurrency)
+    if scenario == "slow":
+        stub.faults["agify"] = Fault(slow_rate=args.slow_rate, slow_delay=args.slow_delay)
+    elif scenario == "outage":
+        stub.faults["agify"] = Fault(error_rate=1.0)
+
+    requests_before = stub.server.request_count
+    latencies, ok, elapsed = await drive(tool, names, args.concurrency)
+    stats = next(iter(upstream_stats().values()), {})
+    return {
+        "scenario": scenario,
+        "mode": "resilient" if resilient else "plain",
+        "ok_pct": ok / len(names) * 100,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "elapsed_s": elapsed,
+        "upstream_requests": stub.server.request_count - requests_before,
+        "hedges": stats.get("hedges", 0),
+        "fallbacks": stats.get("fallbacks", 0),
+        "rejected": stats.get("rejected", 0),
+    }
+
+
+async def run_all(stub: StubServer, args) -> list:
+    rows = []
+    for scenario in args.scenarios:
+        for resilient in (False, True):
+            rows.append(await run_scenario(stub, scenario, resilient, args))
+    await multi_tool_agent.close_http_client()
+    return rows
+
+
+def main(args):
+    with StubServer(delay=args.latency) as stub:
+        rows = asyncio.run(run_all(stub, args))
+    print_table("Resilience under injected faults", rows)
+    print(f"\nSaved to {save_results('resilience', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--distinct", type=int, default=50, help="Distinct names looked up")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="Normal stub latency in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-delay", type=float, default=1.0)
+    parser.add_argument("--hedge-after", type=float, default=0.25)
+    main(parser.parse_args())
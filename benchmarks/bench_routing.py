@@ -0,0 +1,84 @@
+"""Per-message routing cost of substring scanning vs the inverted token index.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_routing --tools 10 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import print_table, save_results
+from tool_router import ToolRouter
+
+VERBS = ["get", "list", "find", "lookup", "fetch", "search"]
+NOUNS = ["weather", "country", "person", "cats", "flights", "hotels", "stocks", "news", "recipes",
+         "movies", "books", "jobs", "cars", "trains", "events", "museums", "prices", "taxes"]
+QUALIFIERS = ["details", "facts", "history", "forecast", "ratings", "reviews", "summary", "stats"]
+
+MESSAGES = [
+    "tell me some facts about cats",
+    "what are the weather forecast details for Paris",
+    "get the country details of Alice",
+    "hello there, how are you today?",
+    "show me movie ratings and book reviews for this weekend",
+]
+
+
+def synthetic_tool_names(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        names.append(f"{rng.choice(VERBS)}_{rng.choice(QUALIFIERS)}_of_{rng.choice(NOUNS)}_{i}")
+    return names
+
+
+def substring_route(tool_names, user_input):
+    # The pre-index implementation from Runner.run
+    user_input_lower = user_input.lower()
+    return [name for name in tool_names if any(keyword in user_input_lower for keyword in name.split('_'))]
+
+
+def time_per_message(route, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            route(message)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES))
+
+
+def main(args):
+    rows = []
+    for count in args.tools:
+        names = synthetic_tool_names(count)
+        start = time.perf_counter()
+        router = ToolRouter()
+        for name in names:
+            router.add_tool(name)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        router.add_tool(f"get_facts_of_comets_{count}")
+        incremental = time.perf_counter() - start
+
+        repeat = max(1, args.budget // count)
+        scan = time_per_message(lambda m: substring_route(names, m), repeat)
+        indexed = time_per_message(router.route, repeat)
+        rows.append({
+            "tools": count,
+            "build_ms": build * 1000,
+            "add_one_us": incremental * 1e6,
+            "scan_us_per_msg": scan * 1e6,
+            "index_us_per_msg": indexed * 1e6,
+            "speedup": scan / indexed if indexed else 0.0,
+        })
+
+    print_table("Tool routing", rows)
+    print(f"\nSaved to {save_results('routing', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tools", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--budget", type=int, default=20000, help="Tool-scans per size, controls repetitions")
+    main(parser.parse_args())
@@ -0,0 +1,91 @@
+"""Arithmetic evaluation: the old restricted eval() path vs the compiled, cached safe engine.
+
+Expressions are drawn from a pool of itinerary-style conversions, so repeats
+exercise the compiled-expression cache the way repeated questions do.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_safe_eval --expressions 10000 --distinct 50 500
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import print_table, save_results
+from safe_eval import compile_expression, evaluate, evaluate_many
+
+TEMPLATES = [
+    "{a} * {rate}",
+    "round({a} * {rate}, 2)",
+    "({a} + {b}) / {n}",
+    "max({a}, {b}) - min({a}, {b})",
+    "abs({a} - {b}) * {rate}",
+    "{a} * {n} + {b} * {n}",
+]
+HOSTILE = ["9 ** 9 ** 9", "10 ** 1000000", "round(1, -10 ** 7)", "().__class__", "__import__('os')"]
+
+
+def legacy_calculate(expression: str):
+    # The implementation previously in travel_agent.calculate
+    allowed_names = {"abs": abs, "round": round, "min": min, "max": max}
+    return eval(expression, {"__builtins__": {}}, allowed_names)
+
+
+def pool(distinct: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(a=rng.randint(10, 5000), b=rng.randint(10, 5000),
+                                     rate=round(rng.uniform(0.5, 1.5), 4), n=rng.randint(2, 30))
+        for _ in range(distinct)
+    ]
+
+
+def per_call_us(fn, expressions) -> float:
+    start = time.perf_counter()
+    for expression in expressions:
+        fn(expression)
+    return (time.perf_counter() - start) / len(expressions) * 1e6
+
+
+def main(args):
+    rows = []
+    for distinct in args.distinct:
+        expressions_pool = pool(distinct)
+        rng = random.Random(1)
+        expressions = [rng.choice(expressions_pool) for _ in range(args.expressions)]
+
+        legacy = per_call_us(legacy_calculate, expressions)
+        compile_expression.cache_clear()
+        cold = per_call_us(evaluate, expressions_pool)
+        warm = per_call_us(evaluate, expressions)
+        start = time.perf_counter()
+        for i in range(0, len(expressions), args.batch):
+            evaluate_many(expressions[i:i + args.batch])
+        batch = (time.perf_counter() - start) / len(expressions) * 1e6
+
+        rows.append({
+            "distinct": distinct,
+            "eval_us": legacy,
+            "safe_cold_us": cold,
+            "safe_warm_us": warm,
+            "safe_batch_us": batch,
+            "speedup": legacy / warm,
+        })
+
+    # Hostile inputs are rejected before or during evaluation instead of pinning a core
+    start = time.perf_counter()
+    rejected = sum(isinstance(result, Exception) for result in evaluate_many(HOSTILE))
+    hostile_us = (time.perf_counter() - start) / len(HOSTILE) * 1e6
+    assert rejected == len(HOSTILE) and hostile_us < 1e5, (rejected, hostile_us)
+
+    print_table("Safe arithmetic evaluation", rows)
+    print(f"\nHostile expressions rejected: {rejected}/{len(HOSTILE)} ({hostile_us:.2f} us each)")
+    print(f"\nSaved to {save_results('safe_eval', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expressions", type=int, default=10000)
+    parser.add_argument("--distinct", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--batch", type=int, default=20, help="Expressions per evaluate_many call")
+    main(parser.parse_args())
@@ -0,0 +1,131 @@
+"""Load test for the HTTP/SSE server with a mocked model backend.
+
+Starts the server in-process on a free port, points the multi-tool assistant
+at the local stub APIs and drives concurrent sessions through SSE turns.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_server --sessions 50 200 --turns 3 --model-latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.common import percentile, print_table, save_results
+from stub_server import StubServer
+from mock_model import MockModelProvider
+from server import create_app
+
+MESSAGES = {
+    "travel": "What's the weather in Lisbon?",
+    "triage": "Who was the first president of the United States?",
+    "multi": "What is the age of Alice?",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread:
+    def __init__(self, app, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def sse_turn(client: httpx.AsyncClient, agent: str, session_id: str, message: str):
+    """Send one message and read its event stream. Returns (status, first_event_s, total_s)."""
+    start = time.perf_counter()
+    first_event = None
+    async with client.stream("POST", f"/agents/{agent}/sessions/{session_id}/messages",
+                             json={"message": message}) as response:
+        if response.status_code != 200:
+            await response.aread()
+            return response.status_code, None, time.perf_counter() - start
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line.split(":", 1)[1].strip()
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+            elif line.startswith("data:") and event in ("done", "error"):
+                status = 200 if event == "done" else 500
+                return status, first_event, time.perf_counter() - start
+    return 500, first_event, time.perf_counter() - start
+
+
+async def run_load(base_url: str, agent: str, sessions: int, turns: int):
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        latencies, rejected, errors = [], 0, 0
+
+        async def conversation(i: int):
+            nonlocal rejected, errors
+            for _ in range(turns):
+                status, _, elapsed = await sse_turn(client, agent, f"load-{i}", MESSAGES[agent])
+                if status == 200:
+                    latencies.append(elapsed)
+                elif status == 503:
+                    rejected += 1
+                else:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(conversation(i) for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "agent": agent,
+        "sessions": sessions,
+        "turns": len(latencies),
+        "rejected": rejected,
+        "errors": errors,
+        "sessions_per_s": sessions / elapsed,
+        "turns_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main(args):
+    rows = []
+    with StubServer(delay=args.tool_latency) as stub:
+        app = create_app(MockModelProvider(latency=args.model_latency), stub.url_overrides(),
+                         max_concurrent_turns=args.max_concurrent_turns)
+        port = free_port()
+        with ServerThread(app, port):
+            for agent in args.agents:
+                for sessions in args.sessions:
+                    rows.append(asyncio.run(run_load(f"http://127.0.0.1:{port}", agent, sessions, args.turns)))
+
+    print_table("Server load", rows)
+    print(f"\nSaved to {save_results('server', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", nargs="+", default=["travel", "triage", "multi"])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--tool-latency", type=float, default=0.01)
+    parser.add_argument("--max-concurrent-turns", type=int, default=64)
+    main(parser.parse_args())
@@ -0,0 +1,148 @@
+"""Cold-start cost of the entry points: import time, its breakdown, and time to first response.
+
+Every measurement runs in a fresh interpreter, so nothing is shared between
+runs except the OS file cache (and, for the "desc-cache" mode, the on-disk
+tool description cache).
+
+- imports: wall time of `import <module>` per entry point, plus the Agents
+  SDK on its own, which the multi-tool assistant and a lazy server no longer
+  import at startup.
+- breakdown: cumulative `-X importtime` per top-level package for one module.
+- first response: process start to the first multi-tool answer against the
+  stub APIs, calling the assistant directly or through the server, eagerly
+  built or lazy.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from statistics import median
+
+from benchmarks.common import print_table, save_results
+from stub_server import StubServer
+
+MODULES = ["multi_tool_agent", "server", "travel_agent", "agent1", "agents"]
+
+MESSAGE = "What is the age of Alice?"
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+# Prints {"import": s, "build": s, "first_response": s}, each measured from interpreter start
+FIRST_RESPONSE_SCRIPT = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+target, lazy, overrides, message = sys.argv[1], sys.argv[2] == "1", json.loads(sys.argv[3]), sys.argv[4]
+marks = {}
+
+async def main():
+    if target == "assistant":
+        import multi_tool_agent
+        marks["import"] = time.perf_counter() - start
+        assistant = multi_tool_agent.build_assistant(overrides, lazy=lazy)
+        marks["build"] = time.perf_counter() - start
+        await multi_tool_agent.Runner.run(assistant, message, verbose=False)
+    else:
+        import httpx
+        import server
+        marks["import"] = time.perf_counter() - start
+        app = server.create_app(tool_url_overrides=overrides, lazy=lazy)
+        marks["build"] = time.perf_counter() - start
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app") as client:
+            response = await client.post("/agents/multi/sessions/s1/messages", json={"message": message})
+            assert "event: done" in response.text, response.text
+    marks["first_response"] = time.perf_counter() - start
+    await __import__("http_client").close_http_client()
+
+asyncio.run(main())
+print(json.dumps(marks))
+"""
+
+
+def run_python(args, env=None) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True,
+                          env=dict(os.environ, **(env or {})))
+
+
+def import_rows(runs: int) -> list:
+    rows = []
+    for module in MODULES:
+        times = [float(run_python(["-c", IMPORT_SCRIPT.format(module=module)]).stdout) for _ in range(runs)]
+        rows.append({"module": module, "import_ms": median(times) * 1000, "min_ms": min(times) * 1000})
+    return rows
+
+
+def importtime_breakdown(module: str, top: int) -> list:
+    """Sum `-X importtime` self time per top-level package."""
+    stderr = run_python(["-X", "importtime", "-c", f"import {module}"]).stderr
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        if self_us.strip().isdigit():
+            totals[name.strip().split(".")[0]] += int(self_us)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": name, "self_ms": us / 1000} for name, us in ranked]
+
+
+def first_response_rows(overrides: dict, runs: int) -> list:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        description_cache = os.path.join(tmp, "descriptions.json")
+        modes = [
+            ("assistant", "eager", False, {}),
+            ("assistant", "lazy", True, {}),
+            ("assistant", "lazy+desc-cache", True, {"TOOL_DESCRIPTION_CACHE": description_cache}),
+            ("server", "eager", False, {}),
+            ("server", "lazy", True, {}),
+        ]
+        for target, mode, lazy, env in modes:
+            samples = defaultdict(list)
+            for _ in range(runs):
+                output = run_python(["-c", FIRST_RESPONSE_SCRIPT, target, "1" if lazy else "0",
+                                     json.dumps(overrides), MESSAGE], env).stdout
+                for key, value in json.loads(output.strip().splitlines()[-1]).items():
+                    samples[key].append(value)
+            rows.append({
+                "target": target,
+                "mode": mode,
+                "import_ms": median(samples["import"]) * 1000,
+                "ready_ms": median(samples["build"]) * 1000,
+                "first_response_ms": median(samples["first_response"]) * 1000,
+            })
+    return rows
+
+
+def main(args):
+    imports = import_rows(args.runs)
+    print_table("Import time per entry point (median of fresh interpreters)", imports)
+
+    breakdown = importtime_breakdown(args.breakdown, args.top)
+    print_table(f"-X importtime breakdown of {args.breakdown} (self time per top-level package)", breakdown)
+
+    with StubServer() as stub:
+        first_response = first_response_rows(stub.url_overrides(), args.runs)
+    print_table(f"Time to first response: '{MESSAGE}'", first_response)
+
+    path = save_results("startup", imports + breakdown + first_response)
+    print(f"\nSaved to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--breakdown", default="server", help="Module to break down with -X importtime")
+    parser.add_argument("--top", type=int, default=12)
+    main(parser.parse_args())
@@ -0,0 +1,120 @@
+"""Time to first byte vs total latency, blocking vs streamed, for all three front ends.
+
+The scripted model streams its answer word by word and the stub APIs answer
+with different latencies, so streaming shows the first tool result or token
+long before the turn completes. In blocking mode nothing is shown until the
+turn is done, so TTFB equals the total latency.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_streaming --turns 20 --model-latency 0.05 --token-latency 0.005
+"""
+import argparse
+import asyncio
+import time
+
+from agents import RunConfig, Runner
+
+import multi_tool_agent
+from agent1 import run_triage, run_triage_streamed, verdict_cache
+from benchmarks.common import percentile, print_table, save_results
+from mock_model import ScriptedModelProvider
+from streaming import StreamTiming, run_streamed
+from stub_server import StubServer
+from travel_agent import travel_assistant
+
+MESSAGES = {
+    "travel": "What's the weather in Lisbon?",
+    "triage": "Who was the first emperor of Rome in history?",
+    "multi": "What is the age of Alice?",
+}
+
+
+async def blocking_turn(run) -> StreamTiming:
+    timing = StreamTiming()
+    await run()
+    timing.finish()
+    return timing
+
+
+async def streamed_turn(events) -> StreamTiming:
+    timing = StreamTiming()
+    async for event in events:
+        timing.observe(event)
+    timing.finish()
+    return timing
+
+
+def row(agent: str, mode: str, timings) -> dict:
+    ttfb = [t.ttfb for t in timings]
+    total = [t.total for t in timings]
+    return {
+        "agent": agent,
+        "mode": mode,
+        "ttfb_p50_ms": percentile(ttfb, 50) * 1000,
+        "ttfb_p95_ms": percentile(ttfb, 95) * 1000,
+        "total_p50_ms": percentile(total, 50) * 1000,
+        "total_p95_ms": percentile(total, 95) * 1000,
+    }
+
+
+async def run_agent(agent: str, mode: str, turns: int, run_config: RunConfig, assistant) -> dict:
+    message = MESSAGES[agent]
+    timings = []
+    for _ in range(turns):
+        # Each turn should reach the model, not the verdict cache
+        verdict_cache.clear()
+        if agent == "travel":
+            if mode == "blocking":
+                timing = await blocking_turn(lambda: Runner.run(travel_assistant, message, run_config=run_config))
+            else:
+                timing = await streamed_turn(run_streamed(travel_assistant, message, run_config=run_config))
+        elif agent == "triage":
+            if mode == "blocking":
+                timing = await blocking_turn(lambda: run_triage(message, run_config=run_config))
+            else:
+                timing = await streamed_turn(run_triage_streamed(message, run_config=run_config))
+        else:
+            multi_tool_agent.RESPONSE_CACHE.clear()
+            if mode == "blocking":
+                timing = await blocking_turn(lambda: multi_tool_agent.Runner.run(assistant, message, verbose=False))
+            else:
+                timing = await streamed_turn(multi_tool_agent.Runner.run_streamed(assistant, message))
+        timings.append(timing)
+    return row(agent, mode, timings)
+
+
+async def run_all(args, assistant) -> list:
+    run_config = RunConfig(
+        model_provider=ScriptedModelProvider(latency=args.model_latency, token_latency=args.token_latency),
+        tracing_disabled=True,
+    )
+    rows = []
+    for agent in args.agents:
+        for mode in ("blocking", "streamed"):
+            rows.append(await run_agent(agent, mode, args.turns, run_config, assistant))
+    await multi_tool_agent.close_http_client()
+    return rows
+
+
+def main(args):
+    delays = {"catfact": args.tool_latency, "agify": args.tool_latency * 2, "nationalize": args.tool_latency * 4}
+    with StubServer(delays=delays) as stub:
+        assistant = multi_tool_agent.build_assistant(stub.url_overrides())
+        start = time.perf_counter()
+        rows = asyncio.run(run_all(args, assistant))
+        elapsed = time.perf_counter() - start
+
+    print_table("Streaming: time to first byte vs total", rows)
+    print(f"\nFinished in {elapsed:.1f}s")
+    print(f"Saved to {save_results('streaming', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", nargs="+", default=["travel", "triage", "multi"])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--model-latency", type=float, default=0.05)
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--tool-latency", type=float, default=0.02, help="Fastest stub API latency; others are 2x and 4x")
+    main(parser.parse_args())
@@ -0,0 +1,135 @@
+"""Loading and hot-reloading tool configs from files, at thousands of tools.
+
+Generated tools are spread over files of `--per-file` tools each. For every
+size this measures:
+
+- initial load: scan, parse and validate every file, compile and build every tool.
+- idle poll: a scan when nothing changed (one stat per file).
+- one-tool reload: edit a single tool's URL, then scan and swap it in.
+- full rebuild: what a restart or a rebuild-everything reload pays, parsing
+  every file and building a new assistant from scratch.
+- memory per tool: tracemalloc growth of the initial load, divided by the
+  tool count, with tools built eagerly or lazily (on first call).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tool_config --tools 100 1000 5000 --per-file 100 --format yaml
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from statistics import median
+
+import multi_tool_agent
+from benchmarks.common import print_table, save_results
+from tool_config import ToolConfigSource, load_tool_configs
+
+
+def tool_config(index: int, url: str) -> dict:
+    return {
+        "description": f"Look up record {index} for a person",
+        "url": url,
+        "kwargs": [{"name": "name", "description": "The name of the person"}],
+        "response": [{"name": "name", "description": "The name"}, {"name": "value", "description": "The value"}],
+        "cache": {"ttl": 3600},
+        "batch": {"param": "name", "max_size": 10, "window": 0.005},
+    }
+
+
+def write_file(path: str, tools: dict, fmt: str) -> None:
+    with open(path, "w") as f:
+        if fmt == "yaml":
+            import yaml
+            yaml.safe_dump(tools, f)
+        else:
+            json.dump(tools, f)
+
+
+def write_tools(directory: str, count: int, per_file: int, fmt: str) -> list:
+    paths = []
+    for start in range(0, count, per_file):
+        tools = {f"lookup_{directory[-6:]}_{i}": tool_config(i, f"https://api.example.com/{i}")
+                 for i in range(start, min(start + per_file, count))}
+        path = os.path.join(directory, f"tools_{start // per_file:04d}.{fmt}")
+        write_file(path, tools, fmt)
+        paths.append((path, tools))
+    return paths
+
+
+def measure(count: int, args) -> dict:
+    row = {"tools": count, "files": -(-count // args.per_file)}
+    with tempfile.TemporaryDirectory() as directory:
+        files = write_tools(directory, count, args.per_file, args.format)
+
+        for lazy in (False, True):
+            # Timed and traced separately, since tracemalloc slows allocation down
+            agent = multi_tool_agent.Agent("bench", "", [])
+            reloader = multi_tool_agent.ToolReloader(agent, ToolConfigSource(directory), lazy=lazy)
+            start = time.perf_counter()
+            reloader.load()
+            row["lazy_load_ms" if lazy else "load_ms"] = (time.perf_counter() - start) * 1000
+            assert len(agent.tools) == count, reloader.errors
+            if not lazy:
+                # Keep the eager reloader around for the reload measurements
+                eager = reloader
+
+            traced = multi_tool_agent.ToolReloader(multi_tool_agent.Agent("bench", "", []),
+                                                   ToolConfigSource(directory), lazy=lazy)
+            tracemalloc.start()
+            traced.load()
+            grown = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            row["lazy_bytes_per_tool" if lazy else "bytes_per_tool"] = grown / count
+
+        idle = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            asyncio.run(eager.poll())
+            idle.append(time.perf_counter() - start)
+        row["idle_poll_ms"] = median(idle) * 1000
+
+        reloads = []
+        path, tools = files[len(files) // 2]
+        tool_id = next(iter(tools))
+        for attempt in range(args.repeats):
+            tools[tool_id] = dict(tools[tool_id], url=f"https://api.example.com/v{attempt + 2}")
+            write_file(path, tools, args.format)
+            # Make sure the mtime/size signature changes even within one timestamp tick
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + attempt + 1))
+            start = time.perf_counter()
+            assert asyncio.run(eager.poll())
+            reloads.append(time.perf_counter() - start)
+        assert eager.agent.tools_by_name[tool_id].spec.url.endswith(f"v{args.repeats + 1}")
+        row["one_tool_reload_ms"] = median(reloads) * 1000
+
+        start = time.perf_counter()
+        configs = load_tool_configs(directory)
+        specs = [multi_tool_agent.compile_tool_spec(tool_id, config, multi_tool_agent.describe_tool)
+                 for tool_id, config in configs.items()]
+        multi_tool_agent.Agent("bench", "", [multi_tool_agent.build_tool(spec) for spec in specs])
+        row["full_rebuild_ms"] = (time.perf_counter() - start) * 1000
+
+        # Unload this size's tools from the shared registries
+        for path, _ in files:
+            os.remove(path)
+        asyncio.run(eager.poll())
+    return row
+
+
+def main(args):
+    rows = [measure(count, args) for count in args.tools]
+    print_table(f"Tool config load and reload ({args.format}, {args.per_file} tools per file)", rows)
+    print(f"\nSaved to {save_results('tool_config', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", type=int, nargs="+", default=[100, 1000, 5000], help="Tool counts to measure")
+    parser.add_argument("--per-file", type=int, default=100)
+    parser.add_argument("--format", choices=["json", "yaml"], default="json")
+    parser.add_argument("--repeats", type=int, default=5)
+    main(parser.parse_args())
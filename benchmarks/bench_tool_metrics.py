@@ -0,0 +1,81 @@
+"""Overhead of the per-tool metrics layer.
+
+Times the same tools called directly and through TOOL_METRICS-style
+instrumentation: a no-op async tool, a generated API tool served from the
+response cache, and an SDK function tool invoked as the Runner does.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tool_metrics --calls 100000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from agents import RunContextWrapper, function_tool
+
+import multi_tool_agent
+import travel_agent
+from benchmarks.common import print_table, save_results
+from response_cache import ResponseCache, normalize_arguments
+from tool_metrics import MetricsRegistry, SamplingProfiler
+
+# The SDK tool the travel assistant wraps fetch_weather in
+fetch_weather = function_tool(travel_agent.fetch_weather)
+
+
+async def per_call_us(call, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def noop_tool(name: str = "") -> str:
+    return name
+
+
+async def run(args) -> list:
+    registry = MetricsRegistry()
+    rows = []
+
+    instrumented = registry.instrument(noop_tool)
+    rows.append(("no-op async tool", await per_call_us(lambda: noop_tool("x"), args.calls),
+                 await per_call_us(lambda: instrumented("x"), args.calls)))
+
+    # A cached API tool never leaves the process, so the wrapper cost is most visible
+    cache = ResponseCache()
+    config = dict(multi_tool_agent.TOOL_CONFIGS["get_details_of_a_person"], batch=None)
+    cache.set(("get_details_of_a_person", config["url"], normalize_arguments({"name": "Alice"})), {"age": 30})
+    raw_tool = multi_tool_agent.create_tool("get_details_of_a_person", config, cache, MetricsRegistry()).__wrapped__
+    measured = multi_tool_agent.create_tool("get_details_of_a_person", config, cache, registry)
+    rows.append(("cached API tool", await per_call_us(lambda: raw_tool(name="Alice"), args.calls),
+                 await per_call_us(lambda: measured(name="Alice"), args.calls)))
+
+    ctx = RunContextWrapper(context=None)
+    payload = json.dumps({"location": "Lisbon"})
+    wrapped = registry.instrument_function_tool(fetch_weather)
+    rows.append(("SDK function tool", await per_call_us(lambda: fetch_weather.on_invoke_tool(ctx, payload), args.calls),
+                 await per_call_us(lambda: wrapped.on_invoke_tool(ctx, payload), args.calls)))
+
+    profiler = registry.enable_profiler("fetch_weather", SamplingProfiler(interval=0.001))
+    profiled = await per_call_us(lambda: wrapped.on_invoke_tool(ctx, payload), args.calls)
+    registry.disable_profiler("fetch_weather")
+    rows.append(("SDK function tool, profiled", rows[-1][1], profiled))
+    print(f"Profiler samples: {sum(profiler.samples.values())}")
+
+    return [{"tool": name, "plain_us": plain_us, "instrumented_us": measured_us,
+             "overhead_us": measured_us - plain_us} for name, plain_us, measured_us in rows]
+
+
+def main(args):
+    rows = asyncio.run(run(args))
+    print_table("Tool metrics overhead", rows)
+    print(f"\nSaved to {save_results('tool_metrics', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100000)
+    main(parser.parse_args())
@@ -0,0 +1,109 @@
+"""Restaurant and search index build and lookup costs for catalogs of 1k to 1M entries.
+
+Catalogs are generated as JSON Lines files and loaded through mmap, as in
+production via TRAVEL_RESTAURANTS_PATH / TRAVEL_SEARCH_PATH. Lookups are
+compared with a linear scan over the same records.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_travel_indexes --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import print_table, save_results
+from travel_indexes import MappedRecords, RestaurantIndex, SearchIndex, normalize_location, write_jsonl
+
+CUISINES = ["italian", "thai", "mexican", "indian", "french", "japanese", "korean", "greek", "ethiopian", "peruvian"]
+WORDS = ["museum", "beach", "hiking", "festival", "market", "history", "cathedral", "harbor", "nightlife",
+         "vineyard", "castle", "river", "park", "architecture", "cuisine", "island", "train", "gallery"]
+
+
+def restaurant_records(count: int, rng: random.Random):
+    cities = [f"city {i}" for i in range(max(1, count // 50))]
+    for i in range(count):
+        yield {"cuisine": rng.choice(CUISINES), "location": rng.choice(cities), "name": f"Venue {i}",
+               "rating": round(rng.uniform(3, 5), 1), "description": "generated venue"}
+
+
+def search_records(count: int, rng: random.Random):
+    for i in range(count):
+        words = rng.sample(WORDS, 5) + [f"place{rng.randrange(count)}"]
+        yield {"title": f"Guide {i}", "content": " ".join(words)}
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def linear_restaurant(records, cuisine, location):
+    location = normalize_location(location)
+    best = None
+    for record in records:
+        if record["cuisine"] == cuisine and record["location"] == location:
+            if best is None or record["rating"] > best["rating"]:
+                best = record
+    return best
+
+
+def linear_search(records, query, k=3):
+    words = set(query.lower().split())
+    scored = [(len(words & set((r["title"] + " " + r["content"]).lower().split())), i) for i, r in enumerate(records)]
+    return sorted((s for s in scored if s[0]), reverse=True)[:k]
+
+
+def main(args):
+    rng = random.Random(0)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            restaurants_path = os.path.join(directory, f"restaurants_{size}.jsonl")
+            documents_path = os.path.join(directory, f"documents_{size}.jsonl")
+            write_jsonl(restaurants_path, restaurant_records(size, rng))
+            write_jsonl(documents_path, search_records(size, rng))
+
+            start = time.perf_counter()
+            restaurants = RestaurantIndex(MappedRecords(restaurants_path))
+            restaurant_build = time.perf_counter() - start
+            start = time.perf_counter()
+            search = SearchIndex(MappedRecords(documents_path))
+            search_build = time.perf_counter() - start
+
+            lookup = timed(lambda: restaurants.lookup("thai", "City 1"), args.repeat)
+            fuzzy = timed(lambda: restaurants.lookup("tai", "Citty 1"), args.repeat)
+            query = "history museum and castle"
+            ranked = timed(lambda: search.search(query), max(1, args.repeat // 100))
+
+            row = {
+                "entries": size,
+                "restaurant_build_s": restaurant_build,
+                "search_build_s": search_build,
+                "lookup_us": lookup * 1e6,
+                "fuzzy_lookup_us": fuzzy * 1e6,
+                "search_ms": ranked * 1000,
+            }
+            if size <= args.max_linear:
+                in_memory = list(MappedRecords(restaurants_path))
+                documents = list(MappedRecords(documents_path))
+                row["linear_lookup_us"] = timed(lambda: linear_restaurant(in_memory, "thai", "City 1"), 3) * 1e6
+                row["linear_search_ms"] = timed(lambda: linear_search(documents, query), 3) * 1000
+            else:
+                row["linear_lookup_us"] = row["linear_search_ms"] = float("nan")
+            rows.append(row)
+
+    print_table("Travel indexes", rows)
+    print(f"\nSaved to {save_results('travel_indexes', rows)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--max-linear", type=int, default=100000, help="Largest catalog to run the linear baseline on")
+    main(parser.parse_args())
@@ -0,0 +1,179 @@
+"""Model calls saved by the agent1 verdict cache, on a stub model.
+
+Traffic repeats a pool of homework and off-topic questions, each asked in
+several near-identical phrasings (case, punctuation, "what's" vs "what is",
+a polite prefix), plus a share of one-off questions. run_triage runs without
+the local prefilter so every verdict comes from the model or the cache.
+
+Modes:
+    no cache     every turn calls the guardrail model and the triage model
+    exact        verdicts and handoffs reused for the same normalized question
+    similar      as exact, plus near-duplicates found in the similarity index
+
+`mismatches` counts turns whose verdict or tutor differs from the no-cache
+run, i.e. near-duplicates that were matched to the wrong question.
+
+The index section times a similarity lookup against indexes of growing size.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_verdict_cache --turns 500 --similarity 0.9 --index-sizes 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from agents import InputGuardrailTripwireTriggered, RunConfig
+
+import agent1
+from benchmarks.common import percentile, print_table, save_results
+from mock_model import ScriptedModel, ScriptedModelProvider, text_message
+from response_cache import ResponseCache
+from verdict_cache import SimilarityIndex, VerdictCache
+
+QUESTIONS = [
+    "What is the derivative of x^2",
+    "Solve 3x + 5 = 20 for x",
+    "What is the integral of sin x",
+    "How do I factor x^2 - 9",
+    "What is the area of a triangle with base 4 and height 3",
+    "Why did the Roman empire fall",
+    "Who won the war of 1812",
+    "What caused the French revolution",
+    "Who was the first president of the United States",
+    "When did the Berlin wall come down",
+    "Tell me a joke about cats",
+    "What is a good movie to watch tonight",
+    "Recommend a restaurant near me",
+]
+
+OFF_TOPIC = ("joke", "movie", "restaurant")
+
+
+def phrasing(question: str, rng: random.Random) -> str:
+    """One of several ways a student might type the same question."""
+    variant = rng.randrange(5)
+    if variant == 1:
+        question = question.lower()
+    elif variant == 2:
+        question = question + "?"
+    elif variant == 3:
+        question = question.replace("What is", "What's")
+    elif variant == 4:
+        question = "Please tell me " + question[0].lower() + question[1:]
+    return question
+
+
+def make_traffic(turns: int, unique: float, rng: random.Random) -> list:
+    messages = []
+    for turn in range(turns):
+        if rng.random() < unique:
+            messages.append(f"Explain the history of topic number {turn} in detail")
+        else:
+            messages.append(phrasing(rng.choice(QUESTIONS), rng))
+    return messages
+
+
+class StubModel(ScriptedModel):
+    """Scripted triage handoffs, and a guardrail that rejects obviously off-topic questions."""
+
+    def _output(self, input, output_schema):
+        if output_schema is not None and not output_schema.is_plain_text():
+            text = agent1._input_text(input).lower()
+            is_homework = not any(word in text for word in OFF_TOPIC)
+            return text_message(json.dumps({"is_homework": is_homework, "reasoning": "stub"}))
+        return super()._output(input, output_schema)
+
+
+class StubProvider(ScriptedModelProvider):
+    def __init__(self, latency: float):
+        self.model = StubModel(latency=latency)
+
+
+async def run_mode(mode: str, messages: list, args) -> tuple:
+    provider = StubProvider(args.model_latency)
+    run_config = RunConfig(model_provider=provider, tracing_disabled=True)
+    agent1.guardrail_stats = agent1.GuardrailStats()
+    if mode == "no cache":
+        agent1.verdict_cache = VerdictCache(ResponseCache(max_size=0))
+    else:
+        agent1.verdict_cache = VerdictCache(similarity=args.similarity if mode == "similar" else None)
+
+    outcomes, latencies = [], []
+    for message in messages:
+        start = time.perf_counter()
+        try:
+            result = await agent1.run_triage(message, run_config=run_config, use_prefilter=False)
+            outcomes.append(result.last_agent.name)
+        except InputGuardrailTripwireTriggered:
+            outcomes.append("blocked")
+        latencies.append(time.perf_counter() - start)
+
+    stats = agent1.verdict_cache.stats()
+    guardrail = agent1.guardrail_stats
+    return outcomes, {
+        "mode": mode,
+        "turns": len(messages),
+        "model_calls": provider.model.calls,
+        "guardrail_calls": guardrail.model_calls,
+        "saved_verdicts": guardrail.cached_verdicts,
+        "saved_triage": guardrail.cached_rejections + guardrail.cached_handoffs,
+        "model_calls_saved": guardrail.model_calls_saved,
+        "hit_rate": stats["hit_rate"],
+        "similar_hit_rate": stats["similar_hit_rate"],
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+    }
+
+
+def synthetic_question(rng: random.Random, words: list) -> str:
+    return "what is the " + " ".join(rng.sample(words, 5))
+
+
+def index_rows(args, rng: random.Random) -> list:
+    words = [f"{a}{b}{c}" for a in "bcdfgklmnprst" for b in "aeiou" for c in "mnrst"]
+    rows = []
+    for size in args.index_sizes:
+        # The pool's questions plus distinct one-offs; lookups are half rephrased pool questions, half new
+        index = SimilarityIndex(max_size=size)
+        for question in QUESTIONS:
+            index.add(question.lower(), question)
+        for i in range(size - len(QUESTIONS)):
+            index.add(synthetic_question(rng, words), i)
+        queries = [phrasing(rng.choice(QUESTIONS), rng).lower() if i % 2 else synthetic_question(rng, words)
+                   for i in range(args.lookups)]
+        start = time.perf_counter()
+        found = sum(index.search(query, args.similarity) is not None for query in queries)
+        rows.append({"indexed": size, "lookups": len(queries), "found": found,
+                     "lookup_us": (time.perf_counter() - start) / len(queries) * 1e6})
+    return rows
+
+
+def main(args):
+    rng = random.Random(0)
+    messages = make_traffic(args.turns, args.unique, rng)
+    rows, baseline = [], None
+    for mode in ("no cache", "exact", "similar"):
+        outcomes, row = asyncio.run(run_mode(mode, messages, args))
+        baseline = baseline or outcomes
+        row["mismatches"] = sum(a != b for a, b in zip(outcomes, baseline))
+        rows.append(row)
+    print_table(f"Triage over {args.turns} turns ({args.unique:.0%} one-off questions)", rows)
+
+    index = index_rows(args, rng)
+    print_table(f"Similarity index lookups (threshold {args.similarity})", index)
+
+    print(f"\nSaved to {save_results('verdict_cache', rows + index)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--unique", type=float, default=0.1, help="Share of questions asked only once")
+    parser.add_argument("--similarity", type=float, default=0.9, help="Cosine similarity for near-duplicates")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Seconds per stub model call")
+    parser.add_argument("--index-sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    main(parser.parse_args())
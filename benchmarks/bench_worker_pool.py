@@ -0,0 +1,107 @@
+"""Throughput scaling of the worker pool from 1 to N processes.
+
+Each configuration runs in its own subprocess: a plain single-process server
+as the baseline, then the supervisor with 1..N workers behind the
+session-affine proxy. The mock model answers immediately by default, so
+turns are bound by CPU work in the SDK runner, guardrail validation and
+result formatting rather than by waiting. Scaling is capped by the cores
+available (reported below) and by the load generator sharing them.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_worker_pool --workers 1 2 4 --agents triage multi --sessions 64 --turns 5
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.bench_server import free_port, run_load
+from benchmarks.common import print_table, save_results
+from stub_server import StubServer
+
+SINGLE_PROCESS = """
+import uvicorn
+from mock_model import MockModelProvider
+from server import create_app
+uvicorn.run(create_app(MockModelProvider(latency={model_latency}), {overrides!r}), host="127.0.0.1", port={port},
+            log_level="warning")
+"""
+
+POOL = """
+import worker_pool
+worker_pool.serve("127.0.0.1", {port}, {workers}, worker_pool.WorkerOptions(
+    mock=True, model_latency={model_latency}, tool_url_overrides={overrides!r}))
+"""
+
+
+async def wait_ready(base_url: str, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{base_url} did not start")
+
+
+def run_configuration(workers: int, args, overrides: dict) -> list:
+    port = free_port()
+    script = POOL if workers else SINGLE_PROCESS
+    process = subprocess.Popen([sys.executable, "-c", script.format(
+        port=port, workers=workers, model_latency=args.model_latency, overrides=overrides)])
+    base_url = f"http://127.0.0.1:{port}"
+    rows = []
+    try:
+        asyncio.run(wait_ready(base_url))
+        for agent in args.agents:
+            # Warm up each worker's imports and caches before measuring
+            asyncio.run(run_load(base_url, agent, max(workers, 1) * 4, 1))
+            row = asyncio.run(run_load(base_url, agent, args.sessions, args.turns))
+            rows.append({"mode": f"pool x{workers}" if workers else "single", "workers": workers, **row})
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+    return rows
+
+
+def main(args):
+    rows = []
+    with StubServer(delay=args.tool_latency) as stub:
+        for workers in [0] + args.workers:
+            rows.extend(run_configuration(workers, args, stub.url_overrides()))
+
+    baseline = {row["agent"]: row["turns_per_s"] for row in rows if row["workers"] == 0}
+    table = [{
+        "agent": row["agent"],
+        "mode": row["mode"],
+        "turns_per_s": row["turns_per_s"],
+        "speedup": row["turns_per_s"] / baseline[row["agent"]] if baseline.get(row["agent"]) else 0.0,
+        "p50_ms": row["p50_ms"],
+        "p99_ms": row["p99_ms"],
+        "rejected": row["rejected"],
+        "errors": row["errors"],
+    } for row in sorted(rows, key=lambda row: (row["agent"], row["workers"]))]
+
+    print_table(f"Worker pool scaling ({os.cpu_count()} cores available)", table)
+    print(f"\nSaved to {save_results('worker_pool', table)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count() or 1}), help="Pool sizes to measure")
+    parser.add_argument("--agents", nargs="+", default=["triage", "multi"])
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--model-latency", type=float, default=0.0)
+    parser.add_argument("--tool-latency", type=float, default=0.01)
+    main(parser.parse_args())
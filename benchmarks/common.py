@@ -0,0 +1,88 @@
+import json
+import os
+import platform
+import time
+from typing import Any, Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the `pct` percentile (0-100) of `samples` using nearest-rank."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Summarize per-call latencies (seconds) over a wall-clock window."""
+    return {
+        "calls": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def print_table(title: str, rows: List[Dict[str, Any]]) -> None:
+    """Print benchmark rows as an aligned table."""
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(_fmt(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row[c]).ljust(widths[c]) for c in columns))
+
+
+def _fmt(value: Any) -> str:
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def save_results(name: str, rows: List[Dict[str, Any]], directory: str = "benchmark_results") -> str:
+    """Write benchmark rows to `<directory>/<name>.json` with run metadata."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "benchmark": name,
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": rows,
+        }, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load a file written by `save_results`."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]], key: str,
+                    lower_is_better: List[str], higher_is_better: List[str],
+                    tolerance: float = 0.10) -> List[Dict[str, Any]]:
+    """Compare rows matched on `key` and flag metrics that regressed beyond `tolerance`.
+
+    Returns:
+        One row per matched key and metric with baseline, current, relative change
+        and whether it counts as a regression.
+    """
+    baseline_rows = {row[key]: row for row in baseline}
+    comparison = []
+    for row in current:
+        before = baseline_rows.get(row[key])
+        if before is None:
+            continue
+        for metric in lower_is_better + higher_is_better:
+            old, new = before.get(metric), row.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = change > tolerance if metric in lower_is_better else change < -tolerance
+            comparison.append({key: row[key], "metric": metric, "baseline": float(old), "current": float(new),
+                               "change_pct": change * 100, "regression": regressed})
+    return comparison
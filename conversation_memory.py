@@ -0,0 +1,392 @@
+import json
+import re
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from streaming import StreamEvent
+
+# Default token budget for replayed history (summary, tool results and recent turns)
+HISTORY_BUDGET = 1000
+
+# Tokens the running summary of compacted turns may use
+SUMMARY_BUDGET = 200
+
+# Distinct tool results kept per conversation, least recently produced dropped first
+MAX_TOOL_RESULTS = 20
+
+# Tool outputs longer than this many characters are truncated in the context
+TOOL_RESULT_CHARS = 400
+
+# Per-message overhead of the chat format, in tokens
+MESSAGE_OVERHEAD = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count: about four characters per token for English text."""
+    return (len(text) + 3) // 4
+
+
+def _item_text(item: Any) -> str:
+    """The text of an input item the model actually reads: message content, call arguments or output."""
+    if not isinstance(item, dict):
+        return str(item)
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    if item.get("type") == "function_call":
+        return f"{item.get('name', '')} {item.get('arguments', '')}"
+    if item.get("type") == "function_call_output":
+        return str(item.get("output", ""))
+    return json.dumps(item, default=str)
+
+
+def estimate_input_tokens(items: Iterable[Any]) -> int:
+    """Approximate tokens of a list of input items (or a plain string)."""
+    if isinstance(items, str):
+        return estimate_tokens(items) + MESSAGE_OVERHEAD
+    return sum(estimate_tokens(_item_text(item)) + MESSAGE_OVERHEAD for item in items)
+
+
+def _first_sentence(text: str, max_chars: int = 160) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    return sentence if len(sentence) <= max_chars else sentence[:max_chars - 3] + "..."
+
+
+@dataclass
+class ToolResult:
+    """One tool call and its output."""
+    tool: str
+    arguments: str
+    output: str
+
+
+@dataclass
+class Turn:
+    """One exchange kept in a conversation's recent history.
+
+    Attributes:
+        user: The user's message.
+        assistant: The final answer.
+        tool_results: Tool calls made while answering.
+        prompt_tokens: Estimated history + message tokens sent for this turn.
+        naive_tokens: Estimated tokens resending the full transcript would have cost.
+    """
+    user: str
+    assistant: str
+    tool_results: List[ToolResult] = field(default_factory=list)
+    prompt_tokens: int = 0
+    naive_tokens: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.user) + estimate_tokens(self.assistant) + 2 * MESSAGE_OVERHEAD
+
+
+def extractive_summary(turn: Turn) -> str:
+    """Summarize a turn as the first sentence of the question and of the answer."""
+    return f"- User: {_first_sentence(turn.user)} Assistant: {_first_sentence(turn.assistant)}"
+
+
+class ConversationMemory:
+    """History of one conversation, replayed to the model within a token budget.
+
+    Recent turns are replayed verbatim while they fit in `budget`. Older turns
+    are compacted: folded into a running summary and dropped. Tool results are
+    kept once per (tool, arguments), latest output wins, and listed ahead of
+    the history so follow-up questions can reuse them instead of calling the
+    tool again.
+
+    Args:
+        session_id: The conversation's id in the store.
+        budget: Tokens for the summary, tool results and recent turns together.
+        summary_budget: Tokens the summary may use; its oldest lines are dropped beyond it.
+        summarize: Turns a compacted turn into a summary line.
+    """
+
+    def __init__(self, session_id: str = "default", budget: int = HISTORY_BUDGET,
+                 summary_budget: int = SUMMARY_BUDGET,
+                 summarize: Callable[[Turn], str] = extractive_summary):
+        self.session_id = session_id
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.summarize = summarize
+        self.turns: List[Turn] = []
+        self.summary_lines: List[str] = []
+        self.tool_results: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        # Turns folded into the summary so far; also the position of turns[0]
+        self.compacted = 0
+        # Everything said so far, as a naive full-transcript prompt would carry it
+        self.transcript_tokens = 0
+        self._pending: Optional[Tuple[int, int]] = None
+
+    def _context_message(self) -> Optional[Dict[str, str]]:
+        sections = []
+        if self.summary_lines:
+            sections.append("Summary of earlier conversation:\n" + "\n".join(self.summary_lines))
+        if self.tool_results:
+            lines = [f"- {tool}({arguments}) -> {output}" for (tool, arguments), output in self.tool_results.items()]
+            sections.append("Known tool results (reuse instead of calling again):\n"
+                            + "\n".join(lines))
+        if not sections:
+            return None
+        return {"role": "system", "content": "\n\n".join(sections)}
+
+    def _trim_summary(self) -> None:
+        tokens = sum(estimate_tokens(line) for line in self.summary_lines)
+        while self.summary_lines and tokens > self.summary_budget:
+            tokens -= estimate_tokens(self.summary_lines.pop(0))
+
+    def _context_tokens(self) -> int:
+        context = self._context_message()
+        return estimate_input_tokens([context]) if context else 0
+
+    def compact(self) -> int:
+        """Fold the oldest turns into the summary until the history fits the budget.
+
+        The newest turn is always kept. If the summary and tool results alone
+        still exceed the budget, the oldest tool results and then the oldest
+        summary lines are dropped. Returns the number of turns compacted.
+        """
+        used = self._context_tokens()
+        kept, cut = 0, len(self.turns)
+        for turn in reversed(self.turns):
+            if kept and used + turn.tokens > self.budget:
+                break
+            used += turn.tokens
+            kept += 1
+            cut -= 1
+        if cut:
+            for turn in self.turns[:cut]:
+                self.summary_lines.append(self.summarize(turn))
+            self._trim_summary()
+            del self.turns[:cut]
+            self.compacted += cut
+
+        recent = sum(turn.tokens for turn in self.turns)
+        while (self.tool_results or self.summary_lines) and self._context_tokens() + recent > self.budget:
+            if self.tool_results:
+                self.tool_results.popitem(last=False)
+            else:
+                self.summary_lines.pop(0)
+        return cut
+
+    def build_input(self, user_input: str) -> List[Dict[str, str]]:
+        """Return the input items for the next turn: context, recent turns, then the new message."""
+        self.compact()
+        items: List[Dict[str, str]] = []
+        context = self._context_message()
+        if context is not None:
+            items.append(context)
+        for turn in self.turns:
+            items.append({"role": "user", "content": turn.user})
+            items.append({"role": "assistant", "content": turn.assistant})
+        message = {"role": "user", "content": user_input}
+        items.append(message)
+        message_tokens = estimate_input_tokens([message])
+        self._pending = (estimate_input_tokens(items), self.transcript_tokens + message_tokens)
+        return items
+
+    def record(self, user_input: str, assistant: str, tool_results: Iterable[ToolResult] = (),
+               output_tokens: Optional[int] = None) -> Turn:
+        """Append a finished turn, with the prompt size measured by the last build_input.
+
+        Args:
+            user_input: The user's message.
+            assistant: The final answer.
+            tool_results: Tool calls made while answering.
+            output_tokens: Tokens the turn's output items add to a full transcript;
+                estimated from the answer and tool results when not given.
+        """
+        tool_results = list(tool_results)
+        prompt_tokens, naive_tokens = self._pending or (0, 0)
+        self._pending = None
+        turn = Turn(user_input, assistant, tool_results, prompt_tokens, naive_tokens)
+        self.turns.append(turn)
+
+        if output_tokens is None:
+            # The naive transcript carries every call and its full output
+            output_tokens = estimate_tokens(assistant) + MESSAGE_OVERHEAD + sum(
+                estimate_tokens(r.arguments) + estimate_tokens(r.output) + 2 * MESSAGE_OVERHEAD for r in tool_results)
+        self.transcript_tokens += estimate_tokens(user_input) + MESSAGE_OVERHEAD + output_tokens
+        for result in tool_results:
+            key = (result.tool, result.arguments)
+            self.tool_results.pop(key, None)
+            output = result.output
+            self.tool_results[key] = output if len(output) <= TOOL_RESULT_CHARS else output[:TOOL_RESULT_CHARS] + "..."
+        while len(self.tool_results) > MAX_TOOL_RESULTS:
+            self.tool_results.popitem(last=False)
+        return turn
+
+    def record_result(self, user_input: str, result: Any) -> Turn:
+        """Record a turn from an SDK run result (blocking or streamed), including its tool calls."""
+        from agents.items import ToolCallItem, ToolCallOutputItem
+
+        calls: Dict[str, Tuple[str, str]] = {}
+        tool_results = []
+        for item in result.new_items:
+            if isinstance(item, ToolCallItem):
+                raw = item.raw_item
+                calls[getattr(raw, "call_id", "")] = (getattr(raw, "name", ""), getattr(raw, "arguments", ""))
+            elif isinstance(item, ToolCallOutputItem):
+                call_id = item.raw_item.get("call_id") if isinstance(item.raw_item, dict) else None
+                tool, arguments = calls.get(call_id, ("", ""))
+                tool_results.append(ToolResult(tool, arguments, str(item.output)))
+        # Exactly what result.to_input_list() would resend next turn
+        output_tokens = estimate_input_tokens(item.to_input_item() for item in result.new_items)
+        return self.record(user_input, str(result.final_output), tool_results, output_tokens)
+
+    async def track(self, user_input: str, events: AsyncIterator[StreamEvent]) -> AsyncIterator[StreamEvent]:
+        """Pass a streamed turn through, recording it once its "final" event arrives."""
+        async for event in events:
+            if event.kind == "final":
+                if hasattr(event.data, "new_items"):
+                    self.record_result(user_input, event.data)
+                else:
+                    self.record(user_input, event.text)
+            yield event
+
+    def stats(self) -> Dict[str, Any]:
+        """Return prompt token totals across the recorded turns still in memory."""
+        prompt = sum(turn.prompt_tokens for turn in self.turns)
+        naive = sum(turn.naive_tokens for turn in self.turns)
+        return {
+            "turns": self.compacted + len(self.turns),
+            "recent_turns": len(self.turns),
+            "summary_lines": len(self.summary_lines),
+            "tool_results": len(self.tool_results),
+            "prompt_tokens": prompt,
+            "naive_tokens": naive,
+            "saved_pct": (1 - prompt / naive) * 100 if naive else 0.0,
+        }
+
+
+def format_turn_tokens(turn: Turn) -> str:
+    return f"(history ~{turn.prompt_tokens} tokens, full transcript would be ~{turn.naive_tokens})"
+
+
+class ConversationStore:
+    """SQLite persistence for ConversationMemory: one row per conversation and one per recent turn.
+
+    Turns are immutable once written, so saving only inserts new turns and
+    deletes compacted ones. `load_all` and `save_all` move many conversations
+    in a single transaction.
+
+    Args:
+        path: SQLite database file, or ":memory:".
+        **memory_options: Passed to every ConversationMemory it creates (budget, ...).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS conversations (
+            session_id TEXT PRIMARY KEY,
+            summary TEXT NOT NULL,
+            tool_results TEXT NOT NULL,
+            compacted INTEGER NOT NULL,
+            transcript_tokens INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS turns (
+            session_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            user TEXT NOT NULL,
+            assistant TEXT NOT NULL,
+            tool_results TEXT NOT NULL,
+            prompt_tokens INTEGER NOT NULL,
+            naive_tokens INTEGER NOT NULL,
+            PRIMARY KEY (session_id, position)
+        );
+    """
+
+    def __init__(self, path: str, **memory_options: Any):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(self.SCHEMA)
+        self.memory_options = memory_options
+
+    def _memory(self, row: tuple) -> ConversationMemory:
+        session_id, summary, tool_results, compacted, transcript_tokens = row
+        memory = ConversationMemory(session_id, **self.memory_options)
+        memory.summary_lines = json.loads(summary)
+        memory.tool_results = OrderedDict(((tool, arguments), output)
+                                          for tool, arguments, output in json.loads(tool_results))
+        memory.compacted = compacted
+        memory.transcript_tokens = transcript_tokens
+        return memory
+
+    @staticmethod
+    def _turn(row: tuple) -> Turn:
+        user, assistant, tool_results, prompt_tokens, naive_tokens = row
+        return Turn(user, assistant, [ToolResult(*result) for result in json.loads(tool_results)],
+                    prompt_tokens, naive_tokens)
+
+    def load(self, session_id: str) -> ConversationMemory:
+        """Load a conversation, or start an empty one."""
+        row = self.connection.execute(
+            "SELECT session_id, summary, tool_results, compacted, transcript_tokens"
+            " FROM conversations WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return ConversationMemory(session_id, **self.memory_options)
+        memory = self._memory(row)
+        memory.turns = [self._turn(turn) for turn in self.connection.execute(
+            "SELECT user, assistant, tool_results, prompt_tokens, naive_tokens FROM turns"
+            " WHERE session_id = ? ORDER BY position", (session_id,))]
+        return memory
+
+    def load_all(self) -> Dict[str, ConversationMemory]:
+        """Load every conversation with two queries."""
+        memories = {row[0]: self._memory(row) for row in self.connection.execute(
+            "SELECT session_id, summary, tool_results, compacted, transcript_tokens FROM conversations")}
+        for session_id, *turn in self.connection.execute(
+                "SELECT session_id, user, assistant, tool_results, prompt_tokens, naive_tokens FROM turns"
+                " ORDER BY session_id, position"):
+            memory = memories.get(session_id)
+            if memory is not None:
+                memory.turns.append(self._turn(turn))
+        return memories
+
+    def _write(self, memories: Iterable[ConversationMemory]) -> None:
+        conversations, compacted, turns = [], [], []
+        for memory in memories:
+            conversations.append((
+                memory.session_id, json.dumps(memory.summary_lines),
+                json.dumps([[tool, arguments, output] for (tool, arguments), output in memory.tool_results.items()]),
+                memory.compacted, memory.transcript_tokens))
+            compacted.append((memory.session_id, memory.compacted))
+            turns.extend((memory.session_id, memory.compacted + i, turn.user, turn.assistant,
+                          json.dumps([[r.tool, r.arguments, r.output] for r in turn.tool_results]),
+                          turn.prompt_tokens, turn.naive_tokens)
+                         for i, turn in enumerate(memory.turns))
+        self.connection.executemany("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?)", conversations)
+        self.connection.executemany("DELETE FROM turns WHERE session_id = ? AND position < ?", compacted)
+        self.connection.executemany("INSERT OR IGNORE INTO turns VALUES (?, ?, ?, ?, ?, ?, ?)", turns)
+
+    def save(self, memory: ConversationMemory) -> None:
+        with self.connection:
+            self._write([memory])
+
+    def save_all(self, memories: Iterable[ConversationMemory]) -> None:
+        """Save many conversations in one transaction."""
+        with self.connection:
+            self._write(memories)
+
+    def delete(self, session_id: str) -> None:
+        with self.connection:
+            self.connection.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,))
+            self.connection.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def open_conversation(path: Optional[str], session_id: str = "default",
+                      budget: int = HISTORY_BUDGET) -> Tuple[Optional[ConversationStore], ConversationMemory]:
+    """Open a REPL's conversation: persisted in `path` if given, in memory otherwise."""
+    if not path:
+        return None, ConversationMemory(session_id, budget)
+    store = ConversationStore(path, budget=budget)
+    return store, store.load(session_id)
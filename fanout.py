@@ -0,0 +1,144 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class ToolTiming:
+    """Timing for a single tool call in a fan-out.
+
+    Attributes:
+        name: The tool name.
+        elapsed: Seconds from dispatch until the call finished or was abandoned.
+        status: One of "ok", "error" or "timeout".
+    """
+    name: str
+    elapsed: float
+    status: str
+
+
+@dataclass
+class FanOutResult:
+    """Outcome of running several tools concurrently.
+
+    Attributes:
+        results: Successful results keyed by tool name, in submission order.
+        timings: Per-tool timing, in submission order.
+        timed_out: Names of tools that missed their deadline.
+        elapsed: Wall-clock seconds for the whole fan-out.
+    """
+    results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, ToolTiming] = field(default_factory=dict)
+    timed_out: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def partial(self) -> bool:
+        """True when at least one tool did not produce a result."""
+        return len(self.results) < len(self.timings)
+
+    def merged(self) -> Dict[str, Any]:
+        """Merge dict results so the first key wins in submission order.
+
+        The first dict is copied in bulk, so only keys from the later results
+        are merged one by one; results themselves (often cached) are never mutated.
+        """
+        dicts = [result for result in self.results.values() if isinstance(result, dict)]
+        combined: Dict[str, Any] = dict(dicts[0]) if dicts else {}
+        for result in dicts[1:]:
+            for key, value in result.items():
+                if key not in combined:
+                    combined[key] = value
+        return combined
+
+    @classmethod
+    def collect(cls, names: Sequence[str], finished: Dict[str, Tuple[ToolTiming, Any]],
+                elapsed: float) -> "FanOutResult":
+        """Build a result from (timing, value) pairs keyed by name, keeping `names` order."""
+        outcome = cls(elapsed=elapsed)
+        for name in names:
+            timing, value = finished.get(name, (ToolTiming(name=name, elapsed=elapsed, status="timeout"), None))
+            outcome.timings[name] = timing
+            if timing.status == "ok":
+                outcome.results[name] = value
+            elif timing.status == "timeout":
+                outcome.timed_out.append(name)
+        return outcome
+
+
+async def fan_out_iter(calls: Sequence[Tuple[str, Callable[[], Awaitable[Any]]]],
+                       per_call_timeout: Optional[float] = None,
+                       overall_timeout: Optional[float] = None) -> AsyncIterator[Tuple[ToolTiming, Any]]:
+    """Run tool calls concurrently and yield each one as soon as it finishes.
+
+    Args:
+        calls: (name, zero-argument coroutine factory) pairs.
+        per_call_timeout: Seconds each call may take, None for no limit.
+        overall_timeout: Seconds the whole fan-out may take, None for no limit.
+
+    Yields:
+        (timing, value) pairs in completion order; value is None unless the
+        status is "ok". Calls still running at the overall deadline are
+        cancelled and yielded last with status "timeout".
+    """
+    start = time.perf_counter()
+    deadline = start + overall_timeout if overall_timeout is not None else None
+
+    async def run_one(name: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[ToolTiming, Any]:
+        call_start = time.perf_counter()
+        try:
+            value = await asyncio.wait_for(factory(), per_call_timeout)
+            return ToolTiming(name=name, elapsed=time.perf_counter() - call_start, status="ok"), value
+        except asyncio.TimeoutError:
+            return ToolTiming(name=name, elapsed=time.perf_counter() - call_start, status="timeout"), None
+        except Exception:
+            return ToolTiming(name=name, elapsed=time.perf_counter() - call_start, status="error"), None
+
+    tasks = {asyncio.create_task(run_one(name, factory)): name for name, factory in calls}
+    order = {task: i for i, task in enumerate(tasks)}
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            # Calls finishing together are yielded in submission order
+            for task in sorted(done, key=order.__getitem__):
+                yield task.result()
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        for task in tasks:
+            if task in pending:
+                yield ToolTiming(name=tasks[task], elapsed=elapsed, status="timeout"), None
+    finally:
+        # The consumer may stop early; don't leave calls running
+        for task in pending:
+            task.cancel()
+
+
+async def fan_out(calls: Sequence[Tuple[str, Callable[[], Awaitable[Any]]]],
+                  per_call_timeout: Optional[float] = None,
+                  overall_timeout: Optional[float] = None) -> FanOutResult:
+    """Run tool calls concurrently with a per-call and an overall deadline.
+
+    Args:
+        calls: (name, zero-argument coroutine factory) pairs, in the order that
+            should decide merge precedence.
+        per_call_timeout: Seconds each call may take, None for no limit.
+        overall_timeout: Seconds the whole fan-out may take, None for no limit.
+
+    Returns:
+        A FanOutResult. Calls that fail or miss a deadline are left out of
+        `results` and recorded in `timings`.
+    """
+    start = time.perf_counter()
+    finished: Dict[str, Tuple[ToolTiming, Any]] = {}
+    async for timing, value in fan_out_iter(calls, per_call_timeout, overall_timeout):
+        finished[timing.name] = (timing, value)
+    return FanOutResult.collect([name for name, _ in calls], finished, time.perf_counter() - start)
@@ -0,0 +1,64 @@
+import re
+from typing import Optional, Tuple
+
+# Words that strongly suggest a math or history homework question
+HOMEWORK_TERMS = frozenset({
+    "algebra", "angle", "calculate", "calculus", "century", "derivative", "dynasty", "empire",
+    "equation", "evaluate", "explain", "factor", "fraction", "geometry", "history", "historical",
+    "homework", "integral", "king", "math", "multiply", "president", "prove", "queen", "revolution",
+    "simplify", "solve", "theorem", "treaty", "triangle", "war",
+})
+
+# Words that strongly suggest small talk or requests unrelated to studying
+OFF_TOPIC_TERMS = frozenset({
+    "book", "buy", "flight", "hello", "hey", "hi", "hotel", "joke", "movie", "order", "price",
+    "recipe", "restaurant", "song", "thanks", "weather",
+})
+
+_WORD_RE = re.compile(r"[a-z]+")
+# "-" and "x" are left out: "2-3 ideas", "2x4 boards" and "2024-2025" are not arithmetic
+_ARITHMETIC_RE = re.compile(r"\d+(\.\d+)?\s*[+*/^=]\s*\d+")
+_YEAR_RE = re.compile(r"\b1[0-9]{3}\b|\b20[0-2][0-9]\b")
+
+
+def normalize_input(text: str) -> str:
+    """Normalize a question for cache keys: lowercase, single spaces, no trailing punctuation."""
+    return " ".join(text.lower().split()).rstrip(" ?!.")
+
+
+class GuardrailPrefilter:
+    """Cheap local homework classifier that answers only when it is confident.
+
+    Counts homework and off-topic signals in the input; a verdict is returned
+    only when one side has at least `min_signals` hits and the other has none.
+    Arithmetic and years only add to a homework term, never stand on their own.
+    Anything else is left to the guardrail model.
+
+    Args:
+        min_signals: Signals required before trusting the local verdict.
+    """
+
+    def __init__(self, min_signals: int = 2):
+        self.min_signals = min_signals
+
+    def signals(self, text: str) -> Tuple[int, int]:
+        """Return (homework, off_topic) signal counts for the text."""
+        lowered = text.lower()
+        words = set(_WORD_RE.findall(lowered))
+        homework = len(words & HOMEWORK_TERMS)
+        # Arithmetic and years strengthen a homework term, but numbers alone are too common to trust
+        if homework:
+            if _ARITHMETIC_RE.search(lowered):
+                homework += 2
+            if _YEAR_RE.search(lowered):
+                homework += 1
+        return homework, len(words & OFF_TOPIC_TERMS)
+
+    def classify(self, text: str) -> Optional[Tuple[bool, str]]:
+        """Return (is_homework, reasoning) when confident, otherwise None."""
+        homework, off_topic = self.signals(text)
+        if homework >= self.min_signals and off_topic == 0:
+            return True, f"Local prefilter: {homework} homework signals"
+        if off_topic >= self.min_signals and homework == 0:
+            return False, f"Local prefilter: {off_topic} off-topic signals"
+        return None
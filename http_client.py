@@ -0,0 +1,226 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from urllib.parse import urlsplit
+
+import httpx
+
+try:  # HTTP/2 support is only available when the optional `h2` package is installed
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Status codes worth retrying for idempotent requests
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Wraps the pooled transport of each new client
+TransportWrapper = Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]
+
+
+@dataclass
+class HTTPClientConfig:
+    """Settings for the shared async HTTP client.
+
+    Attributes:
+        max_connections: Total connections kept by the pool.
+        max_keepalive_connections: Idle connections kept alive for reuse.
+        max_connections_per_host: Concurrent requests allowed against a single host.
+        keepalive_expiry: Seconds an idle connection stays in the pool.
+        connect_timeout: Seconds to wait for a connection to be established.
+        read_timeout: Seconds to wait for response data.
+        pool_timeout: Seconds to wait for a free connection from the pool.
+        retries: Extra attempts for transport errors and retryable status codes.
+        backoff: Base delay in seconds for exponential backoff between retries.
+        http2: Use HTTP/2 when the `h2` package is available.
+        verify: Verify TLS certificates.
+    """
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    max_connections_per_host: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 10.0
+    pool_timeout: float = 5.0
+    retries: int = 2
+    backoff: float = 0.1
+    http2: bool = True
+    verify: bool = False
+
+
+class AsyncHTTPClient:
+    """Pooled, keep-alive HTTP client shared by every config-driven tool.
+
+    Wraps `httpx.AsyncClient` and adds a per-host concurrency limit and
+    retries with exponential backoff.
+
+    Args:
+        config: Pool, timeout and retry settings.
+        transport: Transport to send requests with, instead of a pooled HTTP transport.
+        wrap_transport: Wraps the pooled HTTP transport, e.g. to record every
+            exchange (see traffic_log.RecordingTransport).
+    """
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 wrap_transport: Optional[TransportWrapper] = None):
+        self.config = config or HTTPClientConfig()
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            connect=self.config.connect_timeout,
+            read=self.config.read_timeout,
+            write=self.config.read_timeout,
+            pool=self.config.pool_timeout,
+        )
+        if transport is None and wrap_transport is not None:
+            # Built the way httpx.AsyncClient builds its default transport
+            transport = wrap_transport(httpx.AsyncHTTPTransport(
+                verify=self.config.verify, http2=self.config.http2 and HTTP2_AVAILABLE, limits=limits))
+        self._client = httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            http2=self.config.http2 and HTTP2_AVAILABLE,
+            verify=self.config.verify,
+            transport=transport,
+        )
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def request(self, method: str, url: str, timeout: Optional[float] = None,
+                      retries: Optional[int] = None,
+                      read: Optional[Callable[[httpx.Response], Awaitable[Any]]] = None, **kwargs: Any) -> Any:
+        """Send a request through the pool, retrying transient failures.
+
+        Args:
+            method: The HTTP method.
+            url: The absolute URL to call.
+            timeout: Seconds allowed for each phase of an attempt (connecting, waiting for a
+                pooled connection, writing and each read), overriding the client defaults.
+                It does not bound the attempt as a whole.
+            retries: Extra attempts, overriding the client default.
+            read: Consumes the final response while its body streams in, instead
+                of the body being loaded into memory. The response is closed after.
+            **kwargs: Passed through to `httpx.AsyncClient.request`.
+
+        Returns:
+            The final `httpx.Response`, or what `read` returned for it.
+        """
+        retries = self.config.retries if retries is None else retries
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        attempt = 0
+        while True:
+            try:
+                async with self._host_semaphore(url):
+                    if read is None:
+                        response = await self._client.request(method, url, **kwargs)
+                    else:
+                        request = self._client.build_request(method, url, **kwargs)
+                        response = await self._client.send(request, stream=True)
+                    if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= retries:
+                        if read is None:
+                            return response
+                        try:
+                            return await read(response)
+                        finally:
+                            await response.aclose()
+                    if read is not None:
+                        await response.aclose()
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            attempt += 1
+            delay = self.config.backoff * (2 ** (attempt - 1))
+            await asyncio.sleep(delay + random.uniform(0, delay))
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a GET request. See `request` for the supported arguments."""
+        return await self.request("GET", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        await self._client.aclose()
+
+
+_shared_client: Optional[AsyncHTTPClient] = None
+_shared_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_config = HTTPClientConfig()
+_shared_wrap_transport: Optional[TransportWrapper] = None
+# Closes of replaced shared clients still in progress, kept so they are not garbage collected
+_closing: Set[Any] = set()
+
+
+def _close_shared_client() -> None:
+    # Drop the shared client, closing it on the loop its connections belong to
+    global _shared_client, _shared_client_loop
+    client, loop = _shared_client, _shared_client_loop
+    _shared_client = None
+    _shared_client_loop = None
+    if client is None or loop is None or loop.is_closed() or not loop.is_running():
+        # A stopped loop can no longer run the close, and its connections are unusable anyway
+        return
+    try:
+        same_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        same_loop = False
+    if same_loop:
+        closing = loop.create_task(client.aclose())
+    else:
+        closing = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    _closing.add(closing)
+    closing.add_done_callback(_closing.discard)
+
+
+def configure_http_client(config: Optional[HTTPClientConfig] = None,
+                          wrap_transport: Optional[TransportWrapper] = None) -> None:
+    """Set the configuration used the next time the shared client is created.
+
+    The current shared client is closed on the event loop it was created on.
+
+    Args:
+        config: New settings, None to keep the current ones.
+        wrap_transport: Wraps the transport of every shared client created from now on, None for none.
+    """
+    global _shared_config, _shared_wrap_transport
+    if config is not None:
+        _shared_config = config
+    _shared_wrap_transport = wrap_transport
+    _close_shared_client()
+
+
+def get_http_client() -> AsyncHTTPClient:
+    """Return the process-wide HTTP client for the running event loop.
+
+    Connections are bound to the loop that opened them, so a fresh client is
+    created whenever the running loop changes (e.g. across `asyncio.run` calls).
+    """
+    global _shared_client, _shared_client_loop
+    loop = asyncio.get_running_loop()
+    if _shared_client is None or _shared_client_loop is not loop:
+        # The old client's connections belong to the old loop; close them there, or drop them if it has stopped
+        _close_shared_client()
+        _shared_client = AsyncHTTPClient(_shared_config, wrap_transport=_shared_wrap_transport)
+        _shared_client_loop = loop
+    return _shared_client
+
+
+async def close_http_client() -> None:
+    """Close the shared client, if one was created on the running loop."""
+    global _shared_client, _shared_client_loop
+    if _shared_client is not None and _shared_client_loop is asyncio.get_running_loop():
+        await _shared_client.aclose()
+    _shared_client = None
+    _shared_client_loop = None
@@ -0,0 +1,277 @@
+import codecs
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple
+
+import httpx
+
+# Largest upstream response body a tool reads, in bytes
+MAX_RESPONSE_BYTES = 1 << 20
+
+# Consumed text kept in the buffer before it is dropped, in characters
+_COMPACT_AFTER = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+# Everything up to the next bracket outside a string, used to skip over a container
+_NON_BRACKETS = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*', re.S)
+_decoder = json.JSONDecoder()
+
+
+class ResponseTooLarge(ValueError):
+    """The response body exceeded the configured size limit."""
+
+
+class _Incomplete(Exception):
+    """The buffer ends inside the current member; wait for more input."""
+
+
+class JSONProjector:
+    """Incremental JSON parser that keeps only selected top-level fields.
+
+    The body is fed in chunks as it arrives. A top-level object is parsed one
+    member at a time; members not in `fields` are scanned past without being
+    built, so memory holds the kept fields plus the text of the member being
+    read, not the parsed document. A top-level array (a batched response) is
+    projected element by element. Any other document is parsed whole.
+
+    A member split across chunks is retried only once the unparsed tail has
+    doubled, so parsing stays linear in the body size.
+
+    Args:
+        fields: Top-level keys to keep, None to keep everything.
+        max_bytes: Body size above which ResponseTooLarge is raised.
+    """
+
+    def __init__(self, fields: Optional[Iterable[str]] = None, max_bytes: int = MAX_RESPONSE_BYTES):
+        self.fields: Optional[FrozenSet[str]] = frozenset(fields) if fields is not None else None
+        self.max_bytes = max_bytes
+        self.received_bytes = 0
+        self.kept_bytes = 0
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # Decoded text not yet appended to the buffer, and its length
+        self._chunks: List[str] = []
+        self._queued = 0
+        self._pos = 0
+        self._retry_at = 0
+        # Bracket depth of a skipped container cut off by the end of the input
+        self._skip_depth = 0
+        self._state = "start"
+        # The top-level object or array being filled, and whether a member was read yet
+        self._result: Any = None
+        self._first = True
+        self._closed = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Add the next chunk of the body, parsing every member it completes."""
+        self.received_bytes += len(chunk)
+        if self.received_bytes > self.max_bytes:
+            raise ResponseTooLarge(f"Response body exceeds {self.max_bytes} bytes")
+        text = self._text.decode(chunk)
+        self._chunks.append(text)
+        self._queued += len(text)
+        if len(self._buffer) - self._pos + self._queued >= self._retry_at:
+            self._parse()
+
+    def close(self) -> Any:
+        """Finish parsing and return the projected document.
+
+        Raises:
+            json.JSONDecodeError: If the body is not valid JSON.
+        """
+        self._chunks.append(self._text.decode(b"", final=True))
+        self._closed = True
+        self._parse()
+        if self._state == "object":
+            raise json.JSONDecodeError("Unterminated object", self._buffer, self._pos)
+        if self._state == "array":
+            raise json.JSONDecodeError("Unterminated array", self._buffer, self._pos)
+        if self._state != "done":
+            value = json.loads(self._buffer)
+            if self.fields is None:
+                self.kept_bytes = self.received_bytes
+            return value
+        if self._buffer[self._pos:].strip(_WHITESPACE):
+            raise json.JSONDecodeError("Extra data", self._buffer, self._pos)
+        return self._result
+
+    def _skip_whitespace(self, pos: int) -> int:
+        buffer = self._buffer
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            raise _Incomplete
+        return pos
+
+    def _value(self, pos: int) -> Tuple[Any, int]:
+        try:
+            value, end = _decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if self._closed:
+                raise
+            raise _Incomplete
+        if not self._closed:
+            # A value at the very end may continue in the next chunk, and a
+            # number cut at "1." or "1e" parses as its prefix
+            if end == len(self._buffer):
+                raise _Incomplete
+            if isinstance(value, (int, float)) and self._buffer[end] in _NUMBER_CHARS:
+                raise _Incomplete
+        return value, end
+
+    def _skip(self, pos: int, depth: int = 0) -> int:
+        """Find the end of the value at `pos` without building it.
+
+        Skipped containers are only scanned for their extent, not validated.
+        When the input runs out mid-container, the scanned text is consumed
+        and the scan resumes from there with the next chunk.
+        """
+        buffer = self._buffer
+        if not depth and buffer[pos] not in "[{":
+            return self._value(pos)[1]
+        end = len(buffer)
+        while True:
+            pos = _NON_BRACKETS.match(buffer, pos).end()
+            # Stopped at the end of the buffer, or at a string it ends inside
+            if pos == end or buffer[pos] == '"':
+                break
+            depth += 1 if buffer[pos] in "[{" else -1
+            pos += 1
+            if depth == 0:
+                return pos
+        if self._closed:
+            raise json.JSONDecodeError("Unterminated value", buffer, pos)
+        self._pos, self._skip_depth = pos, depth
+        raise _Incomplete
+
+    def _keep(self, start: int, end: int) -> None:
+        if self.fields is None:
+            self.kept_bytes = self.received_bytes
+        else:
+            self.kept_bytes += len(self._buffer[start:end].encode())
+
+    def _project(self, value: Any) -> Any:
+        if self.fields is None or not isinstance(value, dict):
+            return value
+        return {key: item for key, item in value.items() if key in self.fields}
+
+    def _parse(self) -> None:
+        if self._chunks:
+            self._buffer += "".join(self._chunks)
+            self._chunks, self._queued = [], 0
+        try:
+            if self._state == "start":
+                pos = self._skip_whitespace(self._pos)
+                opening = self._buffer[pos]
+                if opening == "{":
+                    self._state, self._result = "object", {}
+                elif opening == "[":
+                    self._state, self._result = "array", []
+                else:
+                    # Scalars are parsed whole on close
+                    self._state = "scalar"
+                    return
+                self._pos = pos + 1
+            while self._state in ("object", "array"):
+                self._member()
+        except _Incomplete:
+            # Retry once the unparsed tail has doubled
+            self._retry_at = 2 * (len(self._buffer) - self._pos)
+            return
+        finally:
+            if self._pos > _COMPACT_AFTER and self._pos * 2 > len(self._buffer):
+                self._buffer = self._buffer[self._pos:]
+                self._pos = 0
+        self._retry_at = 0
+
+    def _member(self) -> None:
+        if self._skip_depth:
+            depth, self._skip_depth = self._skip_depth, 0
+            self._pos, self._first = self._skip(self._pos, depth), False
+            return
+        buffer = self._buffer
+        pos = self._skip_whitespace(self._pos)
+        closing = "}" if self._state == "object" else "]"
+        if buffer[pos] == closing:
+            self._state, self._pos = "done", pos + 1
+            return
+        if not self._first:
+            if buffer[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos = self._skip_whitespace(pos + 1)
+
+        if self._state == "array":
+            value, end = self._value(pos)
+            value = self._project(value)
+            if self.fields is not None:
+                self.kept_bytes += len(json.dumps(value).encode())
+            else:
+                self._keep(pos, end)
+            self._result.append(value)
+            self._pos, self._first = end, False
+            return
+
+        if buffer[pos] != '"':
+            raise json.JSONDecodeError("Expecting property name enclosed in double quotes", buffer, pos)
+        key, end = self._value(pos)
+        colon = self._skip_whitespace(end)
+        if buffer[colon] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", buffer, colon)
+        start = self._skip_whitespace(colon + 1)
+        if self.fields is None or key in self.fields:
+            value, end = self._value(start)
+            self._result[key] = value
+            self._keep(pos, end)
+        else:
+            end = self._skip(start)
+        self._pos, self._first = end, False
+
+
+@dataclass
+class ProjectedResponse:
+    """A response whose JSON body was projected while streaming and then discarded.
+
+    Has `status_code` and `raise_for_status` like httpx.Response, so it can
+    pass through resilience.Upstream.
+
+    Attributes:
+        response: The (closed) HTTP response, without its body.
+        data: The projected document.
+        received_bytes: Body size as received, after content decoding.
+        kept_bytes: Bytes of the body that made it into `data`.
+    """
+    response: httpx.Response
+    data: Any
+    received_bytes: int
+    kept_bytes: int
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    def raise_for_status(self) -> httpx.Response:
+        return self.response.raise_for_status()
+
+
+async def read_json(response: httpx.Response, fields: Optional[Iterable[str]] = None,
+                    max_bytes: int = MAX_RESPONSE_BYTES) -> ProjectedResponse:
+    """Stream a response body through a JSONProjector.
+
+    Error bodies are parsed whole rather than projected, since they rarely
+    carry the declared fields and callers want to see what the upstream said.
+
+    Raises:
+        ResponseTooLarge: If Content-Length or the body read so far exceeds `max_bytes`.
+        json.JSONDecodeError: If the body is not valid JSON.
+    """
+    if response.status_code >= 400:
+        fields = None
+    length = response.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise ResponseTooLarge(f"Response body of {length} bytes exceeds {max_bytes} bytes")
+    projector = JSONProjector(fields, max_bytes)
+    async for chunk in response.aiter_bytes():
+        projector.feed(chunk)
+    return ProjectedResponse(response, projector.close(), projector.received_bytes, projector.kept_bytes)
@@ -0,0 +1,214 @@
+import asyncio
+import itertools
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Pattern
+
+from agents import Model, ModelProvider, ModelResponse, ModelSettings, ModelTracing, Usage
+from agents.agent_output import AgentOutputSchema
+from agents.models.fake_id import FAKE_RESPONSES_ID
+from openai.types.responses import (Response, ResponseCompletedEvent, ResponseFunctionToolCall,
+                                    ResponseOutputMessage, ResponseOutputText, ResponseTextDeltaEvent)
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def _last_user_message(input: Any) -> str:
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if isinstance(item, dict) and item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            if isinstance(content, list):
+                return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def _placeholder_for_schema(schema: dict) -> Any:
+    """Build a value that satisfies a (strict) JSON schema."""
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _placeholder_for_schema(prop) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return []
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return 0
+    return "mock"
+
+
+def text_message(text: str) -> ResponseOutputMessage:
+    """Build an assistant output message holding `text`."""
+    return ResponseOutputMessage(
+        id=FAKE_RESPONSES_ID,
+        type="message",
+        role="assistant",
+        status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+class MockModel(Model):
+    """Local stand-in for an LLM that answers without calling any API.
+
+    Plain-text agents get an echo of the last user message and agents with an
+    output type get a placeholder object matching their schema.
+
+    Streaming calls emit text word by word as output_text deltas, then the
+    completed response.
+
+    Args:
+        latency: Seconds to sleep per call, to simulate model latency.
+        token_latency: Seconds to sleep per streamed token.
+    """
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+
+    def _output(self, input: Any, output_schema: Optional[AgentOutputSchema]) -> ResponseOutputMessage:
+        if output_schema is not None and not output_schema.is_plain_text():
+            return text_message(json.dumps(_placeholder_for_schema(output_schema.json_schema())))
+        return text_message(f"You said: {_last_user_message(input)}")
+
+    def _respond(self, input: Any, tools: list, handoffs: list, output_schema) -> Any:
+        return self._output(input, output_schema)
+
+    async def get_response(self, system_instructions, input, model_settings: ModelSettings, tools,
+                           output_schema, handoffs, tracing: ModelTracing) -> ModelResponse:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        item = self._respond(input, tools, handoffs, output_schema)
+        # A non-streamed answer still takes as long to generate as a streamed one
+        if self.token_latency and isinstance(item, ResponseOutputMessage):
+            await asyncio.sleep(self.token_latency * len(_TOKEN_RE.findall(item.content[0].text)))
+        return ModelResponse(
+            output=[item],
+            usage=Usage(requests=1),
+            referenceable_id=None,
+        )
+
+    async def stream_response(self, system_instructions, input, model_settings: ModelSettings, tools,
+                              output_schema, handoffs, tracing: ModelTracing) -> AsyncIterator[Any]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        item = self._respond(input, tools, handoffs, output_schema)
+        if isinstance(item, ResponseOutputMessage):
+            for token in _TOKEN_RE.findall(item.content[0].text):
+                if self.token_latency:
+                    await asyncio.sleep(self.token_latency)
+                yield ResponseTextDeltaEvent(content_index=0, delta=token, item_id=FAKE_RESPONSES_ID,
+                                             output_index=0, type="response.output_text.delta")
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            response=Response(id=FAKE_RESPONSES_ID, created_at=time.time(), model="mock", object="response",
+                              output=[item], parallel_tool_calls=False, tool_choice="auto", tools=[]),
+        )
+
+
+@dataclass
+class ScriptRule:
+    """Calls `target` (a tool or handoff tool name) when `pattern` matches the user message.
+
+    Attributes:
+        pattern: Regex searched (case-insensitively) in the latest user message.
+        target: Tool or handoff tool name to call. The rule is skipped when the
+            current agent does not offer it.
+        arguments: Builds the call arguments from the match, defaults to the
+            match's named groups.
+    """
+    pattern: Pattern
+    target: str
+    arguments: Optional[Callable[[re.Match], Dict[str, Any]]] = None
+
+    def build_arguments(self, match: re.Match) -> Dict[str, Any]:
+        if self.arguments is not None:
+            return self.arguments(match)
+        return {k: v.strip() for k, v in match.groupdict().items() if v is not None}
+
+
+def rule(pattern: str, target: str, arguments: Optional[Callable[[re.Match], Dict[str, Any]]] = None) -> ScriptRule:
+    return ScriptRule(re.compile(pattern, re.IGNORECASE), target, arguments)
+
+
+# Scripts for the tools and handoffs of travel_agent and agent1, first match wins
+DEFAULT_RULES: List[ScriptRule] = [
+    rule(r"weather (?:in|for|at) (?P<location>[\w ,.'-]+?)[?.!]*$", "fetch_weather"),
+    rule(r"(?P<cuisine>\w+) (?:food|restaurants?|dinner|lunch) in (?P<location>[\w ,.'-]+?)[?.!]*$",
+         "recommend_restaurant"),
+    rule(r"(?:calculate|compute|what is) (?P<expression>[\d.\s+\-*/()]*\d[\d.\s+\-*/()]*)", "calculate"),
+    rule(r"(?:search(?: for)?|look up|tell me about) (?P<query>.+?)[?.!]*$", "search_web"),
+    rule(r"\d\s*[-+*/^=]\s*\d|\b(?:math|equation|solve|derivative|integral|algebra|geometry)\b",
+         "transfer_to_math_tutor", lambda match: {}),
+    rule(r".", "transfer_to_history_tutor", lambda match: {}),
+]
+
+
+class ScriptedModel(MockModel):
+    """Deterministic model that drives real tool and handoff paths from scripted rules.
+
+    Each call looks at the latest input item:
+    - after a tool or handoff result, it answers with text built from that result;
+    - otherwise the first rule whose target the agent offers and whose pattern
+      matches the user message produces a function call;
+    - with no matching rule it falls back to MockModel behaviour.
+
+    Args:
+        rules: Script rules, first match wins. Defaults to DEFAULT_RULES.
+        latency: Seconds to sleep per call, to simulate model latency.
+        token_latency: Seconds to sleep per streamed token.
+    """
+
+    def __init__(self, rules: Optional[List[ScriptRule]] = None, latency: float = 0.0, token_latency: float = 0.0):
+        super().__init__(latency, token_latency)
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self._call_ids = itertools.count(1)
+
+    def _respond(self, input: Any, tools: list, handoffs: list, output_schema) -> Any:
+        if output_schema is not None and not output_schema.is_plain_text():
+            return self._output(input, output_schema)
+
+        last = input[-1] if isinstance(input, list) and input else None
+        if isinstance(last, dict) and last.get("type") == "function_call_output":
+            return text_message(f"Here is what I found: {last.get('output')}")
+
+        offered = {tool.name for tool in tools} | {handoff.tool_name for handoff in handoffs}
+        message = _last_user_message(input)
+        for script_rule in self.rules:
+            if script_rule.target not in offered:
+                continue
+            match = script_rule.pattern.search(message)
+            if match:
+                return ResponseFunctionToolCall(
+                    type="function_call",
+                    id=FAKE_RESPONSES_ID,
+                    call_id=f"call_{next(self._call_ids)}",
+                    name=script_rule.target,
+                    arguments=json.dumps(script_rule.build_arguments(match)),
+                )
+        return self._output(input, output_schema)
+
+
+class MockModelProvider(ModelProvider):
+    """Model provider returning one shared MockModel for every model name."""
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0):
+        self.model = MockModel(latency, token_latency)
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return self.model
+
+
+class ScriptedModelProvider(MockModelProvider):
+    """Model provider returning one shared ScriptedModel for every model name."""
+
+    def __init__(self, rules: Optional[List[ScriptRule]] = None, latency: float = 0.0, token_latency: float = 0.0):
+        self.model = ScriptedModel(rules, latency, token_latency)
@@ -1,26 +1,39 @@
 import os
+import argparse
 import asyncio
+import time
 from typing import Dict, Any
-from agents import Agent, Runner, function_tool
-from dotenv import load_dotenv
-import requests
 import inspect
 import asyncio
 import os  # You're using os.getenv
 
-from typing import Callable, Coroutine, Any  # For type hinting
+from typing import AsyncIterator, Callable, Coroutine, Any, Mapping  # For type hinting
 
-# Load environment variables
-load_dotenv()
-from agents import set_tracing_export_api_key
-set_tracing_export_api_key(os.getenv("OPENAI_API_KEY"))
+import httpx
 
+from batching import RequestBatcher
+from fanout import FanOutResult, fan_out, fan_out_iter
+from http_client import get_http_client, close_http_client
+from json_projection import ProjectedResponse, read_json
+from param_extractor import ParameterExtractor
+from resilience import get_upstream
+from response_cache import ResponseCache, normalize_arguments
+from startup import DescriptionCache, code_fingerprint, configure_environment
+from streaming import StreamEvent, format_timing, render_stream
+from tool_config import ToolConfigChanges, ToolConfigSource
+from tool_metrics import (TOOL_METRICS, MetricsRegistry, note_batched, note_cache, note_error, note_payload,
+                          note_projection)
+from tool_registry import ToolRegistry, ToolSpec, compile_tool_spec
+from tool_router import ToolRouter
 
 TOOL_CONFIGS = {
     "get_facts_about_cats": {
         "kwargs": [],
         "url": "https://catfact.ninja/fact",
         "description": "Get a fun fact about cats!",
+        "cache": False,
+        "resilience": {"breaker": {"failure_threshold": 5, "reset_timeout": 30.0},
+                       "concurrency": {"initial": 10, "max": 50}, "hedge": {"after": 0.5}},
         "response":[{"name": "fact", "description": "A fun fact about cats"}, {"name": "length", "description": "The length of the fact"}]
     },
     "get_details_of_a_person": {
@@ -30,6 +43,10 @@ TOOL_CONFIGS = {
         "serviceId": "1",
         "operationId": "uuid2",
         "method": "GET",
+        "cache": {"ttl": 86400},
+        "batch": {"param": "name", "max_size": 10, "window": 0.005},
+        "resilience": {"breaker": {"failure_threshold": 5, "reset_timeout": 30.0},
+                       "concurrency": {"initial": 10, "max": 50, "latency_target": 2.0}, "hedge": {"after": 0.5}},
         "response":[{"name": "name", "description": "The name of the person"}, 
                     {"name": "age", "description": "The predicted age for the name"},
                     {"name":"count", "description": "Number of records found with this name"}]
@@ -39,12 +56,25 @@ TOOL_CONFIGS = {
         "description": "Get the name, age and country of a person!",
         "url": "https://api.nationalize.io/",
         "method": "GET",
+        "cache": {"ttl": 86400},
+        "batch": {"param": "name", "max_size": 10, "window": 0.005},
+        "resilience": {"breaker": {"failure_threshold": 5, "reset_timeout": 30.0},
+                       "concurrency": {"initial": 10, "max": 50, "latency_target": 2.0}, "hedge": {"after": 0.5}},
         "response":[{"name": "name", "description": "The name of the person"}, 
                     {"name": "country", "description": "The predicted age for the name"},
                     {"name":"count", "description": "Number of records found with this name"}]
     }
 }
-    
+
+# Built-in entries, restored when a config file that overrode one is deleted
+BUILTIN_TOOL_CONFIGS = dict(TOOL_CONFIGS)
+
+# Shared response cache for TOOL_CONFIGS-driven tools
+RESPONSE_CACHE = ResponseCache(max_size=1024)
+
+# Last successful response per call, served while an upstream's circuit is open
+LAST_KNOWN_GOOD = ResponseCache(max_size=4096, default_ttl=7 * 86400)
+
 def get_tool_description(tool_id: str, required_args: list, response_parameters: list) -> str:
     """
     Generate a description for a specific tool based on its configuration.
@@ -92,216 +122,384 @@ def get_tool_description(tool_id: str, required_args: list, response_parameters:
     
     return description
 
-def create_tool(tool_id: str, tool_config: dict) -> Callable[..., Coroutine[Any, Any, Any]]:
+# Generated descriptions, persisted across processes when TOOL_DESCRIPTION_CACHE names a file
+DESCRIPTION_CACHE = DescriptionCache(version=code_fingerprint(get_tool_description))
+
+def describe_tool(tool_id: str, required_args: list, response_parameters: list) -> str:
+    """get_tool_description, generated once per distinct input and served from DESCRIPTION_CACHE after that."""
+    base_description = TOOL_CONFIGS.get(tool_id, {}).get("description")
+    return DESCRIPTION_CACHE.get_or_create(
+        (tool_id, base_description, required_args, response_parameters),
+        lambda: get_tool_description(tool_id, required_args, response_parameters))
+
+# Specs for TOOL_CONFIGS, each compiled on first use
+TOOL_REGISTRY = ToolRegistry.from_configs(TOOL_CONFIGS, describe_tool, lazy=True)
+
+def create_tool(tool_id: str, tool_config: dict, cache: ResponseCache | None = None,
+                metrics: MetricsRegistry | None = None) -> Callable[..., Coroutine[Any, Any, Any]]:
     """
     Creates an asynchronous tool function with a generated description.
 
     Args:
-        tool_config: Dictionary containing tool configurations.
+        tool_config: Dictionary containing tool configurations. Optional
+            "timeout" and "retries" keys override the shared HTTP client defaults,
+            "cache" is either False to opt out of response caching or a dict
+            with a "ttl" in seconds, and "batch" (a dict with "param", "max_size"
+            and "window") coalesces concurrent single-value lookups into one
+            upstream request using `param[]=` query parameters. "resilience"
+            configures the upstream's circuit breaker, adaptive concurrency
+            limit and hedged requests (see ResiliencePolicy.from_config).
+            Successful responses are streamed and cut down to the declared
+            "response" fields unless "project" is False, and bodies over
+            "max_response_bytes" (default 1 MiB) are rejected.
+        cache: Response cache to use, defaults to the shared RESPONSE_CACHE.
+        metrics: Metrics registry to record calls in, defaults to the shared TOOL_METRICS.
 
     Returns:
         An asynchronous function representing the tool.
     """
-    required_args = tool_config.get("kwargs", [])
-    url_template = tool_config.get("url", "")
-    response_parameters = tool_config.get("response", [])
-    
-    async def tool_function(*args: Any, **kwargs: Any) -> Any:
+    return build_tool(compile_tool_spec(tool_id, tool_config, describe_tool), cache, metrics)
+
+
+def build_tool(spec: ToolSpec, cache: ResponseCache | None = None,
+               metrics: MetricsRegistry | None = None) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """
+    Creates an asynchronous tool function from a compiled tool spec.
+
+    Args:
+        spec: The compiled spec, usually taken from TOOL_REGISTRY.
+        cache: Response cache to use, defaults to the shared RESPONSE_CACHE.
+        metrics: Metrics registry to record calls in, defaults to the shared TOOL_METRICS.
+
+    Returns:
+        An asynchronous function representing the tool.
+    """
+    cache = RESPONSE_CACHE if cache is None else cache
+    metrics = TOOL_METRICS if metrics is None else metrics
+    cache_ttl = (spec.cache_ttl or cache.default_ttl) if spec.cache_enabled else None
+    resilience = spec.resilience
+
+    async def read_body(response: httpx.Response) -> ProjectedResponse:
+        return await read_json(response, spec.projection, spec.max_response_bytes)
+
+    async def send(url: str) -> ProjectedResponse:
+        return await get_http_client().get(url, timeout=spec.timeout, retries=spec.retries, read=read_body)
+
+    async def fetch(url: str) -> Any:
         try:
-            # Build URL with query parameters
-            url = url_template
-            
-            # Handle positional arguments
-            if args and required_args:
-                for i, arg_details in enumerate(required_args):
-                    if i < len(args) and isinstance(arg_details, dict):
-                        # Add parameter to URL
-                        arg_name = arg_details.get("name", "")
-                        if arg_name:
-                            param_separator = '?' if '?' not in url else '&'
-                            url = f"{url}{param_separator}{arg_name}={args[i]}"
-            
-            # Handle keyword arguments
-            for key, value in kwargs.items():
-                # Check if this key is in the required arguments
-                for arg_detail in required_args:
-                    if isinstance(arg_detail, dict) and arg_detail.get("name") == key:
-                        # Add parameter to URL
-                        param_separator = '?' if '?' not in url else '&'
-                        url = f"{url}{param_separator}{key}={value}"
-                        break
-            
-            response = requests.get(url, verify=False)
-            
-            # Parse JSON response
-            json_data = response.json()
-            return json_data
+            if resilience is None:
+                response = await send(url)
+            else:
+                # Circuit breaker, adaptive concurrency limit and hedging for the upstream
+                response = await get_upstream(url, resilience).call(lambda: send(url))
+            note_payload(response.received_bytes)
+            note_projection(response.kept_bytes)
+            # Error bodies become error strings, which are never cached or kept as last known good
+            response.raise_for_status()
+            return response.data
         except Exception as e:
+            note_error(e)
             return f"Error calling API: {str(e)}"
+
+    def last_known_good(cache_key: tuple, result: Any) -> Any:
+        if not isinstance(result, str):
+            LAST_KNOWN_GOOD.set(cache_key, result)
+            return result
+        upstream = get_upstream(spec.url, resilience)
+        if upstream.breaker.state != "closed":
+            found, value = LAST_KNOWN_GOOD.get(cache_key)
+            if found:
+                upstream.fallbacks += 1
+                return value
+        return result
+
+    async def cached(cache_key: tuple, fetcher: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        result = await cached_lookup(cache_key, fetcher)
+        if resilience is not None and resilience.fallback:
+            return last_known_good(cache_key, result)
+        return result
+
+    async def cached_lookup(cache_key: tuple, fetcher: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        if cache_ttl is None:
+            return await fetcher()
+
+        fetched = False
+
+        async def fetch_and_flag() -> Any:
+            nonlocal fetched
+            fetched = True
+            return await fetcher()
+
+        # Error strings are returned rather than raised, so keep them out of the cache
+        result = await cache.get_or_fetch(cache_key, fetch_and_flag, cache_ttl,
+                                          cacheable=lambda value: not isinstance(value, str))
+        note_cache(hit=not fetched)
+        return result
+
+    batcher = None
+    batch_param = spec.batch_param
+    if batch_param:
+        async def send_batch(values: list) -> Any:
+            result = await fetch(spec.build_batch_url(values))
+            if isinstance(result, str):
+                raise RuntimeError(result.removeprefix("Error calling API: "))
+            return result
+
+        batcher = RequestBatcher(send_batch, spec.batch_max_size, spec.batch_window)
+
+        async def batched_lookup(value: Any) -> Any:
+            note_batched()
+            try:
+                return await batcher.submit(value)
+            except Exception as e:
+                note_error(e)
+                return f"Error calling API: {str(e)}"
+
+    async def tool_function(*args: Any, **kwargs: Any) -> Any:
+        values = spec.bind(args, kwargs)
+        arguments = spec.arguments(values)
+
+        # Single-value lookups, or an explicit list of values, go through the batcher
+        if batcher is not None and len(arguments) == 1 and batch_param in arguments:
+            value = arguments[batch_param]
+            if isinstance(value, (list, tuple)):
+                return list(await asyncio.gather(*(
+                    cached((spec.tool_id, spec.url, normalize_arguments({batch_param: v})),
+                           lambda v=v: batched_lookup(v))
+                    for v in value)))
+            return await cached((spec.tool_id, spec.url, normalize_arguments(arguments)), lambda: batched_lookup(value))
+
+        url = spec.build_url(values)
+        # The base URL is part of the key, so a reloaded tool pointing elsewhere starts cold
+        return await cached((spec.tool_id, spec.url, normalize_arguments(arguments)), lambda: fetch(url))
     
-    tool_function.__doc__ = get_tool_description(tool_id, required_args, response_parameters)
-    tool_function.__name__ = tool_id
+    tool_function.__doc__ = spec.description
+    tool_function.__name__ = spec.tool_id
+    tool_function.spec = spec
+    tool_function.batcher = batcher
     
-    return tool_function
+    # Latency, in-flight, error, payload and cache/batch metrics per call
+    return metrics.instrument(tool_function)
 
 
-async def main():
-    
-    # Create the tools based on configuration
-    tool_list: list[Callable[..., Coroutine[Any, Any, Any]]] = []
-    for tool_name, tools_details in TOOL_CONFIGS.items():
-        tool = create_tool(tool_name, tools_details)
-        tool_list.append(tool)
-
-    # Assuming 'Agent' and 'Runner' are defined elsewhere in your code
-    # and that they can handle asynchronous functions.
-    class Agent:  # Placeholder for your Agent class
-        def __init__(self, name: str, instructions: str, tools: list[Callable[..., Coroutine[Any, Any, Any]]]):
-            self.name = name
-            self.instructions = instructions
-            self.tools = tools
-
-    class Runner:  # Placeholder for your Runner class
-        @staticmethod
-        async def run(agent: Agent, user_input: str) -> Any:
-            # Simulate running the agent and tools
+class LazyTool:  # Stands in for a generated tool until it is described or called
+    def __init__(self, tool_id: str, tool_config: dict, compile_spec: Callable[[], ToolSpec],
+                 build: Callable[[ToolSpec], Callable[..., Coroutine[Any, Any, Any]]]):
+        self.__name__ = tool_id
+        self.config = tool_config
+        self._compile_spec = compile_spec
+        self._build = build
+        self._spec: ToolSpec | None = None
+        self._tool: Callable[..., Coroutine[Any, Any, Any]] | None = None
+
+    @property
+    def spec(self) -> ToolSpec:
+        # Compiled and described on first access; routing and extraction only need the config
+        if self._spec is None:
+            self._spec = self._compile_spec()
+        return self._spec
+
+    @property
+    def __doc__(self) -> str:
+        return self.spec.description
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        tool = self._tool
+        if tool is None:
+            # Build the tool function (metrics, batcher) on first call
+            tool = self._tool = self._build(self.spec)
+        return await tool(*args, **kwargs)
+
+
+def _tool_config(tool: Callable[..., Coroutine[Any, Any, Any]]) -> dict:
+    # A LazyTool's config is read without compiling its spec
+    return tool.config if isinstance(tool, LazyTool) else tool.spec.config
+
+
+# Seconds between checks of the tool config files, when watching them
+TOOL_RELOAD_INTERVAL = 2.0
+
+# Deadlines for tool fan-out in Runner.run, in seconds
+TOOL_CALL_TIMEOUT = 10.0
+TOOL_FANOUT_TIMEOUT = 15.0
+
+
+class Agent:  # Lightweight stand-in for the SDK Agent, driving config-driven tools directly
+    def __init__(self, name: str, instructions: str, tools: list[Callable[..., Coroutine[Any, Any, Any]]]):
+        self.name = name
+        self.instructions = instructions
+        self.tools = list(tools)
+        self.tools_by_name = {tool.__name__: tool for tool in self.tools}
+        self.router = ToolRouter.from_tools(self.tools)
+        self.extractor = ParameterExtractor.from_tool_configs(_tool_config(tool) for tool in self.tools)
+
+    def add_tool(self, tool: Callable[..., Coroutine[Any, Any, Any]]) -> None:
+        """Add or replace a tool, updating the routing index and extractor incrementally.
+
+        A replaced tool keeps its position, so merged results keep their precedence.
+        """
+        replaced = self.tools_by_name.get(tool.__name__)
+        if replaced is not None:
+            self.extractor.remove_tool_config(_tool_config(replaced))
+            self.tools[self.tools.index(replaced)] = tool
+        else:
+            self.tools.append(tool)
+        self.tools_by_name[tool.__name__] = tool
+        self.router.add_tool(tool.__name__, tool.__doc__ if self.router.use_descriptions else None)
+        self.extractor.add_tool_config(_tool_config(tool))
+
+    def remove_tool(self, tool_name: str) -> None:
+        """Remove a tool by name, if present."""
+        tool = self.tools_by_name.pop(tool_name, None)
+        if tool is not None:
+            self.tools.remove(tool)
+            self.router.remove_tool(tool_name)
+            self.extractor.remove_tool_config(_tool_config(tool))
+
+
+class Runner:  # Keyword-routing runner for config-driven tools
+    @staticmethod
+    async def run(agent: Agent, user_input: str,
+                  per_call_timeout: float | None = TOOL_CALL_TIMEOUT,
+                  overall_timeout: float | None = TOOL_FANOUT_TIMEOUT,
+                  verbose: bool = True) -> Any:
+        """Route the user input to the relevant tools and run them.
+
+        Args:
+            agent: The agent whose tools should be considered.
+            user_input: The user message.
+            per_call_timeout: Seconds each tool call may take.
+            overall_timeout: Seconds all concurrent tool calls may take together.
+            verbose: Print the input and available tools.
+
+        Returns:
+            A result object with `final_output`, plus `tool_timings` and
+            `timed_out_tools` describing the tool fan-out.
+        """
+        # Simulate running the agent and tools
+        if verbose:
             print(f"Agent '{agent.name}' received input: '{user_input}'")
             print("Available tools:")
             for tool in agent.tools:
                 print(f"- {tool.__name__}: {tool.__doc__}")  # Access name and docstring
 
-            # Process user query
-            user_input_lower = user_input.lower()
-            
-            # Determine which tools might be relevant based on user input
-            relevant_tools = []
-            for tool in agent.tools:
-                # Check for keywords in tool name
-                keywords = tool.__name__.split('_')
-                if any(keyword in user_input_lower for keyword in keywords):
-                    relevant_tools.append(tool)
-
-            # If multiple tools are relevant, run them all and combine results
-            if len(relevant_tools) > 1:
-                # Extract parameters once
-                name_param = Runner._extract_parameter(user_input, "name")
-                
-                # Run all relevant tools with the same parameters
-                combined_result = {}
-                
-                # Execute all relevant tools
-                for tool in relevant_tools:
-                    tool_config = TOOL_CONFIGS.get(tool.__name__, {})
-                    params = {}
-                    
-                    # Build parameters for this tool
-                    for arg_detail in tool_config.get("kwargs", []):
-                        if isinstance(arg_detail, dict):
-                            arg_name = arg_detail.get("name", "")
-                            if arg_name:
-                                params[arg_name] = Runner._extract_parameter(user_input, arg_name)
-                    
-                    # Execute the tool
-                    result = await tool(**params)
-                    
-                    # Merge results, avoiding duplicate keys
-                    if isinstance(result, dict):
-                        for key, value in result.items():
-                            if key not in combined_result:
-                                combined_result[key] = value
-                
-                return type('Result', (object,), {"final_output": combined_result})
-            
-            # If only one tool is relevant, use it
-            elif len(relevant_tools) == 1:
-                tool = relevant_tools[0]
-                tool_config = TOOL_CONFIGS.get(tool.__name__, {})
-                params = {}
-                
-                # Extract parameters for this tool
-                for arg_detail in tool_config.get("kwargs", []):
-                    if isinstance(arg_detail, dict):
-                        arg_name = arg_detail.get("name", "")
-                        if arg_name:
-                            params[arg_name] = Runner._extract_parameter(user_input, arg_name)
-                
-                # Execute the tool
-                result = await tool(**params)
-                return type('Result', (object,), {"final_output": result})
-            
-            # No relevant tools found, try all tools
-            else:
-                # Extract common parameters
-                name_param = Runner._extract_parameter(user_input, "name")
-                
-                # Try all tools with extracted parameters and merge results
-                combined_result = {}
-                
-                for tool in agent.tools:
-                    tool_config = TOOL_CONFIGS.get(tool.__name__, {})
-                    params = {}
-                    
-                    # Build parameters for this tool
-                    for arg_detail in tool_config.get("kwargs", []):
-                        if isinstance(arg_detail, dict):
-                            arg_name = arg_detail.get("name", "")
-                            if arg_name:
-                                params[arg_name] = Runner._extract_parameter(user_input, arg_name)
-                    
-                    try:
-                        # Execute the tool
-                        result = await tool(**params)
-                        
-                        # Merge results, avoiding duplicate keys
-                        if isinstance(result, dict):
-                            for key, value in result.items():
-                                if key not in combined_result:
-                                    combined_result[key] = value
-                    except Exception:
-                        # Skip tools that fail
-                        continue
-                
-                if combined_result:
-                    return type('Result', (object,), {"final_output": combined_result})
-                
-                # Default response if no results were generated
-                return type('Result', (object,), {"final_output": "I'm not sure what information you're looking for. You can ask for cat facts or age predictions."})
-        
-        @staticmethod
-        def _extract_parameter(input_text: str, param_name: str) -> str:
-            """Extract a parameter value from user input text.
-            
-            Args:
-                input_text: The user input text
-                param_name: The name of the parameter to extract
-                
-            Returns:
-                The extracted parameter value or a default value
-            """
-            parts = input_text.lower().split()
-            
-            # For "name" parameter specifically
-            if param_name == "name":
-                # Look for phrases like "age of John" or "details for Sarah"
-                for i, part in enumerate(parts):
-                    if part in ["of", "for", "about"] and i+1 < len(parts):
-                        return parts[i+1]
-                    
-                # Look for patterns like "name is John" or "for name John"
-                for i, part in enumerate(parts):
-                    if part == param_name and i+2 < len(parts) and parts[i+1] in ["is", "of", "for"]:
-                        return parts[i+2]
-                    if part in ["for", "about", "with"] and i+1 < len(parts) and parts[i+1] == param_name and i+2 < len(parts):
-                        return parts[i+2]
-            
-            # Default values for known parameters
-            defaults = {
-                "name": "meelad"
-            }
-            
-            return defaults.get(param_name, "")
-
-    assistant = Agent(
+        # Determine which tools might be relevant based on user input
+        relevant_tools = [agent.tools_by_name[name] for name in agent.router.route(user_input)]
+
+        # Extract every declared parameter in one pass over the input
+        parameters = agent.extractor.extract(user_input)
+
+        # If only one tool is relevant, use it
+        if len(relevant_tools) == 1:
+            tool = relevant_tools[0]
+            outcome = await fan_out([Runner._tool_call(tool, parameters)], per_call_timeout, overall_timeout)
+            status = outcome.timings[tool.__name__].status
+            return Runner._result(outcome.results.get(tool.__name__, f"Error calling API: {tool.__name__} {status}"), outcome)
+
+        # If multiple tools are relevant run them all, otherwise try all tools
+        tools = relevant_tools if relevant_tools else agent.tools
+        outcome = await fan_out([Runner._tool_call(tool, parameters) for tool in tools],
+                                per_call_timeout, overall_timeout)
+        return Runner._result(Runner._merged_output(outcome, bool(relevant_tools)), outcome)
+
+    @staticmethod
+    async def run_streamed(agent: Agent, user_input: str,
+                           per_call_timeout: float | None = TOOL_CALL_TIMEOUT,
+                           overall_timeout: float | None = TOOL_FANOUT_TIMEOUT) -> AsyncIterator[StreamEvent]:
+        """Streaming counterpart of `run`: each tool's result is yielded as soon as it finishes.
+
+        Yields:
+            A "tool_called" event per dispatched tool, a "tool_output" event per
+            finished tool in completion order, then a "final" event whose data
+            is the same result object `run` returns.
+        """
+        relevant_tools = [agent.tools_by_name[name] for name in agent.router.route(user_input)]
+        parameters = agent.extractor.extract(user_input)
+        tools = relevant_tools if relevant_tools else agent.tools
+        calls = [Runner._tool_call(tool, parameters) for tool in tools]
+        for name, _ in calls:
+            yield StreamEvent("tool_called", name=name)
+
+        start = time.perf_counter()
+        finished: dict = {}
+        async for timing, value in fan_out_iter(calls, per_call_timeout, overall_timeout):
+            finished[timing.name] = (timing, value)
+            text = format_output(value) if timing.status == "ok" else f"Error calling API: {timing.name} {timing.status}"
+            yield StreamEvent("tool_output", text, timing.name, value)
+        outcome = FanOutResult.collect([name for name, _ in calls], finished, time.perf_counter() - start)
+
+        if len(relevant_tools) == 1:
+            name = relevant_tools[0].__name__
+            final_output = outcome.results.get(name, f"Error calling API: {name} {outcome.timings[name].status}")
+        else:
+            final_output = Runner._merged_output(outcome, bool(relevant_tools))
+        result = Runner._result(final_output, outcome)
+        yield StreamEvent("final", format_output(final_output), data=result)
+
+    @staticmethod
+    def _merged_output(outcome: FanOutResult, had_relevant_tools: bool) -> Any:
+        """Merge results in tool order, avoiding duplicate keys, or fall back to the default message."""
+        combined_result = outcome.merged()
+        if combined_result or had_relevant_tools:
+            return combined_result
+
+        # Default response if no results were generated
+        return "I'm not sure what information you're looking for. You can ask for cat facts or age predictions."
+
+    @staticmethod
+    def _tool_call(tool: Callable[..., Coroutine[Any, Any, Any]], parameters: Mapping[str, str]):
+        """Build a (name, coroutine factory) pair from the extracted parameters."""
+        params = {arg_name: parameters.get(arg_name, "") for arg_name in tool.spec.arg_names}
+
+        return tool.__name__, lambda: tool(**params)
+
+    @staticmethod
+    def _result(final_output: Any, outcome: FanOutResult) -> Any:
+        return type('Result', (object,), {
+            "final_output": final_output,
+            "tool_timings": outcome.timings,
+            "timed_out_tools": outcome.timed_out,
+        })
+
+
+def assistant_tool(tool_id: str, tool_config: dict, tool_url_overrides: dict | None = None, lazy: bool = False,
+                   cache: ResponseCache | None = None) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """Build one of the assistant's tools from its config; see build_assistant for the arguments."""
+    def compile_spec() -> ToolSpec:
+        if tool_url_overrides and tool_id in tool_url_overrides:
+            return compile_tool_spec(tool_id, dict(tool_config, url=tool_url_overrides[tool_id]), describe_tool)
+        # Shared with the registry when it holds this same config
+        spec = TOOL_REGISTRY.get(tool_id)
+        if spec is not None and spec.config is tool_config:
+            return spec
+        return compile_tool_spec(tool_id, tool_config, describe_tool)
+
+    if lazy:
+        return LazyTool(tool_id, tool_config, compile_spec, lambda spec: build_tool(spec, cache))
+    return build_tool(compile_spec(), cache)
+
+
+def build_assistant(tool_url_overrides: dict | None = None, lazy: bool = False,
+                    cache: ResponseCache | None = None) -> Agent:
+    """
+    Create the multi-tool assistant with tools built from the compiled registry.
+
+    Args:
+        tool_url_overrides: Optional tool id to URL mapping, e.g. to point tools at local stubs.
+        lazy: Defer compiling, describing and building each tool until it is
+            first called. Routing only needs the tool names and parameter
+            extraction only the configs, so tools that are never called cost nothing.
+        cache: Response cache for every tool, defaults to the shared RESPONSE_CACHE.
+
+    Returns:
+        The assistant agent.
+    """
+    tool_list = [assistant_tool(tool_id, tool_config, tool_url_overrides, lazy, cache)
+                 for tool_id, tool_config in TOOL_REGISTRY.configs()]
+    # One write for every description generated above
+    DESCRIPTION_CACHE.flush()
+
+    return Agent(
         name="Multi-Tool Assistant",
         instructions="""You are a helpful assistant that can provide information about cats and predict ages based on names.
         Use the available function tools to give accurate information required.
@@ -309,6 +507,114 @@ async def main():
         tools=tool_list
     )
 
+
+class ToolReloader:
+    """
+    Keeps an assistant's tools in sync with tool config files.
+
+    Changed files are read and validated off the event loop, then only the
+    added or changed tools are compiled and built. All changes are applied to
+    the agent in one synchronous step, so a turn routes against either the old
+    tool set or the new one. Calls already in flight hold their tool function
+    and finish on the old version.
+
+    Loaded entries also go into TOOL_CONFIGS and TOOL_REGISTRY, overriding
+    built-in tools with the same id; removing the override restores the
+    built-in. Invalid entries leave the previous version of the tool in place
+    and are listed in `errors` until fixed. A changed "resilience" section
+    gives the rebuilt tool its own breaker and limiter (see get_upstream).
+
+    Args:
+        agent: The assistant to update.
+        source: Where the tool configs are read from.
+        tool_url_overrides: Tool id to URL mapping, as for build_assistant.
+        lazy: Build each new tool on its first call.
+        cache: Response cache for new tools, defaults to the shared RESPONSE_CACHE.
+    """
+
+    def __init__(self, agent: Agent, source: ToolConfigSource, tool_url_overrides: dict | None = None,
+                 lazy: bool = False, cache: ResponseCache | None = None):
+        self.agent = agent
+        self.source = source
+        self.tool_url_overrides = tool_url_overrides
+        self.lazy = lazy
+        self.cache = cache
+        self.reloads = 0
+
+    @property
+    def errors(self) -> list[str]:
+        return self.source.errors
+
+    def apply(self, changes: ToolConfigChanges) -> None:
+        """Build the changed tools and swap them into the agent."""
+        # Nothing here awaits, so the swap is atomic for every coroutine on this loop
+        if not changes:
+            return
+        updated = dict(changes.updated)
+        for tool_id in changes.removed:
+            if tool_id in BUILTIN_TOOL_CONFIGS:
+                updated.setdefault(tool_id, BUILTIN_TOOL_CONFIGS[tool_id])
+                continue
+            TOOL_CONFIGS.pop(tool_id, None)
+            TOOL_REGISTRY.remove(tool_id)
+            self.agent.remove_tool(tool_id)
+        for tool_id, tool_config in updated.items():
+            # describe_tool takes the base description from TOOL_CONFIGS
+            TOOL_CONFIGS[tool_id] = tool_config
+            if self.lazy:
+                TOOL_REGISTRY.add_lazy(tool_id, tool_config)
+            else:
+                TOOL_REGISTRY.add(tool_id, tool_config)
+            self.agent.add_tool(assistant_tool(tool_id, tool_config, self.tool_url_overrides, self.lazy, self.cache))
+        DESCRIPTION_CACHE.flush()
+        self.reloads += 1
+
+    def load(self) -> ToolConfigChanges:
+        """Scan the files and apply the changes, blocking; for startup."""
+        changes = self.source.scan()
+        self.apply(changes)
+        return changes
+
+    async def poll(self) -> ToolConfigChanges:
+        """Apply any changes on disk. The result is truthy if the tool set changed."""
+        changes = await asyncio.to_thread(self.source.scan)
+        self.apply(changes)
+        return changes
+
+    async def watch(self, interval: float = TOOL_RELOAD_INTERVAL) -> None:
+        """Poll for changes every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.poll()
+
+
+def format_output(final_output: Any) -> str:
+    """Format a Runner result for display."""
+    if isinstance(final_output, dict):
+        # if "fact" in final_output:
+        #     # Cat facts response
+        #     formatted_output = f"{final_output['fact']}"
+        # elif "age" in final_output:
+        #     # Age prediction response
+        #     formatted_output = f"Age for '{final_output['name']}': {final_output['age']} years old (based on {final_output['count']} records)"
+        # else:
+        #     # Generic dictionary response
+            return ", ".join([f"{k}: {v}" for k, v in final_output.items()])
+    # String or other response
+    return final_output
+
+
+async def main(tool_url_overrides: dict | None = None, stream: bool = False, lazy: bool = False,
+               tool_config: str | None = None):
+    assistant = build_assistant(tool_url_overrides, lazy)
+
+    # Tools from config files, re-read before each turn when the files change
+    reloader = None
+    if tool_config:
+        reloader = ToolReloader(assistant, ToolConfigSource(tool_config), tool_url_overrides, lazy)
+        for error in reloader.load().errors:
+            print(f"Tool config error: {error}")
+
     print("Multi-Tool Assistant")
     print("Type 'exit' to quit")
 
@@ -317,32 +623,48 @@ async def main():
         user_input = input("\nYou: ")
         if user_input.lower() == 'exit':
             break
+        if reloader is not None:
+            changes = await reloader.poll()
+            if changes:
+                print(f"Reloaded tools: {', '.join([*changes.updated, *changes.removed])}")
+            for error in changes.errors:
+                print(f"Tool config error: {error}")
 
-        # Run the agent with user input
-        result = await Runner.run(assistant, user_input)
-        
-        # Format the response nicely
-        if isinstance(result.final_output, dict):
-            # if "fact" in result.final_output:
-            #     # Cat facts response
-            #     formatted_output = f"{result.final_output['fact']}"
-            # elif "age" in result.final_output:
-            #     # Age prediction response
-            #     formatted_output = f"Age for '{result.final_output['name']}': {result.final_output['age']} years old (based on {result.final_output['count']} records)"
-            # else:
-            #     # Generic dictionary response
-                formatted_output = ", ".join([f"{k}: {v}" for k, v in result.final_output.items()])
+        # Show each tool's result as soon as it arrives
+        if stream:
+            timing = await render_stream(Runner.run_streamed(assistant, user_input))
+            print(format_timing(timing))
         else:
-            # String or other response
-            formatted_output = result.final_output
-            
-        print(f"\nAssistant: {formatted_output}")
+            # Run the agent with user input
+            result = await Runner.run(assistant, user_input)
+
+            formatted_output = format_output(result.final_output)
+            print(f"\nAssistant: {formatted_output}")
+
+    await close_http_client()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-Tool Assistant")
+    parser.add_argument("--mock", action="store_true", help="Point the tools at local stub APIs")
+    parser.add_argument("--stream", action="store_true", help="Print tool results as they arrive, with timings")
+    parser.add_argument("--lazy", action="store_true", help="Build each tool on its first call")
+    parser.add_argument("--tools", metavar="PATH",
+                        help="JSON/YAML tool config file or directory, added to TOOL_CONFIGS and reloaded on change")
+    args = parser.parse_args()
+
+    # This front end never runs an SDK agent, so there is nothing to trace
+    configure_environment(tracing=False)
+
+    if args.mock:
+        from stub_server import StubServer
+        with StubServer() as stub:
+            asyncio.run(main(stub.url_overrides(), args.stream, args.lazy, args.tools))
+        exit(0)
+
     if not os.getenv("OPENAI_API_KEY"):
         print("Please set your OPENAI_API_KEY in the .env file")
         exit(1)
 
     # Run the async main function
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(stream=args.stream, lazy=args.lazy, tool_config=args.tools))
\ No newline at end of file
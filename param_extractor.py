@@ -0,0 +1,129 @@
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional
+
+# "name is John", "name of John", "name: John"
+CONNECTORS = frozenset({"is", "of", "for", "=", ":"})
+# "for name John", "about name John", "with name John"
+LEAD_INS = frozenset({"for", "about", "with"})
+# "age of John", "details for Sarah" - only used for the "name" parameter
+PREPOSITIONS = frozenset({"of", "for", "about"})
+
+DEFAULTS = {
+    "name": "meelad"
+}
+
+_STRIP = ".,!?;:'\"()"
+
+
+class ParameterExtractor:
+    """Pulls every declared tool parameter out of a message in a single pass.
+
+    The message is tokenized once, matching happens on lowercased tokens and
+    values keep their original casing. Results are memoized per message.
+
+    Args:
+        parameters: Declared parameter names to extract.
+        defaults: Fallback values for parameters not found in a message.
+        memo_size: Number of messages whose results are memoized.
+    """
+
+    def __init__(self, parameters: Iterable[str] = (), defaults: Optional[Dict[str, str]] = None,
+                 memo_size: int = 1024):
+        self._base_defaults = dict(DEFAULTS if defaults is None else defaults)
+        self.defaults = dict(self._base_defaults)
+        self.memo_size = memo_size
+        self._parameters: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        self.add_parameters(parameters)
+
+    @classmethod
+    def from_specs(cls, specs: Iterable, **kwargs) -> "ParameterExtractor":
+        """Build an extractor for the arguments declared by compiled tool specs."""
+        return cls.from_tool_configs((spec.config for spec in specs), **kwargs)
+
+    @classmethod
+    def from_tool_configs(cls, tool_configs: Iterable[dict], **kwargs) -> "ParameterExtractor":
+        """Build an extractor for the arguments declared by TOOL_CONFIGS entries."""
+        extractor = cls(**kwargs)
+        for tool_config in tool_configs:
+            extractor.add_tool_config(tool_config)
+        return extractor
+
+    @staticmethod
+    def _declared_args(tool_config: dict) -> list:
+        # The arguments compile_tool_spec takes from "kwargs"
+        return [arg for arg in tool_config.get("kwargs", []) if isinstance(arg, dict) and arg.get("name")]
+
+    def add_tool_config(self, tool_config: dict) -> None:
+        """Declare the arguments of a TOOL_CONFIGS entry, with their defaults."""
+        args = self._declared_args(tool_config)
+        self.add_parameters(arg["name"] for arg in args)
+        self.defaults.update({arg["name"]: arg["default"] for arg in args if "default" in arg})
+
+    def remove_tool_config(self, tool_config: dict) -> None:
+        """Undo `add_tool_config`, keeping parameters and defaults other tools still declare."""
+        args = self._declared_args(tool_config)
+        for arg in args:
+            name = arg["name"]
+            if "default" in arg and self.defaults.get(name) == arg["default"]:
+                if name in self._base_defaults:
+                    self.defaults[name] = self._base_defaults[name]
+                else:
+                    del self.defaults[name]
+        self.remove_parameters(arg["name"] for arg in args)
+
+    def add_parameters(self, parameters: Iterable[str]) -> None:
+        """Declare more parameters, invalidating memoized results.
+
+        Parameters are counted, so one declared twice stays until removed twice.
+        """
+        for name in parameters:
+            key = name.lower()
+            self._parameters[key] = name
+            self._counts[key] = self._counts.get(key, 0) + 1
+        self._memoized = lru_cache(maxsize=self.memo_size)(self._extract)
+
+    def remove_parameters(self, parameters: Iterable[str]) -> None:
+        """Withdraw parameters declared by `add_parameters`, invalidating memoized results."""
+        for name in parameters:
+            key = name.lower()
+            count = self._counts.get(key, 0) - 1
+            if count > 0:
+                self._counts[key] = count
+            else:
+                self._counts.pop(key, None)
+                self._parameters.pop(key, None)
+        self._memoized = lru_cache(maxsize=self.memo_size)(self._extract)
+
+    def _extract(self, message: str) -> Mapping[str, str]:
+        tokens = message.split()
+        lowered = [token.lower() for token in tokens]
+        parameters = self._parameters
+        count = len(tokens)
+        found: Dict[str, str] = {}
+        after_preposition = None
+
+        for i, token in enumerate(lowered):
+            if i + 1 >= count:
+                break
+            if after_preposition is None and token in PREPOSITIONS:
+                after_preposition = tokens[i + 1]
+            if i + 2 >= count:
+                continue
+            if token in parameters and lowered[i + 1] in CONNECTORS:
+                found.setdefault(parameters[token], tokens[i + 2])
+            elif token in LEAD_INS and lowered[i + 1] in parameters:
+                found.setdefault(parameters[lowered[i + 1]], tokens[i + 2])
+
+        if "name" in parameters and "name" not in found and after_preposition is not None:
+            found["name"] = after_preposition
+
+        result = {name: self.defaults.get(name, "") for name in parameters.values()}
+        for name, value in found.items():
+            result[name] = value.strip(_STRIP) or result[name]
+        return MappingProxyType(result)
+
+    def extract(self, message: str) -> Mapping[str, str]:
+        """Return every declared parameter for a message, defaults filling the gaps."""
+        return self._memoized(message)
@@ -0,0 +1,331 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+# Upstream statuses that count as failures for the breaker and the limiter
+FAILURE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# At most one multiplicative decrease per interval (seconds), so a burst of
+# failures from one overload episode shrinks the limit once
+DECREASE_INTERVAL = 0.1
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the upstream's circuit is open."""
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    """Per-upstream protection settings, from the "resilience" key of a TOOL_CONFIGS entry.
+
+    Attributes:
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_timeout: Seconds the circuit stays open before a probe call is let through.
+        initial_limit: Starting concurrency limit.
+        min_limit: Lowest the concurrency limit may shrink to.
+        max_limit: Highest the concurrency limit may grow to.
+        latency_target: Calls slower than this (seconds) shrink the limit like failures do.
+        backoff: Multiplier applied to the limit on failure or slow calls.
+        hedge_after: Seconds before a duplicate request is sent, None to disable hedging.
+        max_hedges: Duplicate requests allowed per call.
+        fallback: Serve the last known good response while the circuit is open.
+        upstream: Name of the state to share, defaults to the URL's host. Naming
+            it separates APIs served from one host, or joins several hosts.
+    """
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    initial_limit: int = 10
+    min_limit: int = 1
+    max_limit: int = 100
+    latency_target: Optional[float] = None
+    backoff: float = 0.5
+    hedge_after: Optional[float] = None
+    max_hedges: int = 1
+    fallback: bool = True
+    upstream: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, settings: Optional[Dict[str, Any]]) -> Optional["ResiliencePolicy"]:
+        """Build a policy from a config dict, None when the tool has no "resilience" key.
+
+        The dict may hold "breaker" (failure_threshold, reset_timeout),
+        "concurrency" (initial, min, max, latency_target, backoff), "hedge"
+        (after, max), "fallback" and "upstream" settings.
+        """
+        if not settings:
+            return None
+        breaker = settings.get("breaker", {})
+        concurrency = settings.get("concurrency", {})
+        hedge = settings.get("hedge") or {}
+        return cls(
+            failure_threshold=breaker.get("failure_threshold", cls.failure_threshold),
+            reset_timeout=breaker.get("reset_timeout", cls.reset_timeout),
+            initial_limit=concurrency.get("initial", cls.initial_limit),
+            min_limit=concurrency.get("min", cls.min_limit),
+            max_limit=concurrency.get("max", cls.max_limit),
+            latency_target=concurrency.get("latency_target"),
+            backoff=concurrency.get("backoff", cls.backoff),
+            hedge_after=hedge.get("after"),
+            max_hedges=hedge.get("max", cls.max_hedges),
+            fallback=settings.get("fallback", cls.fallback),
+            upstream=settings.get("upstream"),
+        )
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker.
+
+    The circuit opens after `failure_threshold` consecutive failures. Once
+    `reset_timeout` has passed, one probe call is let through: success closes
+    the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Return whether a call may go out now, reserving the probe slot when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Give up the probe slot without a verdict, e.g. when the probe was cancelled."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: grows by about one per limit's worth of successes,
+    shrinks by `backoff` on failures or calls slower than `latency_target`.
+    """
+
+    def __init__(self, initial: int = 10, min_limit: int = 1, max_limit: int = 100,
+                 latency_target: Optional[float] = None, backoff: float = 0.5):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one unit of concurrency, waiting while the limit is reached."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # The slot may have been handed over just as we were cancelled
+                if waiter.done() and not waiter.cancelled():
+                    self.in_flight -= 1
+                    self._wake()
+                raise
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self, latency: float) -> None:
+        if self.latency_target is not None and latency > self.latency_target:
+            self.on_failure()
+            return
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def on_failure(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease >= DECREASE_INTERVAL:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+
+
+async def hedged(call: Callable[[], Awaitable[Any]], hedge_after: float, max_hedges: int = 1,
+                 on_hedge: Optional[Callable[[], None]] = None) -> Any:
+    """Await `call()`, starting a duplicate if it has not finished after `hedge_after` seconds.
+
+    The first successful attempt wins and the others are cancelled. An attempt
+    that fails early also triggers the next duplicate, while any are left.
+
+    Raises:
+        Exception: The last attempt's error, when every attempt failed.
+    """
+    pending = {asyncio.ensure_future(call())}
+    launched = 1
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            can_hedge = launched <= max_hedges
+            done, pending = await asyncio.wait(pending, timeout=hedge_after if can_hedge else None,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if can_hedge and (not done or not pending):
+                pending.add(asyncio.ensure_future(call()))
+                launched += 1
+                if on_hedge is not None:
+                    on_hedge()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class Upstream:
+    """Breaker, adaptive limiter and hedging for one upstream host.
+
+    Args:
+        host: The upstream host or name, for messages.
+        policy: Settings shared by every tool calling this upstream with the same policy.
+    """
+
+    def __init__(self, host: str, policy: ResiliencePolicy):
+        self.host = host
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self.limiter = AdaptiveLimiter(policy.initial_limit, policy.min_limit, policy.max_limit,
+                                       policy.latency_target, policy.backoff)
+        self.hedges = 0
+        self.fallbacks = 0
+
+    async def _attempt(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        async with self.limiter.slot():
+            # The circuit may have opened while this call waited for a slot
+            if self.breaker.state == "open":
+                self.breaker.rejected += 1
+                raise CircuitOpenError(f"Circuit open for {self.host}")
+            start = time.perf_counter()
+            try:
+                response = await send()
+                if response.status_code in FAILURE_STATUS_CODES:
+                    response.raise_for_status()
+            except Exception:
+                self.limiter.on_failure()
+                raise
+            self.limiter.on_success(time.perf_counter() - start)
+            return response
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Send a request through the breaker, the limiter and (if configured) hedging.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            httpx.HTTPStatusError: If the upstream answered with a failure status.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {self.host}")
+        try:
+            if self.policy.hedge_after is None:
+                response = await self._attempt(send)
+            else:
+                response = await hedged(lambda: self._attempt(send), self.policy.hedge_after,
+                                        self.policy.max_hedges, self._count_hedge)
+        except CircuitOpenError:
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # A cancelled probe must not keep the half-open slot reserved
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        return response
+
+    def _count_hedge(self) -> None:
+        self.hedges += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "limit": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            "rejected": self.breaker.rejected,
+            "hedges": self.hedges,
+            "fallbacks": self.fallbacks,
+        }
+
+
+# (upstream name, usually the host; policy) -> shared state
+_upstreams: Dict[Tuple[str, ResiliencePolicy], Upstream] = {}
+
+
+def get_upstream(url: str, policy: ResiliencePolicy) -> Upstream:
+    """Return the shared Upstream for the policy's upstream name or the URL's host.
+
+    State is shared by the tools calling that upstream with an equal policy.
+    A tool with different settings, or one whose "resilience" section was
+    reloaded, gets its own breaker and limiter.
+    """
+    key = (policy.upstream or urlsplit(url).netloc, policy)
+    upstream = _upstreams.get(key)
+    if upstream is None:
+        upstream = _upstreams[key] = Upstream(key[0], policy)
+    return upstream
+
+
+def reset_upstreams() -> None:
+    """Forget all upstream state, e.g. between benchmark scenarios."""
+    _upstreams.clear()
+
+
+def upstream_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats per upstream, numbered "host#2", "host#3"... when one host has several policies."""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (name, _), upstream in _upstreams.items():
+        label, n = name, 1
+        while label in stats:
+            n += 1
+            label = f"{name}#{n}"
+        stats[label] = upstream.stats()
+    return stats
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Build a hashable, order-independent form of tool arguments.
+
+    Strings are stripped and lowercased so "Alice " and "alice" share an entry.
+    """
+    normalized = []
+    for key, value in sorted(arguments.items()):
+        if isinstance(value, str):
+            value = value.strip().lower()
+        elif isinstance(value, (list, tuple)):
+            value = tuple(v.strip().lower() if isinstance(v, str) else v for v in value)
+        normalized.append((key, value))
+    return tuple(normalized)
+
+
+class ResponseCache:
+    """TTL + LRU cache for tool responses with single-flight de-duplication.
+
+    Concurrent lookups for a key that is being fetched wait for the same
+    upstream call instead of starting their own.
+
+    Args:
+        max_size: Maximum number of entries before the least recently used is evicted.
+        default_ttl: Seconds an entry stays fresh when no TTL is given.
+    """
+
+    def __init__(self, max_size: int = 1024, default_ttl: float = 300.0):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value) for a fresh entry, refreshing its LRU position."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries past `max_size`."""
+        ttl = self.default_ttl if ttl is None else ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                           ttl: Optional[float] = None,
+                           cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Return a cached value, or fetch it once no matter how many callers ask.
+
+        Args:
+            key: The cache key.
+            fetch: Zero-argument coroutine factory producing the value.
+            ttl: Seconds the fetched value stays fresh, defaults to `default_ttl`.
+            cacheable: Predicate deciding whether a fetched value is stored
+                (e.g. to skip error responses).
+
+        Returns:
+            The cached or freshly fetched value.
+        """
+        found, value = self.get(key)
+        if found:
+            self.hits += 1
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        task = asyncio.ensure_future(fetch())
+        self._in_flight[key] = task
+
+        def store(done: asyncio.Future) -> None:
+            self._in_flight.pop(key, None)
+            if not done.cancelled() and done.exception() is None and cacheable(done.result()):
+                self.set(key, done.result(), ttl)
+
+        task.add_done_callback(store)
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters for sizing the cache."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,145 @@
+import ast
+import math
+import time
+from functools import lru_cache
+from types import CodeType
+from typing import Any, List, Optional, Sequence, Union
+
+# Functions an expression may call
+ALLOWED_FUNCTIONS = {"abs": abs, "round": round, "min": min, "max": max}
+
+MAX_EXPRESSION_LENGTH = 1000
+MAX_NODES = 200
+# Largest integer result (in bits) a ** or * may produce
+MAX_RESULT_BITS = 4096
+# Largest ndigits (either sign) round may be given; CPython computes 10 ** -ndigits
+MAX_ROUND_DIGITS = 400
+# Default time budget for evaluate_many, in seconds
+BATCH_TIME_LIMIT = 1.0
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+
+class UnsafeExpressionError(ValueError):
+    """Raised when an expression uses anything outside the arithmetic whitelist."""
+
+
+class EvaluationLimitError(ValueError):
+    """Raised when evaluation would exceed the operand-size or time limits."""
+
+
+def _checked_pow(base: Any, exponent: Any) -> Any:
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        # The result has between (bits - 1) * exponent + 1 and bits * exponent bits
+        bits = base.bit_length()
+        if (bits - 1) * exponent + 1 > MAX_RESULT_BITS or (
+                bits * exponent > MAX_RESULT_BITS and exponent * math.log2(abs(base)) >= MAX_RESULT_BITS):
+            raise EvaluationLimitError(f"Result of {base} ** {exponent} is too large")
+    return base ** exponent
+
+
+def _checked_mul(left: Any, right: Any) -> Any:
+    if isinstance(left, int) and isinstance(right, int):
+        if left.bit_length() + right.bit_length() > MAX_RESULT_BITS:
+            raise EvaluationLimitError("Result of multiplication is too large")
+    return left * right
+
+
+def _checked_round(number: Any, ndigits: Any = None) -> Any:
+    if isinstance(ndigits, int) and abs(ndigits) > MAX_ROUND_DIGITS:
+        raise EvaluationLimitError(f"round() accepts at most {MAX_ROUND_DIGITS} digits")
+    return round(number, ndigits)
+
+
+_GLOBALS = {"__builtins__": {}, "_pow": _checked_pow, "_mul": _checked_mul, **ALLOWED_FUNCTIONS,
+            "round": _checked_round}
+
+
+class _Guard(ast.NodeTransformer):
+    """Rejects non-whitelisted nodes and routes ** and * through size checks."""
+
+    def __init__(self):
+        self.nodes = 0
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise UnsafeExpressionError("Expression is too complex")
+        if isinstance(node, ast.Constant):
+            if type(node.value) not in (int, float):
+                raise UnsafeExpressionError(f"Unsupported constant {node.value!r}")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in ALLOWED_FUNCTIONS or node.keywords:
+                raise UnsafeExpressionError("Only abs, round, min and max may be called")
+            node.args = [self.visit(arg) for arg in node.args]
+            return node
+        elif isinstance(node, ast.BinOp):
+            if not isinstance(node.op, _BINARY_OPERATORS):
+                raise UnsafeExpressionError(f"Unsupported operator {type(node.op).__name__}")
+            node = super().generic_visit(node)
+            if isinstance(node.op, (ast.Pow, ast.Mult)):
+                helper = "_pow" if isinstance(node.op, ast.Pow) else "_mul"
+                return ast.copy_location(
+                    ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+                    node)
+            return node
+        elif isinstance(node, ast.Name):
+            raise UnsafeExpressionError(f"Unknown name {node.id}")
+        elif isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, _UNARY_OPERATORS):
+                raise UnsafeExpressionError(f"Unsupported operator {type(node.op).__name__}")
+        elif not isinstance(node, (ast.Expression, ast.Load) + _BINARY_OPERATORS + _UNARY_OPERATORS):
+            raise UnsafeExpressionError(f"Unsupported syntax {type(node).__name__}")
+        return super().generic_visit(node)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> CodeType:
+    """Parse, validate and compile an arithmetic expression, memoized per expression.
+
+    Raises:
+        UnsafeExpressionError: If the expression is too long, too complex or
+            uses anything but numbers, arithmetic operators and the allowed functions.
+        SyntaxError: If the expression does not parse.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise UnsafeExpressionError("Expression is too long")
+    tree = _Guard().visit(ast.parse(expression.strip(), mode="eval"))
+    return compile(ast.fix_missing_locations(tree), "<expression>", "eval")
+
+
+def evaluate(expression: str) -> Union[int, float]:
+    """Evaluate an arithmetic expression safely.
+
+    There is no timer on a single expression: MAX_NODES bounds the number of
+    operations, the operand-size checks keep every * and ** result within
+    MAX_RESULT_BITS and round() is limited to MAX_ROUND_DIGITS digits, which
+    together bound its running time.
+
+    Raises:
+        UnsafeExpressionError: If the expression is not allowed.
+        EvaluationLimitError: If an operand or result exceeds the size limits.
+    """
+    return eval(compile_expression(expression), _GLOBALS)
+
+
+def evaluate_many(expressions: Sequence[str], time_limit: Optional[float] = BATCH_TIME_LIMIT) -> List[Any]:
+    """Evaluate several expressions in one call.
+
+    Failures do not stop the batch: each position holds either the result or
+    the exception raised for that expression. Once `time_limit` seconds have
+    passed, the remaining expressions get an EvaluationLimitError. The limit
+    is checked between expressions; each one is bounded as described in `evaluate`.
+    """
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    results: List[Any] = []
+    for expression in expressions:
+        if deadline is not None and time.perf_counter() > deadline:
+            results.append(EvaluationLimitError("Batch time limit exceeded"))
+            continue
+        try:
+            results.append(evaluate(expression))
+        except Exception as e:
+            results.append(e)
+    return results
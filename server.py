@@ -0,0 +1,469 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Optional
+
+from sse_starlette.sse import EventSourceResponse
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+import multi_tool_agent
+from conversation_memory import HISTORY_BUDGET, ConversationMemory
+from http_client import close_http_client
+from startup import configure_environment
+from streaming import StreamEvent, StreamTiming, run_streamed
+from tool_config import ToolConfigSource
+from tool_metrics import TOOL_METRICS
+
+# The SDK agents are imported when their handlers are built (see create_app's `lazy`)
+if TYPE_CHECKING:
+    from agents import ModelProvider, RunConfig
+
+# Backpressure and session limits
+MAX_CONCURRENT_TURNS = 64
+MAX_QUEUED_TURNS = 256
+MAX_SESSIONS = 10000
+SESSION_IDLE_TIMEOUT = 1800.0
+
+
+class Overloaded(Exception):
+    """Raised when a turn cannot be queued because the server is saturated."""
+
+
+@dataclass
+class Session:
+    """Conversation state for one session of one agent.
+
+    Attributes:
+        session_id: The client-chosen session id.
+        agent_name: The agent this session talks to.
+        memory: Earlier turns, replayed within a token budget and compacted beyond it.
+        lock: Serializes turns within the session.
+        last_seen: Monotonic time of the last turn.
+    """
+    session_id: str
+    agent_name: str
+    memory: ConversationMemory = field(default_factory=ConversationMemory)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_seen: float = field(default_factory=time.monotonic)
+
+
+class SessionStore:
+    """In-memory sessions with LRU eviction and an idle timeout.
+
+    Args:
+        max_sessions: Sessions kept before the least recent is evicted.
+        idle_timeout: Seconds after which an idle session starts over.
+        history_budget: Tokens of earlier conversation each session replays per turn.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 history_budget: int = HISTORY_BUDGET):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.history_budget = history_budget
+        self._sessions: "OrderedDict[tuple, Session]" = OrderedDict()
+
+    def get(self, agent_name: str, session_id: str) -> Session:
+        """Return the session, creating it (and evicting old ones) if needed."""
+        key = (agent_name, session_id)
+        session = self._sessions.get(key)
+        now = time.monotonic()
+        if session is None or now - session.last_seen > self.idle_timeout:
+            session = Session(session_id, agent_name, ConversationMemory(session_id, self.history_budget))
+            self._sessions[key] = session
+        self._sessions.move_to_end(key)
+        session.last_seen = now
+        while len(self._sessions) > self.max_sessions:
+            oldest_key, oldest = next(iter(self._sessions.items()))
+            if oldest.lock.locked():
+                break
+            del self._sessions[oldest_key]
+        return session
+
+    def delete(self, agent_name: str, session_id: str) -> bool:
+        return self._sessions.pop((agent_name, session_id), None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class TurnLimiter:
+    """Caps concurrent turns and rejects new ones once the wait queue is full."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_TURNS, max_queued: int = MAX_QUEUED_TURNS):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.queued = 0
+
+    def check(self) -> None:
+        """Raise Overloaded if another turn cannot be queued right now."""
+        # Reserved turns count as queued until they get a slot
+        if self.running + self.queued >= self.max_concurrent + self.max_queued:
+            raise Overloaded()
+
+    def reserve(self) -> None:
+        """Take a place in the queue now, for a later `slot(reserved=True)`.
+
+        Raises:
+            Overloaded: If the queue is full.
+        """
+        self.check()
+        self.queued += 1
+
+    def cancel_reservation(self) -> None:
+        """Give back a place taken with `reserve` whose turn never started."""
+        self.queued -= 1
+
+    @asynccontextmanager
+    async def slot(self, reserved: bool = False):
+        if not reserved:
+            self.reserve()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+
+# Agent name -> streamed turn: (session, message) -> StreamEvents ending with "final"
+TurnHandler = Callable[[Session, str], AsyncIterator[StreamEvent]]
+
+
+def sdk_turn(run_agent: Callable[..., AsyncIterator[StreamEvent]], run_config: "RunConfig") -> TurnHandler:
+    """Stream a turn of an SDK agent, replaying the session's bounded history.
+
+    Args:
+        run_agent: Called as run_agent(input, run_config=...), e.g. a
+            partial of streaming.run_streamed or agent1.run_triage_streamed.
+        run_config: Run config for every turn.
+    """
+    from agents import InputGuardrailTripwireTriggered
+
+    async def run_turn(session: Session, message: str) -> AsyncIterator[StreamEvent]:
+        turn_input = session.memory.build_input(message)
+        try:
+            # Rejected questions are not kept in the history
+            async for event in session.memory.track(message, run_agent(turn_input, run_config=run_config)):
+                yield event
+        except InputGuardrailTripwireTriggered:
+            yield StreamEvent("final", "Sorry, I can only help with homework questions.")
+    return run_turn
+
+
+def multi_tool_turn(assistant: multi_tool_agent.Agent) -> TurnHandler:
+    """Stream a turn of the config-driven multi-tool assistant, one event per finished tool."""
+    async def run_turn(session: Session, message: str) -> AsyncIterator[StreamEvent]:
+        # Routing reads only the new message, so there is no history to keep or replay
+        async for event in multi_tool_agent.Runner.run_streamed(assistant, message):
+            yield event
+    return run_turn
+
+
+def travel_handler(run_config: "RunConfig") -> TurnHandler:
+    from travel_agent import get_travel_assistant
+    return sdk_turn(partial(run_streamed, get_travel_assistant()), run_config)
+
+
+def triage_handler(run_config: "RunConfig", verdict_cache: Any = None) -> TurnHandler:
+    import agent1
+    from verdict_cache import VerdictCache
+    if verdict_cache is not None:
+        agent1.verdict_cache = VerdictCache(verdict_cache)
+    return sdk_turn(agent1.run_triage_streamed, run_config)
+
+
+def lazy_handler(build: Callable[[], TurnHandler]) -> TurnHandler:
+    """Build a handler on its first turn, so startup doesn't pay for agents that are never used."""
+    handler: Optional[TurnHandler] = None
+
+    async def run_turn(session: Session, message: str) -> AsyncIterator[StreamEvent]:
+        nonlocal handler
+        if handler is None:
+            handler = build()
+        async for event in handler(session, message):
+            yield event
+    return run_turn
+
+
+def create_app(model_provider: Optional["ModelProvider"] = None,
+               tool_url_overrides: Optional[Dict[str, str]] = None,
+               max_concurrent_turns: int = MAX_CONCURRENT_TURNS,
+               max_queued_turns: int = MAX_QUEUED_TURNS,
+               max_sessions: int = MAX_SESSIONS,
+               history_budget: int = HISTORY_BUDGET,
+               metrics_dump_interval: Optional[float] = None,
+               lazy: bool = False,
+               response_cache: Any = None,
+               verdict_cache: Any = None,
+               tool_config: Optional[str] = None,
+               tool_reload_interval: float = multi_tool_agent.TOOL_RELOAD_INTERVAL,
+               traffic_log: Optional[str] = None) -> Starlette:
+    """
+    Build the ASGI app serving the travel, multi-tool and triage agents.
+
+    Each turn is streamed back as server-sent events: "started", then
+    "token", "tool_called", "tool_output" and "handoff" events as they
+    happen, then "output" with the full answer and "done" with the time to
+    first byte and total latency (or "error").
+
+    Args:
+        model_provider: Model provider for the SDK agents, defaults to OpenAI.
+        tool_url_overrides: Tool id to URL mapping for the multi-tool assistant.
+        max_concurrent_turns: Turns allowed to run at once across all sessions.
+        max_queued_turns: Turns allowed to wait for a slot before new ones get a 503.
+        max_sessions: Sessions kept in memory before the least recent is evicted.
+        history_budget: Tokens of earlier conversation replayed with each message;
+            older turns are folded into a summary (see ConversationMemory).
+        metrics_dump_interval: If set, also print a JSON snapshot of the tool
+            metrics every this many seconds. They are always served at /metrics.
+        lazy: Import and build each agent (and the Agents SDK) on its first
+            turn instead of at startup. Startup is faster, the first turn per
+            agent slower.
+        response_cache: Cache for the multi-tool assistant's tool responses,
+            e.g. a shared_cache.SharedCache. Defaults to multi_tool_agent.RESPONSE_CACHE.
+        verdict_cache: Store for homework verdicts and triage handoffs (e.g. a
+            SharedCache), replacing the one behind agent1.verdict_cache.
+        tool_config: JSON/YAML tool config file or directory for the multi-tool
+            assistant. Its tools are added to TOOL_CONFIGS, and changed tools
+            are rebuilt and swapped in while the server runs.
+        tool_reload_interval: Seconds between checks of `tool_config` for changes.
+        traffic_log: If set, record tool HTTP exchanges, model calls and turns
+            to this file for offline replay and profiling (see traffic_log.py).
+
+    Returns:
+        The Starlette app.
+    """
+    recorder = None
+    if traffic_log:
+        from traffic_log import TrafficRecorder
+        recorder = TrafficRecorder(traffic_log, tool_url_overrides=tool_url_overrides, tool_config=tool_config)
+        recorder.start()
+
+    run_config: Optional["RunConfig"] = None
+
+    def sdk_run_config() -> "RunConfig":
+        # Shared by the SDK agents; creating it loads .env, the tracing key and the SDK
+        nonlocal run_config
+        if run_config is None:
+            configure_environment()
+            from agents import RunConfig
+            run_config = RunConfig(model_provider=model_provider, tracing_disabled=True) if model_provider else RunConfig()
+            if recorder is not None:
+                run_config.model_provider = recorder.model_provider(run_config.model_provider)
+        return run_config
+
+    reloader: Optional[multi_tool_agent.ToolReloader] = None
+
+    def multi_handler() -> TurnHandler:
+        nonlocal reloader
+        assistant = multi_tool_agent.build_assistant(tool_url_overrides, lazy, response_cache)
+        if tool_config:
+            reloader = multi_tool_agent.ToolReloader(
+                assistant, ToolConfigSource(tool_config), tool_url_overrides, lazy, response_cache)
+            reloader.load()
+        return multi_tool_turn(assistant)
+
+    builders: Dict[str, Callable[[], TurnHandler]] = {
+        "travel": lambda: travel_handler(sdk_run_config()),
+        "triage": lambda: triage_handler(sdk_run_config(), verdict_cache),
+        "multi": multi_handler,
+    }
+    if lazy:
+        handlers = {name: lazy_handler(build) for name, build in builders.items()}
+    else:
+        handlers = {name: build() for name, build in builders.items()}
+    sessions = SessionStore(max_sessions, history_budget=history_budget)
+    limiter = TurnLimiter(max_concurrent_turns, max_queued_turns)
+
+    async def post_message(request: Request):
+        agent_name = request.path_params["agent"]
+        if agent_name not in handlers:
+            return JSONResponse({"error": f"Unknown agent '{agent_name}'"}, status_code=404)
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Request body must be JSON"}, status_code=400)
+        if not isinstance(body, dict) or not isinstance(body.get("message", ""), str):
+            return JSONResponse({"error": "Expected a JSON object with a string 'message'"}, status_code=400)
+        message = body.get("message", "")
+        session = sessions.get(agent_name, request.path_params["session_id"])
+
+        # Both are taken before the response starts, so a concurrent POST sees them
+        if session.lock.locked():
+            return JSONResponse({"error": "A turn is already running for this session"}, status_code=409)
+        try:
+            limiter.reserve()
+        except Overloaded:
+            return JSONResponse({"error": "Server busy"}, status_code=503, headers={"Retry-After": "1"})
+        # Uncontended, so this returns without yielding to another request
+        await session.lock.acquire()
+        started = False
+
+        async def events():
+            nonlocal started
+            started = True
+            timing = StreamTiming()
+            output = None
+            try:
+                async with limiter.slot(reserved=True):
+                    queued_ms = (time.perf_counter() - timing.started) * 1000
+                    yield {"event": "started", "data": json.dumps({"queued_ms": queued_ms})}
+                    turn = handlers[agent_name](session, message)
+                    if recorder is not None:
+                        turn = recorder.turn(agent_name, session.session_id, message, turn)
+                    async for event in turn:
+                        timing.observe(event)
+                        if event.kind == "final":
+                            output = event.text
+                            continue
+                        yield {"event": event.kind,
+                               "data": json.dumps({"text": event.text, "name": event.name}, default=str)}
+            except Exception as e:
+                yield {"event": "error", "data": json.dumps({"error": str(e)})}
+                return
+            finally:
+                session.lock.release()
+            timing.finish()
+            yield {"event": "output", "data": json.dumps({"output": output}, default=str)}
+            yield {"event": "done", "data": json.dumps({"ttfb_ms": timing.ttfb * 1000, "latency_ms": timing.total * 1000})}
+
+        async def abandoned():
+            # The client went away before the stream started
+            if not started:
+                limiter.cancel_reservation()
+                session.lock.release()
+
+        return EventSourceResponse(events(), background=BackgroundTask(abandoned))
+
+    async def delete_session(request: Request):
+        deleted = sessions.delete(request.path_params["agent"], request.path_params["session_id"])
+        return JSONResponse({"deleted": deleted})
+
+    async def new_session(request: Request):
+        return JSONResponse({"session_id": uuid.uuid4().hex})
+
+    async def health(request: Request):
+        stats = {
+            "sessions": len(sessions),
+            "running_turns": limiter.running,
+            "queued_turns": limiter.queued,
+        }
+        if reloader is not None:
+            stats["tool_reloads"] = reloader.reloads
+            stats["tool_config_errors"] = reloader.errors
+        # Only once the triage agent has been loaded
+        agent1 = sys.modules.get("agent1")
+        if agent1 is not None:
+            stats["verdict_cache"] = dict(agent1.verdict_cache.stats(),
+                                          model_calls_saved=agent1.guardrail_stats.model_calls_saved)
+        return JSONResponse(stats)
+
+    async def metrics(request: Request):
+        return PlainTextResponse(TOOL_METRICS.render(), media_type="text/plain; version=0.0.4")
+
+    async def watch_tool_config():
+        # The multi-tool assistant may not be built yet in lazy mode
+        while True:
+            await asyncio.sleep(tool_reload_interval)
+            if reloader is not None:
+                await reloader.poll()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        dump = asyncio.create_task(TOOL_METRICS.dump_periodically(metrics_dump_interval)) if metrics_dump_interval else None
+        watch = asyncio.create_task(watch_tool_config()) if tool_config else None
+        yield
+        for task in (dump, watch):
+            if task is not None:
+                task.cancel()
+        await close_http_client()
+        if recorder is not None:
+            recorder.stop()
+
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/metrics", metrics),
+            Route("/sessions", new_session, methods=["POST"]),
+            Route("/agents/{agent}/sessions/{session_id}/messages", post_message, methods=["POST"]),
+            Route("/agents/{agent}/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the agents over HTTP with SSE streaming")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--mock", action="store_true", help="Use the local mock model instead of OpenAI")
+    parser.add_argument("--max-concurrent-turns", type=int, default=MAX_CONCURRENT_TURNS)
+    parser.add_argument("--max-queued-turns", type=int, default=MAX_QUEUED_TURNS)
+    parser.add_argument("--metrics-dump-interval", type=float, help="Print tool metrics every N seconds")
+    parser.add_argument("--lazy", action="store_true", help="Load each agent on its first turn instead of at startup")
+    parser.add_argument("--tools", metavar="PATH",
+                        help="JSON/YAML tool config file or directory for the multi-tool assistant, reloaded on change")
+    parser.add_argument("--history-budget", type=int, default=HISTORY_BUDGET,
+                        help="Tokens of earlier conversation sent with each message")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; more than one runs a session-affine pool (see worker_pool.py)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Record tool, model and turn traffic to PATH for `python -m traffic_log replay`")
+    args = parser.parse_args()
+
+    # The tracing key is set when the first SDK agent is loaded
+    configure_environment(tracing=False)
+
+    if not args.mock and not os.getenv("OPENAI_API_KEY"):
+        print("Please set your OPENAI_API_KEY in the .env file, or pass --mock")
+        exit(1)
+
+    if args.workers > 1 and args.record:
+        print("--record needs a single worker process")
+        exit(1)
+
+    with ExitStack() as stack:
+        # Mock mode keeps the multi-tool assistant off the real APIs too
+        overrides = None
+        if args.mock:
+            from stub_server import StubServer
+            overrides = stack.enter_context(StubServer()).url_overrides()
+
+        if args.workers > 1:
+            from worker_pool import WorkerOptions, serve
+            serve(args.host, args.port, args.workers, WorkerOptions(
+                mock=args.mock, tool_url_overrides=overrides, max_concurrent_turns=args.max_concurrent_turns,
+                max_queued_turns=args.max_queued_turns, history_budget=args.history_budget, lazy=args.lazy,
+                tool_config=args.tools))
+        else:
+            provider = None
+            if args.mock:
+                from mock_model import MockModelProvider
+                provider = MockModelProvider()
+
+            uvicorn.run(create_app(provider, overrides, max_concurrent_turns=args.max_concurrent_turns,
+                                   max_queued_turns=args.max_queued_turns, history_budget=args.history_budget,
+                                   metrics_dump_interval=args.metrics_dump_interval, lazy=args.lazy,
+                                   tool_config=args.tools, traffic_log=args.record),
+                        host=args.host, port=args.port)
@@ -0,0 +1,248 @@
+import asyncio
+import itertools
+import os
+import pickle
+import struct
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from response_cache import ResponseCache
+
+# Frame header: payload length as a big-endian unsigned 32-bit integer
+_HEADER = struct.Struct("!I")
+
+# Seconds a client waits for the store to reply before falling through to fetch
+CALL_TIMEOUT = 1.0
+
+
+def _frame(message: Any) -> bytes:
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Any:
+    header = await reader.readexactly(_HEADER.size)
+    return pickle.loads(await reader.readexactly(_HEADER.unpack(header)[0]))
+
+
+class CacheServer:
+    """Named ResponseCaches served to worker processes over a Unix domain socket.
+
+    Requests are length-prefixed pickles of (request_id, op, namespace, key,
+    value, ttl) and replies are (request_id, ok, result). Values stay pickled
+    bytes on the server, so it never imports the classes being cached. The
+    socket is only accessible to the owning user, since pickles are trusted.
+
+    Args:
+        path: Socket path.
+        max_size: Entries per namespace before the least recently used is evicted.
+        default_ttl: Seconds an entry stays fresh when the client gives no TTL.
+    """
+
+    def __init__(self, path: str, max_size: int = 4096, default_ttl: float = 300.0):
+        self.path = path
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.caches: Dict[str, ResponseCache] = {}
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def cache(self, namespace: str) -> ResponseCache:
+        cache = self.caches.get(namespace)
+        if cache is None:
+            cache = self.caches[namespace] = ResponseCache(self.max_size, self.default_ttl)
+        return cache
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o600)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_id, op, namespace, key, value, ttl = await _read_frame(reader)
+                self.requests += 1
+                try:
+                    reply = (request_id, True, self._apply(op, namespace, key, value, ttl))
+                except Exception as e:
+                    reply = (request_id, False, f"{type(e).__name__}: {e}")
+                writer.write(_frame(reply))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _apply(self, op: str, namespace: str, key: Hashable, value: Optional[bytes], ttl: Optional[float]) -> Any:
+        cache = self.cache(namespace)
+        if op == "get":
+            found, stored = cache.get(key)
+            if found:
+                cache.hits += 1
+            else:
+                cache.misses += 1
+            return stored if found else None
+        if op == "set":
+            cache.set(key, value, ttl)
+            return None
+        if op == "clear":
+            cache.clear()
+            return None
+        if op == "stats":
+            return cache.stats()
+        raise ValueError(f"Unknown cache operation '{op}'")
+
+
+class SharedCache:
+    """ResponseCache-compatible client for one namespace of a CacheServer.
+
+    Every worker process sees the same entries. Concurrent misses for a key
+    within one process are still coalesced into a single fetch. If the store
+    is unreachable, lookups fall through to `fetch` uncached rather than fail.
+
+    Args:
+        path: The CacheServer's socket path.
+        namespace: Cache name, e.g. "tool_responses" or "verdicts".
+        default_ttl: Seconds an entry stays fresh when no TTL is given.
+    """
+
+    def __init__(self, path: str, namespace: str, default_ttl: float = 300.0):
+        self.path = path
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connecting: Optional[asyncio.Future] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = itertools.count()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        task = asyncio.ensure_future(self._read_replies(self._reader))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                request_id, ok, result = await _read_frame(reader)
+                waiter = self._pending.pop(request_id, None)
+                if waiter is not None and not waiter.done():
+                    if ok:
+                        waiter.set_result(result)
+                    else:
+                        waiter.set_exception(RuntimeError(result))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            # Fail outstanding calls; the next call reconnects
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                writer.close()
+            for waiter in self._pending.values():
+                if not waiter.done():
+                    waiter.set_exception(ConnectionError(f"Cache connection lost: {e!r}"))
+            self._pending.clear()
+
+    async def _call(self, op: str, key: Hashable = None, value: Optional[bytes] = None,
+                    ttl: Optional[float] = None) -> Any:
+        if self._writer is None:
+            # One connection per process, opened by whichever call gets here first
+            connecting = self._connecting
+            if connecting is None:
+                connecting = self._connecting = asyncio.ensure_future(self._connect())
+                connecting.add_done_callback(lambda _: setattr(self, "_connecting", None))
+            await asyncio.shield(connecting)
+        # The reply reader drops the writer when the connection is lost, even between these lines
+        writer = self._writer
+        if writer is None:
+            raise ConnectionError("Cache connection lost")
+        request_id = next(self._request_ids)
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = waiter
+        try:
+            writer.write(_frame((request_id, op, self.namespace, key, value, ttl)))
+            return await asyncio.wait_for(waiter, CALL_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Cache did not reply within {CALL_TIMEOUT}s") from None
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value) from the shared store."""
+        stored = await self._call("get", key)
+        return (False, None) if stored is None else (True, pickle.loads(stored))
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        await self._call("set", key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                         self.default_ttl if ttl is None else ttl)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]],
+                           ttl: Optional[float] = None,
+                           cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Same contract as ResponseCache.get_or_fetch, backed by the shared store."""
+        try:
+            found, value = await self.get(key)
+        except (OSError, RuntimeError):
+            # ConnectionError is an OSError; RuntimeError carries server-side failures
+            self.errors += 1
+            return await fetch()
+        if found:
+            self.hits += 1
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        task = asyncio.ensure_future(fetch())
+        self._in_flight[key] = task
+
+        def store(done: asyncio.Future) -> None:
+            self._in_flight.pop(key, None)
+            if not done.cancelled() and done.exception() is None and cacheable(done.result()):
+                # Publish in the background; callers don't wait for the round trip
+                publish = asyncio.ensure_future(self._publish(key, done.result(), ttl))
+                self._background.add(publish)
+                publish.add_done_callback(self._background.discard)
+
+        task.add_done_callback(store)
+        return await asyncio.shield(task)
+
+    async def _publish(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+        try:
+            await self.set(key, value, ttl)
+        except (OSError, RuntimeError):
+            self.errors += 1
+
+    async def clear(self) -> None:
+        """Drop every entry in this namespace, for all workers."""
+        await self._call("clear")
+
+    async def shared_stats(self) -> Dict[str, Any]:
+        """Return the server-side counters for this namespace, across all workers."""
+        return await self._call("stats")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return this process's hit/miss counters."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
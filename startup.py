@@ -0,0 +1,110 @@
+import atexit
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+# Environment variable naming the JSON file that generated tool descriptions are cached in
+DESCRIPTION_CACHE_ENV = "TOOL_DESCRIPTION_CACHE"
+
+_dotenv_loaded = False
+_tracing_configured = False
+
+
+def configure_environment(tracing: bool = True) -> None:
+    """Load .env and set the tracing export key, each at most once per process.
+
+    Entry points call this from `__main__` (or when they first need the SDK)
+    instead of doing it at import time, so importing a module stays cheap.
+
+    Args:
+        tracing: Also set the tracing export key, which imports the Agents SDK.
+            Front ends that never run an SDK agent pass False.
+    """
+    global _dotenv_loaded, _tracing_configured
+    if not _dotenv_loaded:
+        _dotenv_loaded = True
+        from dotenv import load_dotenv
+        load_dotenv()
+
+    # Only export traces when there is a key to export them with
+    if tracing and not _tracing_configured:
+        _tracing_configured = True
+        if os.getenv("OPENAI_API_KEY"):
+            from agents import set_tracing_export_api_key
+            set_tracing_export_api_key(os.getenv("OPENAI_API_KEY"))
+
+
+def code_fingerprint(fn: Callable[..., Any]) -> str:
+    """Hash of a function's bytecode and constants, to invalidate cached output when it changes."""
+    code = fn.__code__
+    return hashlib.sha256(code.co_code + repr(code.co_consts).encode()).hexdigest()[:16]
+
+
+class DescriptionCache:
+    """Generated tool descriptions, keyed by a hash of their inputs and persisted to a JSON file.
+
+    The file is read on first use. New descriptions are written (atomically)
+    by `flush`, which callers run after describing a batch of tools and which
+    also runs at exit, so later processes start without regenerating any.
+
+    Args:
+        path: JSON file to persist to. None reads it from the TOOL_DESCRIPTION_CACHE
+            environment variable on first use; an empty string (or an unset
+            variable) keeps descriptions in memory only.
+        version: Mixed into every key, e.g. the generator's code_fingerprint.
+    """
+
+    def __init__(self, path: Optional[str] = None, version: str = ""):
+        self.path = path
+        self.version = version
+        self._entries: Optional[Dict[str, str]] = None
+        self._dirty = False
+        self._flush_at_exit = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict[str, str]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path is None:
+                self.path = os.getenv(DESCRIPTION_CACHE_ENV, "")
+            if self.path:
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._entries
+
+    def flush(self) -> None:
+        """Write descriptions generated since the last flush to the file, if any."""
+        if not self._dirty or not self.path:
+            return
+        self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # A read-only or full disk only costs regenerating next time
+            pass
+
+    def get_or_create(self, key_parts: Any, create: Callable[[], str]) -> str:
+        """Return the cached description for `key_parts`, generating it on a miss for the next `flush`."""
+        key = hashlib.sha256(json.dumps([self.version, key_parts], sort_keys=True, default=str).encode()).hexdigest()
+        entries = self._load()
+        description = entries.get(key)
+        if description is not None:
+            self.hits += 1
+            return description
+        self.misses += 1
+        description = entries[key] = create()
+        self._dirty = True
+        if not self._flush_at_exit:
+            # Descriptions generated outside a batch still reach the file
+            self._flush_at_exit = True
+            atexit.register(self.flush)
+        return description
@@ -0,0 +1,128 @@
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional, TextIO
+
+# The SDK is imported where it is used, so front ends that never run an SDK
+# agent (the multi-tool assistant) don't pay for importing it
+if TYPE_CHECKING:
+    from agents import Agent, RunConfig, RunResultStreaming
+
+
+@dataclass
+class StreamEvent:
+    """One incremental piece of a turn, shared by every front end.
+
+    Attributes:
+        kind: One of "token", "tool_called", "tool_output", "handoff" or "final".
+        text: The token, tool arguments, formatted tool output, or formatted final output.
+        name: The tool name, or the agent handed off to.
+        data: Raw payload. For "final" it is the run result, which exposes `final_output`.
+    """
+    kind: str
+    text: str = ""
+    name: str = ""
+    data: Any = None
+
+
+@dataclass
+class StreamTiming:
+    """Time to first byte and total time of one streamed turn.
+
+    Attributes:
+        started: perf_counter() when the turn started.
+        first_byte: perf_counter() of the first content event, None if nothing was streamed.
+        finished: perf_counter() when the turn finished.
+    """
+    started: float = field(default_factory=time.perf_counter)
+    first_byte: Optional[float] = None
+    finished: Optional[float] = None
+
+    def observe(self, event: StreamEvent) -> None:
+        """Record the first content event; tool dispatch notices don't count as output."""
+        if self.first_byte is None and event.kind != "tool_called":
+            self.first_byte = time.perf_counter()
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def ttfb(self) -> float:
+        """Seconds until the first content event, or the total time when nothing was streamed."""
+        return (self.first_byte if self.first_byte is not None else self.finished) - self.started
+
+    @property
+    def total(self) -> float:
+        return self.finished - self.started
+
+
+async def stream_run(result: "RunResultStreaming") -> AsyncIterator[StreamEvent]:
+    """Translate the SDK's streamed run events into StreamEvents, ending with "final"."""
+    from agents.items import HandoffOutputItem, ToolCallItem, ToolCallOutputItem
+    from agents.stream_events import RawResponsesStreamEvent, RunItemStreamEvent
+
+    tool_names: Dict[str, str] = {}
+    async for event in result.stream_events():
+        if isinstance(event, RawResponsesStreamEvent):
+            if event.data.type == "response.output_text.delta":
+                yield StreamEvent("token", event.data.delta)
+        elif isinstance(event, RunItemStreamEvent):
+            item = event.item
+            if isinstance(item, ToolCallItem) and event.name == "tool_called":
+                raw = item.raw_item
+                name = getattr(raw, "name", "")
+                tool_names[getattr(raw, "call_id", "")] = name
+                yield StreamEvent("tool_called", getattr(raw, "arguments", ""), name)
+            elif isinstance(item, ToolCallOutputItem):
+                call_id = item.raw_item.get("call_id") if isinstance(item.raw_item, dict) else None
+                yield StreamEvent("tool_output", str(item.output), tool_names.get(call_id, ""), item.output)
+            elif isinstance(item, HandoffOutputItem):
+                yield StreamEvent("handoff", name=item.target_agent.name)
+    yield StreamEvent("final", str(result.final_output), data=result)
+
+
+async def run_streamed(agent: "Agent", input: Any, context: Any = None,
+                       run_config: Optional["RunConfig"] = None) -> AsyncIterator[StreamEvent]:
+    """Run an SDK agent with streaming, yielding StreamEvents as they arrive."""
+    from agents import Runner as AgentRunner
+
+    result = AgentRunner.run_streamed(agent, input, context=context, run_config=run_config)
+    async for event in stream_run(result):
+        yield event
+
+
+async def render_stream(events: AsyncIterator[StreamEvent], out: Optional[TextIO] = None) -> StreamTiming:
+    """Print a streamed turn as it arrives: tool activity on its own lines, then the answer token by token.
+
+    Returns:
+        The turn's StreamTiming.
+    """
+    out = out or sys.stdout
+    timing = StreamTiming()
+    answering = False
+    async for event in events:
+        timing.observe(event)
+        if event.kind == "token":
+            if not answering:
+                out.write("\nAssistant: ")
+                answering = True
+            out.write(event.text)
+        elif event.kind == "tool_called":
+            out.write(f"\n[calling {event.name}{f' {event.text}' if event.text else ''}]")
+            answering = False
+        elif event.kind == "tool_output":
+            out.write(f"\n[{event.name}] {event.text}")
+            answering = False
+        elif event.kind == "handoff":
+            out.write(f"\n[handed off to {event.name}]")
+            answering = False
+        elif event.kind == "final" and not answering:
+            out.write(f"\nAssistant: {event.text}")
+        out.flush()
+    out.write("\n")
+    timing.finish()
+    return timing
+
+
+def format_timing(timing: StreamTiming) -> str:
+    return f"(first output after {timing.ttfb * 1000:.0f} ms, total {timing.total * 1000:.0f} ms)"
@@ -0,0 +1,148 @@
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+CAT_FACTS = [
+    "Cats sleep for around 13 to 16 hours a day.",
+    "A group of cats is called a clowder.",
+    "Cats have five toes on their front paws, but only four on the back.",
+]
+
+
+def agify(name: str) -> Dict:
+    return {"count": 1000 + len(name), "name": name, "age": 20 + len(name) * 3}
+
+
+def nationalize(name: str) -> Dict:
+    return {"count": 500 + len(name), "name": name,
+            "country": [{"country_id": "US", "probability": 0.4}, {"country_id": "GB", "probability": 0.2}]}
+
+
+@dataclass
+class Fault:
+    """Faults injected into one stub API, as probabilities per request.
+
+    Attributes:
+        error_rate: Share of requests answered with `error_status`.
+        error_status: Status returned for injected errors.
+        slow_rate: Share of requests delayed by an extra `slow_delay` seconds.
+        slow_delay: Extra latency for slow requests.
+        drop_rate: Share of requests whose connection is closed without a response.
+    """
+    error_rate: float = 0.0
+    error_status: int = 503
+    slow_rate: float = 0.0
+    slow_delay: float = 1.0
+    drop_rate: float = 0.0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves catfact/agify/nationalize lookalikes under /catfact, /agify and /nationalize."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.request_count += 1
+        parts = urlsplit(self.path)
+        api = parts.path.strip("/").split("/")[0]
+        delay = self.server.delays.get(api, self.server.delay)
+        fault = self.server.faults.get(api)
+        if fault is not None and fault.slow_rate and random.random() < fault.slow_rate:
+            delay += fault.slow_delay
+        if delay:
+            time.sleep(delay)
+        if fault is not None:
+            if fault.drop_rate and random.random() < fault.drop_rate:
+                self.close_connection = True
+                return
+            if fault.error_rate and random.random() < fault.error_rate:
+                self._send(fault.error_status, {"error": "injected fault"})
+                return
+        query = parse_qs(parts.query)
+        names = query.get("name", [""])
+        batch = query.get("name[]")
+
+        if parts.path.startswith("/catfact"):
+            body = {"fact": random.choice(CAT_FACTS), "length": 42}
+        elif parts.path.startswith("/agify"):
+            body = [agify(name) for name in batch] if batch else agify(names[0])
+        elif parts.path.startswith("/nationalize"):
+            body = [nationalize(name) for name in batch] if batch else nationalize(names[0])
+        else:
+            self._send(404, {"error": "not found"})
+            return
+        self._send(200, body)
+
+    def _send(self, status: int, body) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients abandoning requests (timeouts, cancelled fan-outs) are expected under load
+        pass
+
+
+class StubServer:
+    """Local stand-in for the public APIs used by TOOL_CONFIGS, run on a background thread.
+
+    Args:
+        delay: Seconds of simulated upstream latency per request.
+        port: Port to bind, 0 picks a free one.
+        delays: Per-API latency overriding `delay`, keyed by the first path
+            segment, e.g. {"agify": 0.2}.
+        faults: Per-API injected faults, keyed like `delays`. The mapping is
+            read per request, so faults can be changed while the server runs.
+    """
+
+    def __init__(self, delay: float = 0.0, port: int = 0, handler=StubHandler,
+                 delays: Optional[Dict[str, float]] = None, faults: Optional[Dict[str, Fault]] = None):
+        self.server = _QuietServer(("127.0.0.1", port), handler)
+        self.server.delay = delay
+        self.server.delays = delays or {}
+        self.server.faults = faults if faults is not None else {}
+        self.server.request_count = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def faults(self) -> Dict[str, Fault]:
+        return self.server.faults
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_overrides(self) -> Dict[str, str]:
+        """Map each tool in TOOL_CONFIGS to its stub URL."""
+        return {
+            "get_facts_about_cats": f"{self.base_url}/catfact/fact",
+            "get_details_of_a_person": f"{self.base_url}/agify/",
+            "get_country_details": f"{self.base_url}/nationalize/",
+        }
+
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from numbers import Real
+from typing import Any, Dict, List, Optional, Tuple
+
+from resilience import ResiliencePolicy
+
+# File extensions read from a tool config directory
+CONFIG_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# Keys a tool config entry may have (see multi_tool_agent.create_tool)
+KNOWN_KEYS = frozenset({"kwargs", "url", "description", "response", "cache", "batch", "resilience", "timeout",
+                        "retries", "method", "serviceId", "operationId", "project", "max_response_bytes"})
+
+
+class ToolConfigError(ValueError):
+    """A tool config file could not be read or parsed."""
+
+
+def _named_list(value: Any, key: str) -> List[str]:
+    if not isinstance(value, list):
+        return [f"'{key}' must be a list"]
+    problems = []
+    for i, entry in enumerate(value):
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str) or not entry["name"]:
+            problems.append(f"'{key}[{i}]' must be a mapping with a non-empty 'name'")
+    return problems
+
+
+def _positive(value: Any) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool) and value > 0
+
+
+def validate_tool_config(tool_id: str, config: Any) -> List[str]:
+    """Check a tool config entry against what compile_tool_spec expects.
+
+    Returns:
+        A list of problems, empty if the entry is valid.
+    """
+    if not isinstance(config, dict):
+        return ["must be a mapping"]
+    problems = [f"unknown key '{key}'" for key in config if key not in KNOWN_KEYS]
+
+    url = config.get("url")
+    if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+        problems.append("'url' must be an http(s) URL")
+    problems += _named_list(config.get("kwargs", []), "kwargs")
+    problems += _named_list(config.get("response", []), "response")
+    if "description" in config and not isinstance(config["description"], str):
+        problems.append("'description' must be a string")
+
+    if "timeout" in config and config["timeout"] is not None and not _positive(config["timeout"]):
+        problems.append("'timeout' must be a positive number")
+    retries = config.get("retries")
+    if retries is not None and (not isinstance(retries, int) or isinstance(retries, bool) or retries < 0):
+        problems.append("'retries' must be a non-negative integer")
+
+    if "project" in config and not isinstance(config["project"], bool):
+        problems.append("'project' must be true or false")
+    max_bytes = config.get("max_response_bytes")
+    if max_bytes is not None and (not isinstance(max_bytes, int) or isinstance(max_bytes, bool) or max_bytes < 1):
+        problems.append("'max_response_bytes' must be a positive integer")
+
+    cache = config.get("cache", {})
+    if cache is not False and not isinstance(cache, dict):
+        problems.append("'cache' must be false or a mapping")
+    elif isinstance(cache, dict) and cache.get("ttl") is not None and not _positive(cache["ttl"]):
+        problems.append("'cache.ttl' must be a positive number")
+
+    batch = config.get("batch")
+    if batch is not None:
+        arg_names = {arg.get("name") for arg in config.get("kwargs", []) if isinstance(arg, dict)}
+        if not isinstance(batch, dict):
+            problems.append("'batch' must be a mapping")
+        else:
+            if batch.get("param") not in arg_names:
+                problems.append("'batch.param' must name one of the kwargs")
+            max_size = batch.get("max_size", 10)
+            if not isinstance(max_size, int) or isinstance(max_size, bool) or max_size < 1:
+                problems.append("'batch.max_size' must be a positive integer")
+            window = batch.get("window", 0.005)
+            if not isinstance(window, Real) or isinstance(window, bool) or window < 0:
+                problems.append("'batch.window' must be a non-negative number")
+
+    resilience = config.get("resilience")
+    if resilience is not None:
+        try:
+            ResiliencePolicy.from_config(resilience)
+        except (AttributeError, TypeError, ValueError) as e:
+            problems.append(f"invalid 'resilience': {e}")
+    return problems
+
+
+def parse_tool_file(path: str) -> Dict[str, Any]:
+    """Read a JSON or YAML file mapping tool ids to config entries.
+
+    Raises:
+        ToolConfigError: If the file can't be read, isn't valid JSON/YAML, or isn't a mapping.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if path.endswith(".json"):
+            tools = json.loads(data)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ToolConfigError(f"{path}: PyYAML is required for YAML tool configs (pip install pyyaml)")
+            # The libyaml loader is an order of magnitude faster, when PyYAML was built with it
+            tools = yaml.load(data, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+    except ToolConfigError:
+        raise
+    except Exception as e:
+        raise ToolConfigError(f"{path}: {e}") from e
+    if not isinstance(tools, dict):
+        raise ToolConfigError(f"{path}: expected a mapping of tool ids to configs")
+    return tools
+
+
+def config_fingerprint(config: Any) -> str:
+    """Stable hash of a config entry, used to tell changed tools from unchanged ones."""
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class ToolConfigChanges:
+    """What a scan found: tools to (re)build, tools to drop, and entries that were rejected.
+
+    Attributes:
+        updated: Tool id to its new, validated config, for added and changed tools.
+        removed: Tools whose entry or file is gone.
+        errors: One message per file or entry rejected in this scan; the
+            previous version of a rejected tool stays in place.
+    """
+    updated: Dict[str, dict] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.updated or self.removed)
+
+
+class ToolConfigSource:
+    """Tool configs read from a JSON/YAML file or a directory of them.
+
+    A scan stats every file but only re-reads files whose size or mtime
+    changed, and only reports the tools in them whose config actually
+    changed. A reload after editing one file costs one parse plus one
+    rebuild per changed tool, however many tools there are in total.
+
+    Args:
+        path: A config file, or a directory whose *.json, *.yaml and *.yml files are read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Validated config per tool id, and the file that defines it
+        self.configs: Dict[str, dict] = {}
+        self._owner: Dict[str, str] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        # Tool id to config fingerprint, per file
+        self._file_tools: Dict[str, Dict[str, str]] = {}
+        # Problems found in each file when it was last read
+        self._file_errors: Dict[str, List[str]] = {}
+
+    @property
+    def errors(self) -> List[str]:
+        """Problems in the files as they are now, until each file is fixed."""
+        return [error for errors in self._file_errors.values() for error in errors]
+
+    def _files(self) -> Dict[str, Tuple[int, int]]:
+        if not os.path.isdir(self.path):
+            if not os.path.exists(self.path):
+                return {}
+            stat = os.stat(self.path)
+            return {self.path: (stat.st_mtime_ns, stat.st_size)}
+        files = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(CONFIG_EXTENSIONS) and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _drop(self, tool_id: str, changes: ToolConfigChanges) -> None:
+        self.configs.pop(tool_id, None)
+        self._owner.pop(tool_id, None)
+        changes.updated.pop(tool_id, None)
+        changes.removed.append(tool_id)
+
+    def scan(self) -> ToolConfigChanges:
+        """Re-read changed files and return what changed since the last scan."""
+        changes = ToolConfigChanges()
+        files = self._files()
+
+        for path in [path for path in self._signatures if path not in files]:
+            del self._signatures[path]
+            self._file_errors.pop(path, None)
+            for tool_id in self._file_tools.pop(path, {}):
+                if self._owner.get(tool_id) == path:
+                    self._drop(tool_id, changes)
+
+        parsed: Dict[str, Dict[str, Any]] = {}
+        for path, signature in sorted(files.items()):
+            if self._signatures.get(path) == signature:
+                continue
+            self._signatures[path] = signature
+            try:
+                parsed[path] = parse_tool_file(path)
+                self._file_errors[path] = []
+            except ToolConfigError as e:
+                # Keep serving the tools this file defined before the bad edit
+                self._file_errors[path] = [str(e)]
+                changes.errors.append(str(e))
+
+        # Drop tools first, so a tool moved to another file is not reported as a duplicate
+        for path, tools in parsed.items():
+            for tool_id in self._file_tools.get(path, {}):
+                if tool_id not in tools and self._owner.get(tool_id) == path:
+                    self._drop(tool_id, changes)
+
+        for path, tools in parsed.items():
+            previous = self._file_tools.get(path, {})
+            current: Dict[str, str] = {}
+            for tool_id, config in tools.items():
+                owner = self._owner.get(tool_id)
+                if owner is not None and owner != path:
+                    error = f"{path}: tool '{tool_id}' is already defined in {owner}"
+                    self._file_errors[path].append(error)
+                    changes.errors.append(error)
+                    continue
+                problems = validate_tool_config(str(tool_id), config)
+                if problems:
+                    error = f"{path}: tool '{tool_id}': " + "; ".join(problems)
+                    self._file_errors[path].append(error)
+                    changes.errors.append(error)
+                    if tool_id in previous:
+                        current[tool_id] = previous[tool_id]
+                    continue
+                fingerprint = config_fingerprint(config)
+                current[tool_id] = fingerprint
+                if previous.get(tool_id) != fingerprint or tool_id not in self.configs:
+                    self.configs[tool_id] = config
+                    self._owner[tool_id] = path
+                    changes.updated[tool_id] = config
+                    if tool_id in changes.removed:
+                        changes.removed.remove(tool_id)
+            self._file_tools[path] = current
+        return changes
+
+
+def load_tool_configs(path: str) -> Dict[str, dict]:
+    """Read and validate every tool config under `path` in one go.
+
+    Raises:
+        ToolConfigError: If any file or entry is invalid.
+    """
+    source = ToolConfigSource(path)
+    changes = source.scan()
+    if changes.errors:
+        raise ToolConfigError("\n".join(changes.errors))
+    return source.configs
@@ -0,0 +1,351 @@
+import asyncio
+import dataclasses
+import functools
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Tool results starting with these are error messages returned instead of raised
+ERROR_PREFIXES = ("Error ", "An error occurred")
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus style (cumulative on export)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (le, cumulative count) pairs, ending with +Inf."""
+        total, pairs = 0, []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return pairs
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank, total = q * self.count, 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+@dataclass(slots=True)
+class CallRecord:
+    """Details the tool code reports about the call in progress.
+
+    Attributes:
+        error: Error class name, if the call failed.
+        payload_bytes: Size of the upstream response or tool output.
+        kept_bytes: Bytes of the upstream response kept after projection.
+        cache_hit: True/False when the call consulted the response cache.
+        batched: True when the call went through a request batcher.
+    """
+    error: Optional[str] = None
+    payload_bytes: Optional[int] = None
+    kept_bytes: Optional[int] = None
+    cache_hit: Optional[bool] = None
+    batched: bool = False
+
+
+_current_call: ContextVar[Optional[CallRecord]] = ContextVar("tool_call_record", default=None)
+
+
+def note_error(error: Any) -> None:
+    """Record the error class of the current tool call; the first error wins."""
+    record = _current_call.get()
+    if record is not None and record.error is None:
+        record.error = type(error).__name__ if isinstance(error, BaseException) else str(error)
+
+
+def note_payload(size: int) -> None:
+    """Record the response size of the current tool call, in bytes."""
+    record = _current_call.get()
+    if record is not None:
+        record.payload_bytes = size
+
+
+def note_projection(kept: int) -> None:
+    """Record how many bytes of the current call's response were kept after projection."""
+    record = _current_call.get()
+    if record is not None:
+        record.kept_bytes = kept
+
+
+def note_cache(hit: bool) -> None:
+    """Record whether the current tool call was served from the response cache."""
+    record = _current_call.get()
+    if record is not None:
+        record.cache_hit = hit
+
+
+def note_batched() -> None:
+    """Record that the current tool call went through a request batcher."""
+    record = _current_call.get()
+    if record is not None:
+        record.batched = True
+
+
+class SamplingProfiler:
+    """Samples the stack of the thread running a tool while any call to it is in flight.
+
+    Tools are coroutines, so samples show what the event loop thread was doing
+    during the tool's in-flight windows, including other work interleaved with it.
+
+    Args:
+        interval: Seconds between samples.
+        depth: Frames kept per sample, innermost first.
+    """
+
+    def __init__(self, interval: float = 0.005, depth: int = 6):
+        self.interval = interval
+        self.depth = depth
+        self.samples: Counter = Counter()
+        self._active = 0
+        self._thread_id: Optional[int] = None
+        self._running = threading.Event()
+        self._stopped = False
+        self._sampler: Optional[threading.Thread] = None
+
+    def enter(self) -> None:
+        self._active += 1
+        if self._active == 1:
+            self._thread_id = threading.get_ident()
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="tool-profiler", daemon=True)
+                self._sampler.start()
+            self._running.set()
+
+    def exit(self) -> None:
+        self._active -= 1
+        if self._active == 0:
+            self._running.clear()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._running.set()
+
+    def _sample(self) -> None:
+        while True:
+            self._running.wait()
+            if self._stopped:
+                return
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[" <- ".join(stack)] += 1
+            time.sleep(self.interval)
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Return the `n` most sampled stacks with their sample counts."""
+        return self.samples.most_common(n)
+
+
+class ToolMetrics:
+    """Counters and histograms for one tool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.in_flight = 0
+        self.errors: Counter = Counter()
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.payload = Histogram(PAYLOAD_BUCKETS)
+        self.kept_bytes = 0
+        self.dropped_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.batched_calls = 0
+        self.profiler: Optional[SamplingProfiler] = None
+
+    def record(self, record: CallRecord, elapsed: float) -> None:
+        self.calls += 1
+        self.latency.observe(elapsed)
+        if record.error is not None:
+            self.errors[record.error] += 1
+        if record.payload_bytes is not None:
+            self.payload.observe(record.payload_bytes)
+            if record.kept_bytes is not None:
+                self.kept_bytes += record.kept_bytes
+                self.dropped_bytes += record.payload_bytes - record.kept_bytes
+        if record.cache_hit is not None:
+            if record.cache_hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if record.batched:
+            self.batched_calls += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "errors": dict(self.errors),
+            "latency_mean_ms": self.latency.sum / self.latency.count * 1000 if self.latency.count else 0.0,
+            "latency_p95_ms": self.latency.quantile(0.95) * 1000,
+            "payload_bytes_total": self.payload.sum,
+            "kept_bytes_total": self.kept_bytes,
+            "dropped_bytes_total": self.dropped_bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "batched_calls": self.batched_calls,
+        }
+
+
+class MetricsRegistry:
+    """Per-tool metrics for generated tools and SDK function tools."""
+
+    def __init__(self):
+        self.tools: Dict[str, ToolMetrics] = {}
+
+    def tool(self, name: str) -> ToolMetrics:
+        metrics = self.tools.get(name)
+        if metrics is None:
+            metrics = self.tools[name] = ToolMetrics(name)
+        return metrics
+
+    def enable_profiler(self, name: str, profiler: Optional[SamplingProfiler] = None) -> SamplingProfiler:
+        """Start sampling the stack whenever the named tool is in flight."""
+        profiler = profiler or SamplingProfiler()
+        self.tool(name).profiler = profiler
+        return profiler
+
+    def disable_profiler(self, name: str) -> Optional[SamplingProfiler]:
+        metrics = self.tool(name)
+        profiler, metrics.profiler = metrics.profiler, None
+        if profiler is not None:
+            profiler.stop()
+        return profiler
+
+    @staticmethod
+    async def _observe(metrics: ToolMetrics, call: Callable[..., Any], args: tuple, kwargs: dict,
+                       output_size: bool) -> Any:
+        record = CallRecord()
+        token = _current_call.set(record)
+        profiler = metrics.profiler
+        if profiler is not None:
+            profiler.enter()
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = await call(*args, **kwargs)
+        except BaseException as e:
+            note_error(e)
+            raise
+        else:
+            if isinstance(result, str):
+                if result.startswith(ERROR_PREFIXES):
+                    note_error("ErrorResult")
+                if output_size and record.payload_bytes is None:
+                    record.payload_bytes = len(result.encode())
+            elif output_size and record.payload_bytes is None:
+                record.payload_bytes = len(str(result).encode())
+            return result
+        finally:
+            metrics.in_flight -= 1
+            if profiler is not None:
+                profiler.exit()
+            metrics.record(record, time.perf_counter() - start)
+            _current_call.reset(token)
+
+    def instrument(self, tool: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap an async tool function; attributes such as `spec` are carried over."""
+        metrics = self.tool(tool.__name__)
+        observe = self._observe
+
+        @functools.wraps(tool)
+        async def instrumented(*args: Any, **kwargs: Any) -> Any:
+            return await observe(metrics, tool, args, kwargs, False)
+
+        return instrumented
+
+    def instrument_function_tool(self, tool: Any) -> Any:
+        """Return a copy of an SDK FunctionTool whose invocations are measured."""
+        metrics = self.tool(tool.name)
+        invoke = tool.on_invoke_tool
+        observe = self._observe
+
+        async def on_invoke_tool(ctx: Any, input: str) -> Any:
+            return await observe(metrics, invoke, (ctx, input), {}, True)
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metrics.snapshot() for name, metrics in self.tools.items()}
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def family(metric: str, kind: str, help: str, samples: List[Tuple[str, Any]]) -> None:
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(f"{metric}{labels} {value}" for labels, value in samples)
+
+        tools = list(self.tools.values())
+        family("tool_calls_total", "counter", "Completed tool calls.",
+               [(f'{{tool="{m.name}"}}', m.calls) for m in tools])
+        family("tool_in_flight", "gauge", "Tool calls currently running.",
+               [(f'{{tool="{m.name}"}}', m.in_flight) for m in tools])
+        family("tool_errors_total", "counter", "Failed tool calls by error class.",
+               [(f'{{tool="{m.name}",error="{error}"}}', count) for m in tools for error, count in m.errors.items()])
+        for metric, help, attr in (("tool_latency_seconds", "Tool call latency.", "latency"),
+                                   ("tool_payload_bytes", "Upstream response or tool output size.", "payload")):
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} histogram")
+            for m in tools:
+                histogram = getattr(m, attr)
+                lines.extend(f'{metric}_bucket{{tool="{m.name}",le="{le}"}} {count}'
+                             for le, count in histogram.cumulative())
+                lines.append(f'{metric}_sum{{tool="{m.name}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{tool="{m.name}"}} {histogram.count}')
+        family("tool_response_kept_bytes_total", "counter", "Upstream response bytes kept after projection.",
+               [(f'{{tool="{m.name}"}}', m.kept_bytes) for m in tools])
+        family("tool_response_dropped_bytes_total", "counter", "Upstream response bytes dropped by projection.",
+               [(f'{{tool="{m.name}"}}', m.dropped_bytes) for m in tools])
+        family("tool_cache_hits_total", "counter", "Calls served from the response cache.",
+               [(f'{{tool="{m.name}"}}', m.cache_hits) for m in tools])
+        family("tool_cache_misses_total", "counter", "Calls that missed the response cache.",
+               [(f'{{tool="{m.name}"}}', m.cache_misses) for m in tools])
+        family("tool_batched_calls_total", "counter", "Calls coalesced through a request batcher.",
+               [(f'{{tool="{m.name}"}}', m.batched_calls) for m in tools])
+        return "\n".join(lines) + "\n"
+
+    async def dump_periodically(self, interval: float, write: Callable[[str], Any] = print) -> None:
+        """Write a JSON snapshot every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            write(json.dumps({"timestamp": time.time(), "tools": self.snapshot()}))
+
+
+# Shared registry for every tool in the process
+TOOL_METRICS = MetricsRegistry()
@@ -0,0 +1,202 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from json_projection import MAX_RESPONSE_BYTES
+from resilience import ResiliencePolicy
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ToolSpec:
+    """Compiled, immutable form of a TOOL_CONFIGS entry.
+
+    Everything a generated tool function needs per call is derived once here,
+    so a call only binds its arguments and encodes their values.
+
+    Attributes:
+        tool_id: The tool name.
+        arg_names: Declared argument names, in positional order.
+        arg_index: Argument name to position.
+        url: The base URL from the config.
+        url_prefix: The base URL followed by the query separator to use.
+        encoded_keys: Pre-encoded "name=" query prefixes, one per argument.
+        description: The generated tool description.
+        response_fields: Names of the declared response fields.
+        projection: Top-level response fields a call keeps, None to keep the whole body.
+        max_response_bytes: Largest response body read, in bytes.
+        timeout: Per-call HTTP timeout override, if any.
+        retries: Per-call HTTP retry override, if any.
+        cache_enabled: Whether responses may be cached.
+        cache_ttl: Cache TTL in seconds, None for the cache default.
+        batch_param: Argument coalesced into batched requests, if batching is configured.
+        batch_key: Pre-encoded "param[]=" query prefix for batched requests.
+        batch_max_size: Largest number of values per batched request.
+        batch_window: Seconds to wait for more values before sending a batch.
+        resilience: Circuit breaker, adaptive concurrency and hedging settings, if configured.
+        config: The source config entry.
+    """
+    tool_id: str
+    arg_names: Tuple[str, ...]
+    arg_index: Dict[str, int]
+    url: str
+    url_prefix: str
+    encoded_keys: Tuple[str, ...]
+    description: str
+    response_fields: Tuple[str, ...]
+    projection: Optional[FrozenSet[str]]
+    max_response_bytes: int
+    timeout: Optional[float]
+    retries: Optional[int]
+    cache_enabled: bool
+    cache_ttl: Optional[float]
+    batch_param: Optional[str]
+    batch_key: str
+    batch_max_size: int
+    batch_window: float
+    resilience: Optional[ResiliencePolicy]
+    config: Dict[str, Any]
+
+    def bind(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Map positional and keyword arguments onto declared argument slots.
+
+        Unknown keyword arguments are ignored and missing ones are left as None.
+        """
+        values = list(args[:len(self.arg_names)]) + [None] * (len(self.arg_names) - len(args))
+        arg_index = self.arg_index
+        for key, value in kwargs.items():
+            position = arg_index.get(key)
+            if position is not None:
+                values[position] = value
+        return tuple(values)
+
+    def arguments(self, values: Tuple[Any, ...]) -> Dict[str, Any]:
+        """Return bound values as a name to value dict, skipping unset arguments."""
+        return {name: value for name, value in zip(self.arg_names, values) if value is not None}
+
+    def build_url(self, values: Tuple[Any, ...]) -> str:
+        """Build the request URL with URL-encoded query parameters."""
+        query = "&".join(key + quote(str(value), safe="")
+                         for key, value in zip(self.encoded_keys, values) if value is not None)
+        return self.url_prefix + query if query else self.url
+
+    def build_batch_url(self, values: list) -> str:
+        """Build a batched request URL with one `param[]=` entry per value."""
+        return self.url_prefix + "&".join(self.batch_key + quote(str(value), safe="") for value in values)
+
+
+def compile_tool_spec(tool_id: str, tool_config: dict,
+                      describe: Callable[[str, list, list], str]) -> ToolSpec:
+    """Compile a TOOL_CONFIGS entry into a ToolSpec.
+
+    Args:
+        tool_id: The tool name.
+        tool_config: The config entry.
+        describe: Builds the tool description from (tool_id, kwargs, response).
+
+    Returns:
+        The compiled spec.
+    """
+    required_args = tool_config.get("kwargs", [])
+    response_parameters = tool_config.get("response", [])
+    arg_names = tuple(arg["name"] for arg in required_args if isinstance(arg, dict) and arg.get("name"))
+    url = tool_config.get("url", "")
+    cache_settings = tool_config.get("cache", {})
+    batch_settings = tool_config.get("batch") or {}
+    batch_param = batch_settings.get("param")
+    response_fields = tuple(p["name"] for p in response_parameters if isinstance(p, dict) and p.get("name"))
+
+    return ToolSpec(
+        tool_id=tool_id,
+        arg_names=arg_names,
+        arg_index={name: i for i, name in enumerate(arg_names)},
+        url=url,
+        url_prefix=url + ('?' if '?' not in url else '&'),
+        encoded_keys=tuple(quote(name, safe="") + "=" for name in arg_names),
+        description=describe(tool_id, required_args, response_parameters),
+        response_fields=response_fields,
+        # Responses are cut down to the declared fields, unless "project" is false
+        projection=frozenset(response_fields) if response_fields and tool_config.get("project", True) else None,
+        max_response_bytes=tool_config.get("max_response_bytes", MAX_RESPONSE_BYTES),
+        timeout=tool_config.get("timeout"),
+        retries=tool_config.get("retries"),
+        cache_enabled=cache_settings is not False,
+        cache_ttl=cache_settings.get("ttl") if isinstance(cache_settings, dict) else None,
+        batch_param=batch_param,
+        batch_key=quote(f"{batch_param}[]", safe="[]") + "=" if batch_param else "",
+        batch_max_size=batch_settings.get("max_size", 10),
+        batch_window=batch_settings.get("window", 0.005),
+        resilience=ResiliencePolicy.from_config(tool_config.get("resilience")),
+        config=tool_config,
+    )
+
+
+class ToolRegistry:
+    """Compiled specs for every configured tool.
+
+    Tools registered with `add_lazy` are compiled on first access, so only the
+    tools a process actually uses pay for compiling and describing.
+    """
+
+    def __init__(self, describe: Callable[[str, list, list], str]):
+        self.describe = describe
+        # None marks a tool whose config is waiting in _pending
+        self._specs: Dict[str, Optional[ToolSpec]] = {}
+        self._pending: Dict[str, dict] = {}
+
+    @classmethod
+    def from_configs(cls, configs: Dict[str, dict], describe: Callable[[str, list, list], str],
+                     lazy: bool = False) -> "ToolRegistry":
+        """Register every entry of a TOOL_CONFIGS-style dict, compiling now or (if lazy) on first use."""
+        registry = cls(describe)
+        for tool_id, tool_config in configs.items():
+            if lazy:
+                registry.add_lazy(tool_id, tool_config)
+            else:
+                registry.add(tool_id, tool_config)
+        return registry
+
+    def add(self, tool_id: str, tool_config: dict) -> ToolSpec:
+        """Compile and register (or replace) a tool."""
+        spec = compile_tool_spec(tool_id, tool_config, self.describe)
+        self._pending.pop(tool_id, None)
+        self._specs[tool_id] = spec
+        return spec
+
+    def add_lazy(self, tool_id: str, tool_config: dict) -> None:
+        """Register (or replace) a tool, deferring compilation until it is first accessed."""
+        self._specs[tool_id] = None
+        self._pending[tool_id] = tool_config
+
+    def remove(self, tool_id: str) -> None:
+        """Unregister a tool, if present."""
+        self._specs.pop(tool_id, None)
+        self._pending.pop(tool_id, None)
+
+    def get(self, tool_id: str) -> Optional[ToolSpec]:
+        if tool_id not in self._specs:
+            return None
+        spec = self._specs[tool_id]
+        if spec is None:
+            spec = self.add(tool_id, self._pending[tool_id])
+        return spec
+
+    def __getitem__(self, tool_id: str) -> ToolSpec:
+        spec = self.get(tool_id)
+        if spec is None:
+            raise KeyError(tool_id)
+        return spec
+
+    def configs(self) -> Iterator[Tuple[str, dict]]:
+        """Yield every tool's id and config, in registration order, without compiling any."""
+        for tool_id, spec in list(self._specs.items()):
+            yield tool_id, self._pending[tool_id] if spec is None else spec.config
+
+    def __contains__(self, tool_id: str) -> bool:
+        return tool_id in self._specs
+
+    def __iter__(self) -> Iterator[ToolSpec]:
+        for tool_id in list(self._specs):
+            yield self[tool_id]
+
+    def __len__(self) -> int:
+        return len(self._specs)
@@ -0,0 +1,105 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+# Words that say nothing about which tool a message needs
+STOP_WORDS = frozenset({
+    "a", "about", "an", "and", "any", "are", "by", "can", "do", "for", "from", "get", "give",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "please", "set", "show", "some",
+    "tell", "the", "to", "what", "with", "you",
+})
+
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.25
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_token(token: str) -> str:
+    """Fold simple plurals so "cats" and "cat" route the same way."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> Set[str]:
+    """Split text (or a snake_case tool name) into normalized, stop-word-free tokens."""
+    return {normalize_token(t) for t in _TOKEN_RE.findall(text.lower().replace("_", " ")) if t not in STOP_WORDS}
+
+
+class ToolRouter:
+    """Inverted token index from message words to tools.
+
+    Tool names (split on underscores) are always indexed. Descriptions are
+    indexed with a lower weight when `use_descriptions` is set. Routing a
+    message costs one dict lookup per distinct message token.
+
+    Args:
+        use_descriptions: Also score description words.
+    """
+
+    def __init__(self, use_descriptions: bool = False):
+        self.use_descriptions = use_descriptions
+        self._index: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._tool_tokens: Dict[str, Set[str]] = {}
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+
+    @classmethod
+    def from_tools(cls, tools: Iterable, use_descriptions: bool = False) -> "ToolRouter":
+        """Index tool functions by their `__name__`, and `__doc__` when `use_descriptions` is set."""
+        router = cls(use_descriptions)
+        for tool in tools:
+            router.add_tool(tool.__name__, tool.__doc__ if use_descriptions else None)
+        return router
+
+    def add_tool(self, tool_id: str, description: Optional[str] = None) -> None:
+        """Index a tool, replacing any previous entry with the same id in its place in the order."""
+        order = self._order.get(tool_id)
+        if tool_id in self._tool_tokens:
+            self.remove_tool(tool_id)
+        weights: Dict[str, float] = {}
+        if self.use_descriptions and description:
+            for token in tokenize(description):
+                weights[token] = DESCRIPTION_WEIGHT
+        for token in tokenize(tool_id):
+            weights[token] = NAME_WEIGHT
+        for token, weight in weights.items():
+            self._index[token][tool_id] = weight
+        self._tool_tokens[tool_id] = set(weights)
+        if order is None:
+            order = self._next_order
+            self._next_order += 1
+        self._order[tool_id] = order
+
+    def remove_tool(self, tool_id: str) -> None:
+        """Drop a tool from the index, if present."""
+        for token in self._tool_tokens.pop(tool_id, ()):
+            postings = self._index.get(token)
+            if postings is not None:
+                postings.pop(tool_id, None)
+                if not postings:
+                    del self._index[token]
+        self._order.pop(tool_id, None)
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Return the relevance score of every tool matching the text."""
+        scores: Dict[str, float] = defaultdict(float)
+        for token in tokenize(text):
+            for tool_id, weight in self._index.get(token, {}).items():
+                scores[tool_id] += weight
+        return scores
+
+    def route(self, text: str, min_score: float = 0.0) -> List[str]:
+        """Return matching tool ids in the order the tools were added.
+
+        Args:
+            text: The user message.
+            min_score: Only return tools scoring above this value.
+        """
+        order = self._order
+        return sorted((tool_id for tool_id, score in self.scores(text).items() if score > min_score),
+                      key=order.__getitem__)
+
+    def __len__(self) -> int:
+        return len(self._tool_tokens)
@@ -0,0 +1,586 @@
+import argparse
+import asyncio
+import base64
+import cProfile
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import pstats
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from agents import Model, ModelProvider, ModelResponse, Usage
+from agents.models.fake_id import FAKE_RESPONSES_ID
+from openai.types.responses import (Response, ResponseCompletedEvent, ResponseOutputItem, ResponseOutputMessage,
+                                    ResponseTextDeltaEvent)
+from pydantic import TypeAdapter
+
+from http_client import configure_http_client
+from streaming import StreamEvent
+
+# Bumped when the record layout changes incompatibly
+TRAFFIC_LOG_VERSION = 1
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+_OUTPUT_ITEM = TypeAdapter(ResponseOutputItem)
+
+
+class TrafficLog:
+    """Append-only, gzip-compressed JSON-lines log of one recording.
+
+    Every record carries "kind" ("header", "http", "model" or "turn") and
+    "t", its start in seconds since the log was opened.
+
+    Args:
+        path: File to write, conventionally *.jsonl.gz.
+        **meta: Extra header fields, e.g. the tool URL overrides replay needs.
+    """
+
+    def __init__(self, path: str, **meta: Any):
+        self.path = path
+        self.started = time.perf_counter()
+        self.records = 0
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self.write({"kind": "header", "t": 0.0, "version": TRAFFIC_LOG_VERSION, "created": time.time(), **meta})
+
+    def now(self) -> float:
+        return time.perf_counter() - self.started
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        self.records += 1
+
+    def flush(self) -> None:
+        """Make the records so far readable, should the process not get to close the log."""
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_traffic_log(path: str) -> List[Dict[str, Any]]:
+    """Read every record of a log, header first.
+
+    A log cut short (e.g. the server was killed) is read up to its last complete record.
+
+    Raises:
+        ValueError: If the file is not a traffic log of a supported version.
+    """
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                records.append(json.loads(line))
+        except (EOFError, json.JSONDecodeError):
+            pass
+    if not records or records[0].get("kind") != "header":
+        raise ValueError(f"{path}: not a traffic log")
+    if records[0].get("version") != TRAFFIC_LOG_VERSION:
+        raise ValueError(f"{path}: unsupported traffic log version {records[0].get('version')}")
+    return records
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(record: Dict[str, Any]) -> bytes:
+    if "body64" in record:
+        return base64.b64decode(record["body64"])
+    return record.get("body", "").encode("utf-8")
+
+
+async def _pause(seconds: float, speed: float) -> None:
+    # Speed 0 replays as fast as possible
+    if speed > 0 and seconds > 0:
+        await asyncio.sleep(seconds / speed)
+
+
+def _take(queues: Dict[Any, Deque[Dict[str, Any]]], key: Any) -> Optional[Dict[str, Any]]:
+    """Next recorded exchange for `key`, cycling so repeated calls are still answered."""
+    queue = queues.get(key)
+    if not queue:
+        return None
+    queue.rotate(-1)
+    return queue[-1]
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Sends requests through `transport` and logs each exchange.
+
+    Bodies are read in full before they are handed on, so streamed reads
+    (json_projection) see them arrive in one chunk while recording.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, log: TrafficLog):
+        self.transport = transport
+        self.log = log
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        record: Dict[str, Any] = {"kind": "http", "t": self.log.now(), "method": request.method,
+                                  "url": str(request.url)}
+        start = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+            # Still content-encoded; the client decodes it as usual
+            body = await response.aread()
+            await response.aclose()
+        except httpx.TransportError as e:
+            record.update(elapsed=time.perf_counter() - start, error=type(e).__name__, message=str(e))
+            self.log.write(record)
+            raise
+        record.update(elapsed=time.perf_counter() - start, status=response.status_code,
+                      headers=response.headers.multi_items(), **_encode_body(body))
+        self.log.write(record)
+        return httpx.Response(response.status_code, headers=response.headers, stream=httpx.ByteStream(body))
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answers requests with recorded exchanges, after their recorded latency divided by `speed`.
+
+    A request is matched on method and full URL, then on method and URL
+    without the query (batches can form differently on replay), and gets a
+    404 when neither was recorded.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], speed: float = 1.0):
+        self.speed = speed
+        self._exact: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_path: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        for record in records:
+            if record["kind"] == "http":
+                self._exact[record["method"], record["url"]].append(record)
+                self._by_path[record["method"], self._path(record["url"])].append(record)
+        self.matches: Counter = Counter()
+
+    @staticmethod
+    def _path(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        record = _take(self._exact, (request.method, url))
+        if record is not None:
+            self.matches["exact"] += 1
+        else:
+            record = _take(self._by_path, (request.method, self._path(url)))
+            if record is None:
+                self.matches["missing"] += 1
+                return httpx.Response(404, json={"error": f"No recorded response for {request.method} {url}"})
+            self.matches["path"] += 1
+        await _pause(record["elapsed"], self.speed)
+        if "error" in record:
+            error = getattr(httpx, record["error"], None)
+            if not isinstance(error, type) or not issubclass(error, httpx.TransportError):
+                error = httpx.TransportError
+            raise error(record["message"], request=request)
+        return httpx.Response(record["status"], headers=record["headers"],
+                              stream=httpx.ByteStream(_decode_body(record)))
+
+
+def _model_keys(system_instructions: Optional[str], input: Any) -> Tuple[str, str]:
+    """(call, agent) keys: the exact prompt, and just the agent's instructions."""
+    call = json.dumps([system_instructions, input], sort_keys=True, default=str)
+    return (hashlib.sha1(call.encode()).hexdigest(),
+            hashlib.sha1((system_instructions or "").encode()).hexdigest())
+
+
+class RecordingModel(Model):
+    """Passes calls through to `model` and logs each response with its latency."""
+
+    def __init__(self, model: Model, log: TrafficLog):
+        self.model = model
+        self.log = log
+
+    def _write(self, t: float, start: float, system_instructions: Optional[str], input: Any, output: list,
+               usage: Dict[str, int], ttfb: Optional[float] = None) -> None:
+        key, agent = _model_keys(system_instructions, input)
+        record = {"kind": "model", "t": t, "elapsed": time.perf_counter() - start, "key": key, "agent": agent,
+                  "output": [item.model_dump(mode="json", exclude_unset=True) for item in output], "usage": usage}
+        if ttfb is not None:
+            record["ttfb"] = ttfb
+        self.log.write(record)
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing) -> ModelResponse:
+        t, start = self.log.now(), time.perf_counter()
+        response = await self.model.get_response(system_instructions, input, model_settings, tools, output_schema,
+                                                 handoffs, tracing)
+        self._write(t, start, system_instructions, input, response.output, dataclasses.asdict(response.usage))
+        return response
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing) -> AsyncIterator[Any]:
+        t, start = self.log.now(), time.perf_counter()
+        ttfb, output, usage = None, [], {"requests": 1}
+        async for event in self.model.stream_response(system_instructions, input, model_settings, tools,
+                                                      output_schema, handoffs, tracing):
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            if event.type == "response.completed":
+                output = event.response.output
+                if event.response.usage is not None:
+                    usage.update(input_tokens=event.response.usage.input_tokens,
+                                 output_tokens=event.response.usage.output_tokens,
+                                 total_tokens=event.response.usage.total_tokens)
+            yield event
+        self._write(t, start, system_instructions, input, output, usage, ttfb)
+
+
+class RecordingModelProvider(ModelProvider):
+    """Wraps every model of `provider` in a RecordingModel."""
+
+    def __init__(self, provider: ModelProvider, log: TrafficLog):
+        self.provider = provider
+        self.log = log
+        self._models: Dict[Optional[str], RecordingModel] = {}
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        model = self._models.get(model_name)
+        if model is None:
+            model = self._models[model_name] = RecordingModel(self.provider.get_model(model_name), self.log)
+        return model
+
+
+class ReplayModel(Model):
+    """Answers model calls with recorded responses, after their recorded latency divided by `speed`.
+
+    A call is matched on its exact prompt, then on the agent's instructions
+    alone, in recorded order.
+
+    Raises:
+        LookupError: From a call by an agent that never called the model while recording.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], speed: float = 1.0):
+        self.speed = speed
+        self._exact: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_agent: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        for record in records:
+            if record["kind"] == "model":
+                self._exact[record["key"]].append(record)
+                self._by_agent[record["agent"]].append(record)
+        self.matches: Counter = Counter()
+
+    def _take(self, system_instructions: Optional[str], input: Any) -> Tuple[Dict[str, Any], list]:
+        key, agent = _model_keys(system_instructions, input)
+        record = _take(self._exact, key)
+        if record is not None:
+            self.matches["exact"] += 1
+        else:
+            record = _take(self._by_agent, agent)
+            if record is None:
+                self.matches["missing"] += 1
+                raise LookupError(f"No recorded model response for agent {system_instructions!r}")
+            self.matches["agent"] += 1
+        return record, [_OUTPUT_ITEM.validate_python(item) for item in record["output"]]
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing) -> ModelResponse:
+        record, output = self._take(system_instructions, input)
+        await _pause(record["elapsed"], self.speed)
+        return ModelResponse(output=output, usage=Usage(**record["usage"]), referenceable_id=None)
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing) -> AsyncIterator[Any]:
+        record, output = self._take(system_instructions, input)
+        ttfb = record.get("ttfb", 0.0)
+        await _pause(ttfb, self.speed)
+        tokens = [token for item in output if isinstance(item, ResponseOutputMessage)
+                  for part in item.content if part.type == "output_text" for token in _TOKEN_RE.findall(part.text)]
+        # Tokens arrive evenly over the rest of the recorded call
+        gap = max(record["elapsed"] - ttfb, 0.0) / max(len(tokens), 1)
+        for token in tokens:
+            yield ResponseTextDeltaEvent(content_index=0, delta=token, item_id=FAKE_RESPONSES_ID, output_index=0,
+                                         type="response.output_text.delta")
+            await _pause(gap, self.speed)
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            response=Response(id=FAKE_RESPONSES_ID, created_at=time.time(), model="replay", object="response",
+                              output=output, parallel_tool_calls=False, tool_choice="auto", tools=[]),
+        )
+
+
+class ReplayModelProvider(ModelProvider):
+    """Model provider returning one shared ReplayModel for every model name."""
+
+    def __init__(self, model: ReplayModel):
+        self.model = model
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return self.model
+
+
+class TrafficRecorder:
+    """Records this process's tool HTTP exchanges, model calls and turns into a TrafficLog.
+
+    start() routes the shared HTTP client through a RecordingTransport; model
+    calls are recorded for run configs built with `model_provider(...)`.
+
+    Args:
+        path: Log file to write.
+        **meta: Extra header fields for replay, e.g. tool_url_overrides.
+    """
+
+    def __init__(self, path: str, **meta: Any):
+        self.log = TrafficLog(path, **meta)
+
+    def start(self) -> None:
+        configure_http_client(wrap_transport=lambda transport: RecordingTransport(transport, self.log))
+
+    def model_provider(self, provider: ModelProvider) -> RecordingModelProvider:
+        """Wrap `provider` so its model calls are recorded."""
+        return RecordingModelProvider(provider, self.log)
+
+    async def turn(self, agent: str, session: str, message: str,
+                   events: AsyncIterator[StreamEvent]) -> AsyncIterator[StreamEvent]:
+        """Pass a turn's events through, recording the turn once it finishes."""
+        record: Dict[str, Any] = {"kind": "turn", "t": self.log.now(), "agent": agent, "session": session,
+                                  "message": message, "output": None}
+        start = time.perf_counter()
+        try:
+            async for event in events:
+                if event.kind == "final":
+                    record["output"] = event.text
+                yield event
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["elapsed"] = time.perf_counter() - start
+            self.log.write(record)
+            self.log.flush()
+
+    def stop(self) -> None:
+        configure_http_client(wrap_transport=None)
+        self.log.close()
+
+
+@dataclass
+class ReplayReport:
+    """How one replay pass went.
+
+    Attributes:
+        turns: Turns replayed.
+        errors: Turns that failed or ended without an output.
+        mismatches: Turns whose output differs from the recorded one.
+        elapsed: Wall-clock seconds of the pass.
+        recorded: Seconds the recorded turns spanned.
+        latencies: Seconds per replayed turn.
+        http: Tool request matches by kind ("exact", "path", "missing").
+        model: Model call matches by kind ("exact", "agent", "missing").
+    """
+    turns: int = 0
+    errors: int = 0
+    mismatches: int = 0
+    elapsed: float = 0.0
+    recorded: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    http: Dict[str, int] = field(default_factory=dict)
+    model: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        latencies = sorted(self.latencies) or [0.0]
+        p50, p95 = latencies[len(latencies) // 2], latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        return (f"{self.turns} turns in {self.elapsed:.2f}s (recorded over {self.recorded:.2f}s), "
+                f"{self.errors} errors, {self.mismatches} outputs differ; "
+                f"turn p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms; "
+                f"http {dict(self.http)}, model {dict(self.model)}")
+
+
+def _sse_output(body: str) -> Optional[str]:
+    """The answer from a turn's server-sent events, None if the turn reported an error."""
+    event = None
+    for line in body.splitlines():
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:") and event == "output":
+            return json.loads(line[5:])["output"]
+    return None
+
+
+async def replay(records: List[Dict[str, Any]], speed: float = 1.0, tool_config: Optional[str] = None) -> ReplayReport:
+    """Replay the recorded turns against an in-process server app, with no network.
+
+    Tool requests are answered by a ReplayTransport and model calls by a
+    ReplayModel. Turns start at their recorded offsets divided by `speed`
+    (0: all at once); turns of one session run in order, as they did while
+    recording. From the command line, with a profiler around the replay:
+
+        python -m traffic_log replay traffic.jsonl.gz --speed 0 --profile cprofile --profile-out replay.prof
+    """
+    import server
+
+    header = records[0]
+    transport = ReplayTransport(records, speed)
+    model = ReplayModel(records, speed)
+    configure_http_client(wrap_transport=lambda _: transport)
+    try:
+        turns = sorted((record for record in records if record["kind"] == "turn"), key=lambda record: record["t"])
+        report = ReplayReport(turns=len(turns), recorded=max((r["t"] + r["elapsed"] for r in turns), default=0.0))
+
+        start = time.perf_counter()
+        # Built inside the replay, so tool construction shows up in profiles
+        app = server.create_app(ReplayModelProvider(model), tool_url_overrides=header.get("tool_url_overrides"),
+                                max_queued_turns=max(len(turns), 1),
+                                tool_config=tool_config or header.get("tool_config"))
+        sessions: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for turn in turns:
+            sessions[turn["agent"], turn["session"]].append(turn)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay",
+                                     timeout=None) as client:
+            async def run_session(agent: str, session: str, session_turns: List[Dict[str, Any]]) -> None:
+                for turn in session_turns:
+                    if speed > 0:
+                        await asyncio.sleep(max(turn["t"] / speed - (time.perf_counter() - start), 0.0))
+                    turn_start = time.perf_counter()
+                    try:
+                        response = await client.post(f"/agents/{agent}/sessions/{session}/messages",
+                                                     json={"message": turn["message"]})
+                        output = _sse_output(response.text) if response.status_code == 200 else None
+                    except Exception:
+                        output = None
+                    report.latencies.append(time.perf_counter() - turn_start)
+                    if output is None:
+                        report.errors += 1
+                    elif output != turn["output"]:
+                        report.mismatches += 1
+
+            await asyncio.gather(*(run_session(agent, session, session_turns)
+                                   for (agent, session), session_turns in sessions.items()))
+        report.elapsed = time.perf_counter() - start
+        report.http, report.model = dict(transport.matches), dict(model.matches)
+        return report
+    finally:
+        # Later clients in this process must reach the network again, even if the replay failed
+        configure_http_client(wrap_transport=None)
+
+
+def reset_caches() -> None:
+    """Empty the response and verdict caches, so another replay pass reaches the log again."""
+    import multi_tool_agent
+    multi_tool_agent.RESPONSE_CACHE.clear()
+    agent1 = sys.modules.get("agent1")
+    if agent1 is not None:
+        agent1.verdict_cache.clear()
+
+
+@contextmanager
+def profiling(kind: Optional[str], output: Optional[str] = None, top: int = 25) -> Iterator[None]:
+    """Profile the enclosed code and print the hottest functions or stacks.
+
+    Args:
+        kind: "cprofile" (deterministic, written to `output` for pstats/snakeviz),
+            "sample" (tool_metrics.SamplingProfiler stacks of this thread),
+            "py-spy" (attaches py-spy to this process and writes a flame graph
+            to `output`), or None for no profiling.
+        output: File for the cProfile stats or py-spy flame graph.
+        top: Functions or stacks printed.
+    """
+    if kind is None:
+        yield
+    elif kind == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if output:
+                profiler.dump_stats(output)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+    elif kind == "sample":
+        from tool_metrics import SamplingProfiler
+        sampler = SamplingProfiler(interval=0.001, depth=8)
+        sampler.enter()
+        try:
+            yield
+        finally:
+            sampler.exit()
+            sampler.stop()
+            for stack, count in sampler.top(top):
+                print(f"{count:6d}  {stack}")
+    elif kind == "py-spy":
+        executable = shutil.which("py-spy")
+        if executable is None:
+            raise RuntimeError("py-spy not found on PATH (pip install py-spy)")
+        spy = subprocess.Popen([executable, "record", "--pid", str(os.getpid()), "--output", output or "replay.svg"])
+        # Give py-spy time to attach before the replay starts
+        time.sleep(1.0)
+        try:
+            yield
+        finally:
+            spy.send_signal(signal.SIGINT)
+            spy.wait()
+    else:
+        raise ValueError(f"Unknown profiler '{kind}'")
+
+
+def summarize_log(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Counts and timings per record kind, and the busiest tool hosts and agents."""
+    kinds = Counter(record["kind"] for record in records[1:])
+    http = [record for record in records if record["kind"] == "http"]
+    model = [record for record in records if record["kind"] == "model"]
+    return {
+        "records": dict(kinds),
+        "span_s": max((record["t"] + record.get("elapsed", 0.0) for record in records), default=0.0),
+        "http_s": sum(record["elapsed"] for record in http),
+        "model_s": sum(record["elapsed"] for record in model),
+        "http_body_bytes": sum(len(_decode_body(record)) for record in http),
+        "hosts": dict(Counter(urlsplit(record["url"]).netloc for record in http).most_common(5)),
+        "turns_by_agent": dict(Counter(record["agent"] for record in records if record["kind"] == "turn")),
+    }
+
+
+def main(args) -> None:
+    records = read_traffic_log(args.log)
+    if args.command == "summary":
+        print(json.dumps(dict(summarize_log(records), file_bytes=os.path.getsize(args.log)), indent=2))
+        return
+    from startup import configure_environment
+    configure_environment(tracing=False)
+
+    async def passes() -> None:
+        # One event loop for every pass: the SSE responses bind to the first loop they run in
+        for attempt in range(args.repeat):
+            if attempt:
+                reset_caches()
+            report = await replay(records, args.speed, args.tools)
+            print(f"Pass {attempt + 1}: {report.summary()}")
+
+    with profiling(args.profile, args.profile_out, args.top):
+        asyncio.run(passes())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a traffic log, or replay it offline with optional profiling")
+    parser.add_argument("command", choices=["summary", "replay"])
+    parser.add_argument("log", help="Traffic log written by server.py --record")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay this many times faster than recorded, 0 for no waiting at all")
+    parser.add_argument("--tools", metavar="PATH", help="Tool config to replay with, if not the recorded one")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay passes, with caches emptied in between")
+    parser.add_argument("--profile", choices=["cprofile", "sample", "py-spy"])
+    parser.add_argument("--profile-out", metavar="PATH", help="cProfile stats or py-spy flame graph file")
+    parser.add_argument("--top", type=int, default=25, help="Functions or stacks printed by the profiler")
+    main(parser.parse_args())
@@ -1,19 +1,24 @@
 import os
+import argparse
 import asyncio
-from typing import Dict, Any
-from agents import Agent, Runner, function_tool
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
-# Load environment variables
-load_dotenv()
+from conversation_memory import HISTORY_BUDGET, format_turn_tokens, open_conversation
+from safe_eval import evaluate, evaluate_many
+from startup import configure_environment
+from streaming import format_timing, render_stream, run_streamed
+from tool_metrics import TOOL_METRICS, note_error
+from travel_indexes import RestaurantIndex, get_restaurant_index, get_search_index
 
+# The SDK is imported when the assistant is first needed, not at import time
+if TYPE_CHECKING:
+    from agents import Agent, RunConfig
 
-from agents import set_tracing_export_api_key
+# Number of documents returned by search_web
+SEARCH_TOP_K = 3
 
-set_tracing_export_api_key(os.getenv("OPENAI_API_KEY"))
-
-# Define tools using the function_tool decorator
-@function_tool
+# Tool functions, wrapped with function_tool when the assistant is built
 async def fetch_weather(location: str) -> str:
     """Fetch the current weather for a location.
     
@@ -26,7 +31,6 @@ async def fetch_weather(location: str) -> str:
     # In a real app, this would call a weather API
     return f"It's sunny and 72°F in {location}."
 
-@function_tool
 async def calculate(expression: str) -> str:
     """Evaluate a mathematical expression.
     
@@ -37,14 +41,28 @@ async def calculate(expression: str) -> str:
         The result of the calculation.
     """
     try:
-        # Restrict eval to safe operations
-        allowed_names = {"abs": abs, "round": round, "min": min, "max": max}
-        result = eval(expression, {"__builtins__": {}}, allowed_names)
+        # Whitelisted arithmetic only, compiled once per distinct expression
+        result = evaluate(expression)
         return f"The result of {expression} is {result}"
     except Exception as e:
+        note_error(e)
         return f"Error calculating {expression}: {str(e)}"
 
-@function_tool
+async def calculate_many(expressions: List[str]) -> List[str]:
+    """Evaluate several mathematical expressions in one call.
+    
+    Args:
+        expressions: Mathematical expressions as strings, e.g. ["120 * 0.92", "85 * 0.92"]
+    
+    Returns:
+        The result of each calculation, in the same order.
+    """
+    return [
+        f"Error calculating {expression}: {str(result)}" if isinstance(result, Exception)
+        else f"The result of {expression} is {result}"
+        for expression, result in zip(expressions, evaluate_many(expressions))
+    ]
+
 async def search_web(query: str) -> Dict[str, Any]:
     """Search the web for information about a query.
     
@@ -54,26 +72,18 @@ async def search_web(query: str) -> Dict[str, Any]:
     Returns:
         A dictionary containing search results.
     """
-    # Simulated search results
-    results = {
-        "python": "Python is a high-level, interpreted programming language known for its readability.",
-        "openai": "OpenAI is an AI research laboratory consisting of the for-profit corporation OpenAI LP and its parent company.",
-        "agents": "In the context of AI, agents are systems that can perceive their environment and take actions to achieve goals.",
-        "weather": "Weather refers to the state of the atmosphere, including temperature, humidity, precipitation, wind, and clouds."
-    }
-
     # Default response for unknown queries
     default_response = "I couldn't find specific information about that. Try another search query."
 
-    # Simple keyword matching
-    for keyword, result in results.items():
-        if keyword.lower() in query.lower():
-            return {
-                "query": query,
-                "results": [
-                    {"title": f"About {keyword.capitalize()}", "content": result}
-                ]
-            }
+    # Ranked keyword search over the lazily built index
+    documents = get_search_index().search(query, k=SEARCH_TOP_K)
+    if documents:
+        return {
+            "query": query,
+            "results": [
+                {"title": document["title"], "content": document["content"]} for document in documents
+            ]
+        }
 
     return {
         "query": query,
@@ -82,7 +92,6 @@ async def search_web(query: str) -> Dict[str, Any]:
         ]
     }
 
-@function_tool
 async def recommend_restaurant(cuisine: str, location: str) -> str:
     """Find top restaurant recommendations.
     
@@ -93,66 +102,103 @@ async def recommend_restaurant(cuisine: str, location: str) -> str:
     Returns:
         A string with restaurant recommendations.
     """
-    # Simulated restaurant recommendations
-    restaurants = {
-        "italian": {
-            "san francisco": "Bella Trattoria - 4.5 stars, authentic Italian cuisine",
-            "new york": "Carbone - 4.7 stars, upscale Italian dining",
-            "chicago": "Spiaggia - 4.6 stars, classic Italian dishes"
-        },
-        "thai": {
-            "san francisco": "Kin Khao - 4.4 stars, traditional Thai food",
-            "new york": "SriPraPhai - 4.5 stars, acclaimed Thai restaurant",
-            "chicago": "Arun's Thai - 4.8 stars, fine Thai dining"
-        },
-        "mexican": {
-            "san francisco": "La Taqueria - 4.6 stars, famous for burritos",
-            "new york": "Cosme - 4.5 stars, upscale Mexican cuisine",
-            "chicago": "Frontera Grill - 4.7 stars, authentic Mexican dishes"
-        }
-    }
+    # (cuisine, location) lookup with alias and fuzzy matching over the lazily built index
+    matches = get_restaurant_index().lookup(cuisine, location)
+    if matches:
+        return RestaurantIndex.format(matches[0])
+    else:
+        return f"I couldn't find {cuisine.lower()} restaurant recommendations for {location.lower()}."
+
+# System prompt of the travel assistant
+TRAVEL_INSTRUCTIONS = """You are a helpful travel assistant that can provide weather information
+    and restaurant recommendations to users planning trips.
+    
+    Use the fetch_weather tool to check weather conditions for a location.
+    Use the recommend_restaurant tool to suggest dining options based on cuisine and location.
+    Use the search_web tool to find general information about travel destinations.
+    Use the calculate tool for any trip-related calculations (currency conversion, distances, etc.)
+    Use the calculate_many tool when several calculations are needed at once, e.g. converting every cost in an itinerary.
+    
+    Be friendly, helpful, and concise in your responses."""
 
-    cuisine = cuisine.lower()
-    location = location.lower()
 
-    if cuisine in restaurants and location in restaurants[cuisine]:
-        return restaurants[cuisine][location]
-    else:
-        return f"I couldn't find {cuisine} restaurant recommendations for {location}."
+@lru_cache(maxsize=None)
+def get_travel_assistant() -> "Agent":
+    """Import the Agents SDK and build the travel assistant, on first use."""
+    from agents import Agent, function_tool
 
-async def main():
-    # Create the travel assistant agent with tools
-    travel_assistant = Agent(
+    return Agent(
         name="Travel Assistant",
-        instructions="""You are a helpful travel assistant that can provide weather information
-        and restaurant recommendations to users planning trips.
-        
-        Use the fetch_weather tool to check weather conditions for a location.
-        Use the recommend_restaurant tool to suggest dining options based on cuisine and location.
-        Use the search_web tool to find general information about travel destinations.
-        Use the calculate tool for any trip-related calculations (currency conversion, distances, etc.)
-        
-        Be friendly, helpful, and concise in your responses.""",
-        tools=[fetch_weather, recommend_restaurant, search_web, calculate]
+        instructions=TRAVEL_INSTRUCTIONS,
+        # Every call is recorded in the shared tool metrics
+        tools=[TOOL_METRICS.instrument_function_tool(function_tool(tool))
+               for tool in (fetch_weather, recommend_restaurant, search_web, calculate, calculate_many)]
     )
 
+
+def __getattr__(name: str) -> Any:
+    # `from travel_agent import travel_assistant` builds the assistant on first access
+    if name == "travel_assistant":
+        return get_travel_assistant()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def main(run_config: Optional["RunConfig"] = None, stream: bool = False, memory_path: str | None = None,
+               session_id: str = "default", history_budget: int = HISTORY_BUDGET):
+    from agents import Runner
+
+    travel_assistant = get_travel_assistant()
     print("Travel Assistant Agent")
     print("Type 'exit' to quit")
 
+    # Earlier turns are replayed within the token budget, older ones as a summary
+    store, memory = open_conversation(memory_path, session_id, history_budget)
+
     # Interactive loop for conversation
     while True:
         user_input = input("\nYou: ")
         if user_input.lower() == 'exit':
             break
-
-        # Run the agent with user input
-        result = await Runner.run(travel_assistant, user_input)
-        print(f"\nAssistant: {result.final_output}")
+        history = memory.build_input(user_input)
+
+        # Print tool activity and the answer as they are generated
+        if stream:
+            timing = await render_stream(memory.track(
+                user_input, run_streamed(travel_assistant, history, run_config=run_config)))
+            print(format_timing(timing))
+        else:
+            # Run the agent with the conversation so far
+            result = await Runner.run(travel_assistant, history, run_config=run_config)
+            memory.record_result(user_input, result)
+            print(f"\nAssistant: {result.final_output}")
+
+        print(format_turn_tokens(memory.turns[-1]))
+        if store is not None:
+            store.save(memory)
+
+    if store is not None:
+        store.close()
 
 if __name__ == "__main__":
-    if not os.getenv("OPENAI_API_KEY"):
+    parser = argparse.ArgumentParser(description="Travel Assistant Agent")
+    parser.add_argument("--mock", action="store_true", help="Use the local scripted model instead of OpenAI")
+    parser.add_argument("--stream", action="store_true", help="Stream tokens and tool calls as they arrive, with timings")
+    parser.add_argument("--memory", metavar="PATH", help="SQLite file to keep the conversation in across runs")
+    parser.add_argument("--session", default="default", help="Conversation to continue from --memory")
+    parser.add_argument("--history-budget", type=int, default=HISTORY_BUDGET,
+                        help="Tokens of earlier conversation sent with each message")
+    args = parser.parse_args()
+
+    # Load .env and set the tracing key here rather than at import time
+    configure_environment()
+
+    run_config = None
+    if args.mock:
+        from agents import RunConfig
+        from mock_model import ScriptedModelProvider
+        run_config = RunConfig(model_provider=ScriptedModelProvider(), tracing_disabled=True)
+    elif not os.getenv("OPENAI_API_KEY"):
         print("Please set your OPENAI_API_KEY in the .env file")
         exit(1)
 
     # Run the async main function
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(run_config, args.stream, args.memory, args.session, args.history_budget))
\ No newline at end of file
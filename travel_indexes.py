@@ -0,0 +1,212 @@
+import difflib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Optional on-disk catalogs (JSON Lines), loaded through mmap on first use
+RESTAURANTS_PATH_ENV = "TRAVEL_RESTAURANTS_PATH"
+SEARCH_DOCUMENTS_PATH_ENV = "TRAVEL_SEARCH_PATH"
+
+# Built-in catalog used when no file is configured
+RESTAURANTS = [
+    {"cuisine": "italian", "location": "san francisco", "name": "Bella Trattoria", "rating": 4.5, "description": "authentic Italian cuisine"},
+    {"cuisine": "italian", "location": "new york", "name": "Carbone", "rating": 4.7, "description": "upscale Italian dining"},
+    {"cuisine": "italian", "location": "chicago", "name": "Spiaggia", "rating": 4.6, "description": "classic Italian dishes"},
+    {"cuisine": "thai", "location": "san francisco", "name": "Kin Khao", "rating": 4.4, "description": "traditional Thai food"},
+    {"cuisine": "thai", "location": "new york", "name": "SriPraPhai", "rating": 4.5, "description": "acclaimed Thai restaurant"},
+    {"cuisine": "thai", "location": "chicago", "name": "Arun's Thai", "rating": 4.8, "description": "fine Thai dining"},
+    {"cuisine": "mexican", "location": "san francisco", "name": "La Taqueria", "rating": 4.6, "description": "famous for burritos"},
+    {"cuisine": "mexican", "location": "new york", "name": "Cosme", "rating": 4.5, "description": "upscale Mexican cuisine"},
+    {"cuisine": "mexican", "location": "chicago", "name": "Frontera Grill", "rating": 4.7, "description": "authentic Mexican dishes"},
+]
+
+SEARCH_DOCUMENTS = [
+    {"title": "About Python", "content": "Python is a high-level, interpreted programming language known for its readability."},
+    {"title": "About Openai", "content": "OpenAI is an AI research laboratory consisting of the for-profit corporation OpenAI LP and its parent company."},
+    {"title": "About Agents", "content": "In the context of AI, agents are systems that can perceive their environment and take actions to achieve goals."},
+    {"title": "About Weather", "content": "Weather refers to the state of the atmosphere, including temperature, humidity, precipitation, wind, and clouds."},
+]
+
+LOCATION_ALIASES = {
+    "sf": "san francisco",
+    "san fran": "san francisco",
+    "nyc": "new york",
+    "new york city": "new york",
+    "ny": "new york",
+    "chi town": "chicago",
+    "chitown": "chicago",
+}
+
+# Minimum difflib similarity for fuzzy cuisine/location matches
+FUZZY_CUTOFF = 0.8
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset({"a", "an", "and", "are", "for", "in", "is", "of", "on", "the", "to", "what", "with"})
+
+
+def normalize_location(location: str) -> str:
+    """Lowercase, drop a trailing ", state" part and punctuation, and resolve aliases."""
+    location = location.split(",")[0]
+    location = " ".join(_TOKEN_RE.findall(location.lower()))
+    return LOCATION_ALIASES.get(location, location)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+class MappedRecords(Sequence):
+    """Read-only sequence of JSON Lines records backed by a memory-mapped file.
+
+    Only line offsets are held in memory; records are decoded on access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+        self._offsets = array("Q")
+        position, size = 0, len(self._mmap)
+        while position < size:
+            end = self._mmap.find(b"\n", position)
+            end = size if end == -1 else end
+            if end > position:
+                self._offsets.append(position)
+            position = end + 1
+
+    def _line(self, i: int) -> bytes:
+        start = self._offsets[i]
+        end = self._mmap.find(b"\n", start)
+        return self._mmap[start:end if end != -1 else len(self._mmap)]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return json.loads(self._line(i))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self._offsets)):
+            yield self[i]
+
+
+def write_jsonl(path: str, records: Iterable[Dict[str, Any]]) -> None:
+    """Write records as JSON Lines, the on-disk format read by MappedRecords."""
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write("\n")
+
+
+class RestaurantIndex:
+    """(cuisine, normalized location) hash index over a restaurant catalog.
+
+    Each key keeps its record ids sorted by rating, best first. Misses fall
+    back to location aliases and fuzzy matching of the cuisine and location.
+
+    Args:
+        records: Catalog records with cuisine, location, name, rating and description.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self.records = records
+        ranked: Dict[Tuple[str, str], List[Tuple[float, int]]] = defaultdict(list)
+        for record_id, record in enumerate(records):
+            key = (record["cuisine"].lower(), normalize_location(record["location"]))
+            ranked[key].append((-float(record.get("rating", 0)), record_id))
+        self._index: Dict[Tuple[str, str], array] = {
+            key: array("I", (record_id for _, record_id in sorted(entries))) for key, entries in ranked.items()
+        }
+        self._locations: Dict[str, List[str]] = defaultdict(list)
+        for cuisine, location in self._index:
+            self._locations[cuisine].append(location)
+        # Fuzzy resolution is the slow path, so remember its answers
+        self._resolve = lru_cache(maxsize=4096)(self._resolve_uncached)
+
+    @staticmethod
+    def _close_match(word: str, candidates: List[str]) -> Optional[str]:
+        # Strings whose lengths differ too much cannot reach the cutoff, so skip them up front
+        slack = int(len(word) * (1 - FUZZY_CUTOFF)) + 2
+        nearby = [c for c in candidates if abs(len(c) - len(word)) <= slack]
+        close = difflib.get_close_matches(word, nearby, n=1, cutoff=FUZZY_CUTOFF)
+        return close[0] if close else None
+
+    def _resolve_uncached(self, cuisine: str, location: str) -> Optional[Tuple[str, str]]:
+        cuisine = cuisine.lower().strip()
+        location = normalize_location(location)
+        if (cuisine, location) in self._index:
+            return cuisine, location
+        if cuisine not in self._locations:
+            cuisine = self._close_match(cuisine, list(self._locations))
+            if cuisine is None:
+                return None
+        if (cuisine, location) in self._index:
+            return cuisine, location
+        location = self._close_match(location, self._locations[cuisine])
+        return (cuisine, location) if location else None
+
+    def lookup(self, cuisine: str, location: str, k: int = 1) -> List[Dict[str, Any]]:
+        """Return up to `k` best-rated records for the cuisine and location."""
+        key = self._resolve(cuisine, location)
+        if key is None:
+            return []
+        return [self.records[record_id] for record_id in self._index[key][:k]]
+
+    @staticmethod
+    def format(record: Dict[str, Any]) -> str:
+        return f"{record['name']} - {record['rating']} stars, {record['description']}"
+
+
+class SearchIndex:
+    """Inverted keyword index with idf-weighted ranking over search documents.
+
+    Args:
+        documents: Records with title and content.
+    """
+
+    def __init__(self, documents: Sequence[Dict[str, Any]]):
+        self.documents = documents
+        postings: Dict[str, array] = defaultdict(lambda: array("I"))
+        for doc_id, document in enumerate(documents):
+            for token in set(tokenize(document["title"] + " " + document["content"])):
+                postings[token].append(doc_id)
+        self._postings = dict(postings)
+        total = max(len(documents), 1)
+        self._idf = {token: math.log(1 + total / len(ids)) for token, ids in self._postings.items()}
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Return the top `k` documents for the query, best first."""
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            idf = self._idf[token]
+            for doc_id in ids:
+                scores[doc_id] += idf
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [self.documents[doc_id] for doc_id, _ in best]
+
+
+def _catalog(path_env: str, builtin: List[Dict[str, Any]]) -> Sequence[Dict[str, Any]]:
+    path = os.getenv(path_env)
+    return MappedRecords(path) if path else builtin
+
+
+@lru_cache(maxsize=None)
+def get_restaurant_index() -> RestaurantIndex:
+    """Build the restaurant index on first use."""
+    return RestaurantIndex(_catalog(RESTAURANTS_PATH_ENV, RESTAURANTS))
+
+
+@lru_cache(maxsize=None)
+def get_search_index() -> SearchIndex:
+    """Build the search index on first use."""
+    return SearchIndex(_catalog(SEARCH_DOCUMENTS_PATH_ENV, SEARCH_DOCUMENTS))
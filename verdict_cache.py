@@ -0,0 +1,244 @@
+import asyncio
+import inspect
+import math
+import re
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Set, Tuple
+
+from guardrail_prefilter import normalize_input
+from response_cache import ResponseCache
+
+# Cosine similarity above which a different question reuses a cached verdict
+SIMILARITY_THRESHOLD = 0.9
+
+_WORD_RE = re.compile(r"\w+")
+
+# Sparse embedding: feature -> weight, with unit L2 norm
+Embedding = Dict[Hashable, float]
+
+
+def text_embedding(text: str) -> Embedding:
+    """Embed a question as normalized word and character-trigram counts.
+
+    Cheap and local, and close enough for "what's the derivative of x^2" to
+    land next to "what is the derivative of x^2?". Any function returning a
+    sparse mapping (e.g. a dense model embedding as dict(enumerate(vector)))
+    can be used instead.
+    """
+    counts: Dict[Hashable, float] = defaultdict(float)
+    for word in _WORD_RE.findall(text):
+        counts[word] += 1.0
+    padded = f" {text} "
+    for i in range(len(padded) - 2):
+        counts[padded[i:i + 3]] += 1.0
+    norm = math.sqrt(sum(weight * weight for weight in counts.values()))
+    return {feature: weight / norm for feature, weight in counts.items()} if norm else {}
+
+
+class SimilarityIndex:
+    """In-memory nearest-neighbour index over sparse embeddings, with TTL and LRU eviction.
+
+    Entries are found through an inverted index of their features. Only the
+    query's rarest features are looked up: an entry sharing none of them
+    cannot reach the threshold on the remaining ones alone, so common
+    features never pull in the whole index.
+
+    Args:
+        max_size: Entries kept before the least recently used is evicted.
+        ttl: Seconds an entry stays searchable.
+        embed: Maps a text to its sparse embedding.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 3600.0,
+                 embed: Callable[[str], Mapping[Hashable, float]] = text_embedding):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.embed = embed
+        # Key -> (expires_at, embedding, value), oldest first
+        self._entries: "OrderedDict[str, Tuple[float, Mapping[Hashable, float], Any]]" = OrderedDict()
+        self._postings: Dict[Hashable, Set[str]] = defaultdict(set)
+
+    def add(self, key: str, value: Any) -> None:
+        """Index `value` under the text `key`, replacing any previous entry for it."""
+        self.remove(key)
+        vector = self.embed(key)
+        self._entries[key] = (time.monotonic() + self.ttl, vector, value)
+        for feature in vector:
+            self._postings[feature].add(key)
+        while len(self._entries) > self.max_size:
+            self.remove(next(iter(self._entries)))
+
+    def remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for feature in entry[1]:
+            keys = self._postings[feature]
+            keys.discard(key)
+            if not keys:
+                del self._postings[feature]
+
+    def search(self, text: str, threshold: float = SIMILARITY_THRESHOLD) -> Optional[Tuple[str, float, Any]]:
+        """Return (key, similarity, value) of the closest fresh entry at or above `threshold`."""
+        vector = self.embed(text)
+        # Rarest features first; once the rest of the query's norm is below the
+        # threshold, its dot product with any unit vector is too (Cauchy-Schwarz)
+        features = sorted(vector, key=lambda feature: len(self._postings.get(feature, ())))
+        remaining = sum(weight * weight for weight in vector.values())
+        candidates: Set[str] = set()
+        for feature in features:
+            if remaining < threshold * threshold:
+                break
+            candidates.update(self._postings.get(feature, ()))
+            remaining -= vector[feature] * vector[feature]
+
+        scores = []
+        for key in candidates:
+            entry = self._entries[key][1]
+            score = sum(weight * entry.get(feature, 0.0) for feature, weight in vector.items())
+            if score >= threshold:
+                scores.append((score, key))
+        now = time.monotonic()
+        for score, key in sorted(scores, reverse=True):
+            expires_at, _, value = self._entries[key]
+            if expires_at < now:
+                self.remove(key)
+                continue
+            self._entries.move_to_end(key)
+            return key, score, value
+        return None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._postings.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass(frozen=True)
+class TriageVerdict:
+    """What the models decided about a question.
+
+    Attributes:
+        homework: The guardrail's HomeworkOutput.
+        handoff: Name of the tutor the triage agent handed off to, None until
+            a triage run for this question has finished with a handoff.
+    """
+    homework: Any
+    handoff: Optional[str] = None
+
+
+async def _resolved(value: Any) -> Any:
+    # ResponseCache answers directly, SharedCache through a coroutine
+    return await value if inspect.isawaitable(value) else value
+
+
+class VerdictCache:
+    """Guardrail verdicts and triage handoffs keyed on the normalized question.
+
+    Exact matches come from `store`, which evicts by TTL and LRU and may be
+    shared between processes. With `similarity` set, a question with no
+    exact entry falls back to the closest previously decided question in a
+    local SimilarityIndex. Concurrent misses for the same question share one
+    guardrail model call.
+
+    Args:
+        store: A ResponseCache or SharedCache for exact entries, defaults to a
+            local ResponseCache of `max_size` entries kept for `ttl` seconds.
+        max_size: Entries kept in the default store and the similarity index.
+        ttl: Seconds an entry stays fresh in the default store and the similarity index.
+        similarity: Cosine similarity required for a near-duplicate to reuse a
+            verdict, None to only reuse exact matches.
+        embed: Embedding used by the similarity index.
+    """
+
+    def __init__(self, store: Any = None, max_size: int = 4096, ttl: float = 3600.0,
+                 similarity: Optional[float] = None,
+                 embed: Callable[[str], Mapping[Hashable, float]] = text_embedding):
+        self.store = store if store is not None else ResponseCache(max_size=max_size, default_ttl=ttl)
+        self.similarity = similarity
+        self.index = SimilarityIndex(max_size, ttl, embed) if similarity is not None else None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    async def lookup(self, text: str) -> Optional[TriageVerdict]:
+        """Return the cached verdict for `text` or a near-duplicate of it, if any."""
+        key = normalize_input(text)
+        try:
+            found, verdict = await _resolved(self.store.get(key))
+        except (OSError, RuntimeError):
+            # An unreachable shared store degrades to asking the model
+            self.errors += 1
+            found, verdict = False, None
+        if found:
+            self.hits += 1
+            return verdict
+        if self.index is not None:
+            match = self.index.search(key, self.similarity)
+            if match is not None:
+                self.similar_hits += 1
+                return match[2]
+        self.misses += 1
+        return None
+
+    async def fetch(self, text: str, ask_model: Callable[[], Awaitable[Any]]) -> TriageVerdict:
+        """Ask the guardrail model about `text` and cache the verdict.
+
+        A fetch already running for the same question is joined instead.
+        """
+        key = normalize_input(text)
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(in_flight)
+
+        async def decide() -> TriageVerdict:
+            verdict = TriageVerdict(await ask_model())
+            await self._store(key, verdict)
+            return verdict
+
+        task = asyncio.ensure_future(decide())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def record_handoff(self, text: str, verdict: TriageVerdict, handoff: Optional[str]) -> None:
+        """Remember which tutor triage picked for `text`, so the next run can go straight there."""
+        if handoff is not None and handoff != verdict.handoff:
+            await self._store(normalize_input(text), replace(verdict, handoff=handoff))
+
+    async def _store(self, key: str, verdict: TriageVerdict) -> None:
+        try:
+            await _resolved(self.store.set(key, verdict))
+        except (OSError, RuntimeError):
+            self.errors += 1
+        if self.index is not None:
+            self.index.add(key, verdict)
+
+    def clear(self) -> Any:
+        """Drop every entry; returns the store's awaitable when the store is shared."""
+        if self.index is not None:
+            self.index.clear()
+        return self.store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup counters and hit rates for this process."""
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "lookups": lookups,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+            "similar_hit_rate": self.similar_hits / lookups if lookups else 0.0,
+            "indexed": len(self.index) if self.index is not None else 0,
+        }
@@ -0,0 +1,293 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from conversation_memory import HISTORY_BUDGET
+from shared_cache import CacheServer, SharedCache
+from startup import configure_environment
+
+# Seconds a worker gets to finish in-flight turns after SIGTERM before it is killed
+SHUTDOWN_TIMEOUT = 30.0
+
+# Seconds to wait for a (re)started worker to answer /health
+WORKER_START_TIMEOUT = 60.0
+
+# Seconds between checks for crashed workers
+MONITOR_INTERVAL = 1.0
+
+# Headers that describe one connection and must not be forwarded
+HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "transfer-encoding", "upgrade", "host",
+                                "proxy-authenticate", "proxy-authorization", "te", "trailer"})
+
+
+@dataclass
+class WorkerOptions:
+    """Settings every worker builds its server app with (see server.create_app).
+
+    Attributes:
+        mock: Use the local mock model instead of OpenAI.
+        model_latency: Simulated model latency in seconds, with `mock`.
+        tool_url_overrides: Tool id to URL mapping for the multi-tool assistant.
+        max_concurrent_turns: Turns each worker runs at once.
+        max_queued_turns: Turns each worker queues before answering 503.
+        history_budget: Tokens of earlier conversation replayed with each message.
+        lazy: Load each agent on its first turn.
+        cache_size: Entries per shared cache namespace.
+        tool_config: Tool config file or directory; each worker reloads it on change.
+    """
+    mock: bool = False
+    model_latency: float = 0.0
+    tool_url_overrides: Optional[Dict[str, str]] = None
+    max_concurrent_turns: int = 64
+    max_queued_turns: int = 256
+    history_budget: int = HISTORY_BUDGET
+    lazy: bool = False
+    cache_size: int = 4096
+    tool_config: Optional[str] = None
+
+
+def run_worker(socket_path: str, cache_path: str, options: WorkerOptions) -> None:
+    """Worker process entry point: serve the app on `socket_path` until SIGTERM.
+
+    Each worker has its own event loop and HTTP connection pool. Tool
+    responses and guardrail verdicts go through the supervisor's shared cache.
+    """
+    import uvicorn
+
+    from server import create_app
+
+    configure_environment(tracing=False)
+    provider = None
+    if options.mock:
+        from mock_model import MockModelProvider
+        provider = MockModelProvider(latency=options.model_latency)
+
+    app = create_app(provider, options.tool_url_overrides, options.max_concurrent_turns, options.max_queued_turns,
+                     history_budget=options.history_budget, lazy=options.lazy, tool_config=options.tool_config,
+                     response_cache=SharedCache(cache_path, "tool_responses"),
+                     verdict_cache=SharedCache(cache_path, "verdicts", default_ttl=3600))
+    # uvicorn stops accepting on SIGTERM and waits for open streams to finish
+    uvicorn.run(app, uds=socket_path, log_level="warning", timeout_graceful_shutdown=int(SHUTDOWN_TIMEOUT))
+
+
+class WorkerPool:
+    """N server worker processes behind a session-affine proxy, sharing one cache.
+
+    Sessions are routed by a stable hash of their id, so a conversation's
+    history stays in the worker that holds it. A worker that dies is
+    restarted under the same index, so its sessions keep routing to it
+    (their in-memory history is lost with the process).
+
+    Args:
+        size: Number of worker processes.
+        options: Settings for every worker.
+        runtime_dir: Directory for the Unix sockets, a temporary one by default.
+    """
+
+    def __init__(self, size: int, options: Optional[WorkerOptions] = None, runtime_dir: Optional[str] = None):
+        if size < 1:
+            raise ValueError("A worker pool needs at least one worker")
+        self.size = size
+        self.options = options or WorkerOptions()
+        self._owns_runtime_dir = runtime_dir is None
+        self.runtime_dir = runtime_dir or tempfile.mkdtemp(prefix="agent-pool-")
+        self.cache_server = CacheServer(os.path.join(self.runtime_dir, "cache.sock"), self.options.cache_size)
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * size
+        self.clients: List[httpx.AsyncClient] = []
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._round_robin = itertools.cycle(range(size))
+        self._monitor: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def socket_path(self, index: int) -> str:
+        return os.path.join(self.runtime_dir, f"worker-{index}.sock")
+
+    def worker_for(self, session_id: Optional[str]) -> int:
+        """Return the worker index for a session; requests without one are spread round-robin."""
+        if session_id is None:
+            return next(self._round_robin)
+        return zlib.crc32(session_id.encode()) % self.size
+
+    def _client(self, index: int) -> httpx.AsyncClient:
+        # Streams last as long as a turn, so only connecting is bounded
+        return httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=self.socket_path(index)),
+                                 base_url=f"http://worker-{index}", timeout=httpx.Timeout(None, connect=5.0))
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=run_worker, args=(self.socket_path(index), self.cache_server.path, self.options),
+            name=f"agent-worker-{index}")
+        process.start()
+        self.processes[index] = process
+
+    async def _wait_ready(self, index: int) -> None:
+        deadline = time.monotonic() + WORKER_START_TIMEOUT
+        while True:
+            try:
+                response = await self.clients[index].get("/health")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            process = self.processes[index]
+            if process is None or not process.is_alive():
+                raise RuntimeError(f"Worker {index} exited during startup")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Worker {index} did not start within {WORKER_START_TIMEOUT}s")
+            await asyncio.sleep(0.05)
+
+    async def start(self) -> None:
+        await self.cache_server.start()
+        for index in range(self.size):
+            self.clients.append(self._client(index))
+            self._spawn(index)
+        await asyncio.gather(*(self._wait_ready(index) for index in range(self.size)))
+        self._monitor = asyncio.create_task(self._restart_crashed())
+
+    async def _restart_crashed(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(MONITOR_INTERVAL)
+            for index, process in enumerate(self.processes):
+                if self._stopping or (process is not None and process.is_alive()):
+                    continue
+                self.restarts += 1
+                # Pooled connections point at the dead process
+                stale, self.clients[index] = self.clients[index], self._client(index)
+                await stale.aclose()
+                self._spawn(index)
+                try:
+                    await self._wait_ready(index)
+                except RuntimeError:
+                    # Try again on the next check
+                    pass
+
+    async def stop(self, timeout: float = SHUTDOWN_TIMEOUT) -> None:
+        """Stop every worker gracefully: SIGTERM, wait up to `timeout`, then kill stragglers."""
+        self._stopping = True
+        if self._monitor is not None:
+            self._monitor.cancel()
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+
+        # Poll rather than join in a thread, so the loop stays free to finish proxied streams
+        deadline = time.monotonic() + timeout
+        while any(p is not None and p.is_alive() for p in self.processes) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for process in self.processes:
+            if process is None:
+                continue
+            if process.is_alive():
+                process.kill()
+            process.join()
+
+        for client in self.clients:
+            await client.aclose()
+        await self.cache_server.stop()
+        if self._owns_runtime_dir:
+            shutil.rmtree(self.runtime_dir, ignore_errors=True)
+
+    async def health(self) -> Dict[str, Any]:
+        """Sum the workers' /health counters and list each worker's state."""
+        totals = {"sessions": 0, "running_turns": 0, "queued_turns": 0}
+        workers = []
+        for index, client in enumerate(self.clients):
+            process = self.processes[index]
+            worker = {"index": index, "pid": process.pid if process else None,
+                      "alive": bool(process and process.is_alive())}
+            try:
+                stats = (await client.get("/health")).json()
+                for key in totals:
+                    totals[key] += stats.get(key, 0)
+                worker.update(stats)
+            except httpx.TransportError:
+                pass
+            workers.append(worker)
+        return {**totals, "restarts": self.restarts, "cache_requests": self.cache_server.requests,
+                "workers": workers}
+
+
+def create_pool_app(pool: WorkerPool) -> Starlette:
+    """
+    Build the supervisor's ASGI app: starts the pool and proxies requests to its workers.
+
+    Session routes go to the session's worker, /sessions round-robin, and
+    /workers/{index}/... reaches one worker directly (e.g. its /metrics).
+    On shutdown in-flight streams finish first, then the workers are stopped.
+
+    Args:
+        pool: The worker pool, started and stopped with the app.
+
+    Returns:
+        The Starlette app.
+    """
+    async def forward(request: Request, index: int, path: str):
+        client = pool.clients[index]
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS]
+        upstream = client.build_request(request.method, path, params=request.query_params,
+                                        headers=headers, content=await request.body())
+        try:
+            response = await client.send(upstream, stream=True)
+        except httpx.TransportError:
+            return JSONResponse({"error": f"Worker {index} unavailable"}, status_code=503, headers={"Retry-After": "1"})
+        return StreamingResponse(
+            response.aiter_raw(), status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+            background=BackgroundTask(response.aclose))
+
+    async def session_route(request: Request):
+        return await forward(request, pool.worker_for(request.path_params["session_id"]), request.url.path)
+
+    async def any_worker(request: Request):
+        return await forward(request, pool.worker_for(None), request.url.path)
+
+    async def one_worker(request: Request):
+        index = request.path_params["index"]
+        if not 0 <= index < pool.size:
+            return JSONResponse({"error": f"Unknown worker {index}"}, status_code=404)
+        return await forward(request, index, "/" + request.path_params["path"])
+
+    async def health(request: Request):
+        return JSONResponse(await pool.health())
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await pool.start()
+        yield
+        await pool.stop()
+
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/sessions", any_worker, methods=["POST"]),
+            Route("/agents/{agent}/sessions/{session_id}/messages", session_route, methods=["POST"]),
+            Route("/agents/{agent}/sessions/{session_id}", session_route, methods=["DELETE"]),
+            Route("/workers/{index:int}/{path:path}", one_worker, methods=["GET", "POST", "DELETE"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def serve(host: str, port: int, workers: int, options: WorkerOptions) -> None:
+    """Run the supervisor in this process until SIGINT/SIGTERM."""
+    import uvicorn
+
+    uvicorn.run(create_pool_app(WorkerPool(workers, options)), host=host, port=port, log_level="warning",
+                timeout_graceful_shutdown=int(SHUTDOWN_TIMEOUT))
+